@@ -1,27 +1,31 @@
 # Techburg/agents/drone.py
-import math, random
+import math
 from agents.survivor_bot import SurvivorBot
+from events import INFO
 
 class MalfunctioningDrone:
+    __slots__ = ('x', 'y', 'target_bot')
+    type, color = 'drone', 'red'
+    ATTACK_DAMAGE = 50
+    ATTACK_RANGE = 1.5
+
     def __init__(self, x, y):
         self.x, self.y = x, y
-        self.type, self.color = 'drone', 'red'
         self.target_bot = None
 
     def update(self, grid):
-        if not self.target_bot or self.target_bot not in grid.entities:
-            bots = grid.get_all_bots()
-            if bots:
-                new_target = min(bots, key=lambda b: math.hypot(self.x-b.x,self.y-b.y))
+        if not self.target_bot or not grid.contains(self.target_bot):
+            new_target = grid.nearest_bot(self.x, self.y)
+            if new_target:
                 if new_target != self.target_bot:
                     self.target_bot = new_target
-                    grid.log(f"[DRONE] Acquired new target: {self.target_bot.bot_id}")
+                    grid.events.emit('drone', INFO, "Acquired new target: {}", self.target_bot.bot_id)
         
         if self.target_bot:
-            if math.hypot(self.x-self.target_bot.x, self.y-self.target_bot.y) <= 1.5:
-                damage = 50
+            if math.hypot(self.x-self.target_bot.x, self.y-self.target_bot.y) <= self.ATTACK_RANGE:
+                damage = self.ATTACK_DAMAGE
                 self.target_bot.energy -= damage
-                grid.log(f"[DRONE] Attacked {self.target_bot.bot_id} for {damage} damage!")
+                grid.events.emit('drone', INFO, "Attacked {} for {} damage!", self.target_bot.bot_id, damage)
             else: self.move_towards(self.target_bot, grid)
         else: self.move_randomly(grid)
 
@@ -30,5 +34,5 @@ class MalfunctioningDrone:
         dy = 1 if target.y > self.y else -1 if target.y < self.y else 0
         grid.move_entity(self, self.x + dx, self.y + dy)
     def move_randomly(self, grid):
-        dx, dy = random.choice([(0,1), (0,-1), (1,0), (-1,0)])
+        dx, dy = grid.rng.choice([(0,1), (0,-1), (1,0), (-1,0)])
         grid.move_entity(self, self.x + dx, self.y + dy)
\ No newline at end of file
@@ -1,8 +1,12 @@
 # Techburg/agents/survivor_bot.py
-import math
 from entities import SparePart
 
 class SurvivorBot:
+    __slots__ = ('bot_id', 'x', 'y', 'energy', 'base_max_energy', 'max_energy', 'speed', 'vision',
+                 'energy_depletion_rate', 'carrying_part', 'target_entity', 'stunned', 'active_enhancements', 'path')
+    type = 'survivor_bot'; color = "deep sky blue"
+    base_speed = 1; base_vision = 5
+
     def __init__(self, bot_id, x, y, energy):
         self.bot_id = bot_id; self.x = x; self.y = y; self.energy = energy
         
@@ -10,32 +14,58 @@ class SurvivorBot:
         self.base_max_energy = 500
         self.max_energy = self.base_max_energy
         
-        self.base_speed = 1; self.base_vision = 5
         self.speed = self.base_speed; self.vision = self.base_vision
         self.energy_depletion_rate = 0.1
         self.carrying_part, self.target_entity = None, None
-        self.type = 'survivor_bot'; self.color = "deep sky blue"
+        # enhancement -> tick it expires on (see apply_enhancement)
         self.stunned, self.active_enhancements = 0, {}
+        self.path = None  # remaining A* steps, next step last (see follow_path)
 
     def update(self, grid):
         if self.energy <= 0: return
         if self.stunned > 0: self.stunned -= 1; return
+        # With scheduled decisions, running low is a reason to reconsider a part run.
+        if grid.decisions and self.target_entity and self.target_entity.type != 'recharge_station':
+            threshold = self.max_energy * grid.settings.BOT_RECHARGE_THRESHOLD
+            if self.energy >= threshold > self.energy - self.energy_depletion_rate: grid.decisions.request(self)
         self.energy -= self.energy_depletion_rate
-        self.update_enhancements()
         self.execute_state_action(grid)
 
     def execute_state_action(self, grid):
-        if not self.target_entity or self.target_entity not in grid.entities:
+        if not self.target_entity or not grid.contains(self.target_entity):
+            if grid.decisions:
+                # Wait for a turn of the decision scheduler (see ai/decisions.py).
+                self.target_entity = None
+                grid.decisions.request(self)
+                return
             self.get_new_goal(grid)
         
         if self.target_entity:
             if self.x == self.target_entity.x and self.y == self.target_entity.y:
                 self.handle_arrival(self.target_entity, grid)
+                if grid.decisions: grid.decisions.request(self)
             else:
                 self.move_towards(self.target_entity, grid)
 
+    def decide(self, grid):
+        """A fresh goal and route, when the decision scheduler gives this bot its turn.
+        A bot near a threat also steers clear of targets the threats are near."""
+        self.get_new_goal(grid)
+        if self in grid.decisions.threatened: self.avoid_threats(grid)
+        self.path = None
+
+    def avoid_threats(self, grid):
+        """Swaps a target within BOT_THREAT_DETECTION_RADIUS of a threat for the nearest one of
+        its kind that is not. With nowhere safe to go, the target is kept."""
+        from grid import THREAT_TYPES
+        radius, target = grid.settings.BOT_THREAT_DETECTION_RADIUS, self.target_entity
+        unsafe = lambda entity: grid.query_radius(entity.x, entity.y, radius, THREAT_TYPES)
+        if target is None or not unsafe(target): return
+        safe = [entity for entity in grid.get_by_type(target.type) if not unsafe(entity)]
+        if safe: self.target_entity = min(safe, key=lambda entity: grid.distance(self.x, self.y, entity))
+
     def get_new_goal(self, grid):
-        if self.energy < self.max_energy * 0.4:
+        if self.energy < self.max_energy * grid.settings.BOT_RECHARGE_THRESHOLD:
             self.target_entity = self.find_nearest_target(grid, 'recharge_station')
         elif self.carrying_part:
             self.target_entity = self.find_nearest_target(grid, 'recharge_station')
@@ -43,6 +73,7 @@ class SurvivorBot:
             self.target_entity = self.find_nearest_target(grid, 'spare_part')
     
     def move_towards(self, target, grid):
+        if grid.settings.BOT_USE_PATHFINDING and self.follow_path(target, grid): return
         dx, dy = 0, 0
         if target.x > self.x: dx = 1
         elif target.x < self.x: dx = -1
@@ -51,6 +82,18 @@ class SurvivorBot:
         new_x, new_y = self.x + dx, self.y + dy
         grid.move_entity(self, new_x, new_y)
 
+    def follow_path(self, target, grid):
+        """Takes the next step of a cached plan to target, re-planning only when the goal changed
+        or the next cell got blocked. Returns False when no path exists."""
+        goal = (target.x, target.y)
+        if not self.path or self.path[0] != goal or grid.blocked[self.path[-1][1] * grid.width + self.path[-1][0]]:
+            plan = grid.get_planner().plan((self.x, self.y), goal)
+            if not plan: self.path = None; return False
+            self.path = plan[:0:-1]
+        x, y = self.path.pop()
+        grid.move_entity(self, x, y)
+        return True
+
     def handle_arrival(self, entity, grid):
         if entity.type == 'recharge_station':
             self.energy = self.max_energy
@@ -60,23 +103,35 @@ class SurvivorBot:
         self.target_entity = None
 
     def find_nearest_target(self, grid, target_type):
-        targets = [e for e in grid.entities if e.type == target_type]
-        return min(targets, key=lambda t:math.hypot(self.x-t.x, self.y-t.y)) if targets else None
+        return grid.find_nearest(target_type, self.x, self.y)
 
     def pickup_part(self, part, grid):
-        if not self.carrying_part and part in grid.entities:
+        if not self.carrying_part and grid.contains(part):
             self.carrying_part = part
-            grid.remove_entity(part); self.apply_enhancement(part)
+            grid.remove_entity(part); self.apply_enhancement(part, grid)
             
-    def apply_enhancement(self, part):
-        self.active_enhancements[part.enhancement_type] = getattr(part, 'max_corrosion', 1000)
+    def apply_enhancement(self, part, grid):
+        """Grants the part's enhancement for max_corrosion ticks after this one. Picking up the
+        same kind again renews it; the timer set for the old expiry then does nothing."""
+        expires = grid.tick + getattr(part, 'max_corrosion', 1000) + 1
+        self.active_enhancements[part.enhancement_type] = expires
+        grid.timers.schedule(expires, self.expire_enhancement, part.enhancement_type, expires)
         self.recalculate_stats()
 
-    def update_enhancements(self):
-        expired = [e for e, life in self.active_enhancements.items() if life <= 0]
-        for e in expired: del self.active_enhancements[e]
-        if expired: self.recalculate_stats()
-        for e in self.active_enhancements: self.active_enhancements[e] -= 1
+    def schedule_expiries(self, grid):
+        """Schedules the expiry of every active enhancement, for a bot (re)joining a grid."""
+        for enhancement, expires in self.active_enhancements.items():
+            grid.timers.schedule(expires, self.expire_enhancement, enhancement, expires)
+
+    def expire_enhancement(self, enhancement, expires):
+        if self.active_enhancements.get(enhancement) == expires:
+            del self.active_enhancements[enhancement]
+            self.recalculate_stats()
+
+    def enhancement_life(self, enhancement, grid):
+        """Ticks the enhancement still has to run after this one (0 on its last tick), or None."""
+        expires = self.active_enhancements.get(enhancement)
+        return None if expires is None else expires - 1 - grid.tick
 
     def recalculate_stats(self):
         self.max_energy = self.base_max_energy + (100 if 'energy_capacity' in self.active_enhancements else 0)
@@ -84,27 +139,26 @@ class SurvivorBot:
         self.vision = self.base_vision + (3 if 'vision' in self.active_enhancements else 0)
 
 class GathererBot(SurvivorBot):
+    __slots__ = ()
+    type = 'gatherer_bot'; color = "light sea green"
+
     def __init__(self, bot_id, x, y):
         # **THE FIX:** Increased starting energy
         super().__init__(bot_id, x, y, energy=500)
-        self.type = 'gatherer_bot'; self.color = "light sea green"
 
 class RepairBot(SurvivorBot):
+    __slots__ = ()
+    type = 'repair_bot'; color = "cornflower blue"
+
     def __init__(self, bot_id, x, y):
         # **THE FIX:** Increased starting energy
         super().__init__(bot_id, x, y, energy=500)
-        self.type = 'repair_bot'; self.color = "cornflower blue"
 
 class PlayerBot(SurvivorBot):
+    __slots__ = ()
+    type = 'player_bot'; color = "orange"
+
     def __init__(self, bot_id, x, y):
         # **THE FIX:** Increased starting energy
         super().__init__(bot_id, x, y, energy=500)
-        self.type = 'player_bot'; self.color = "orange"
         self.energy_depletion_rate = 0.08
-    
-    def update(self, grid):
-        if self.energy <= 0: return
-        if self.stunned > 0: self.stunned -= 1; return
-        self.energy -= self.energy_depletion_rate
-        self.update_enhancements()
-        self.execute_state_action(grid)
\ No newline at end of file
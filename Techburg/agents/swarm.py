@@ -1,25 +1,64 @@
 # Techburg/agents/swarm.py
-import math, random
+from events import DEBUG, INFO
+
+MOVES = [(0,1), (0,-1), (1,0), (-1,0)]
 
 class ScavengerSwarm:
+    __slots__ = ('x', 'y', 'size', 'damage_radius')
+    type, color = 'swarm', 'lawn green'
+
     def __init__(self, x, y, size=2):
         self.x, self.y, self.size = x, y, size
-        self.type, self.color = 'swarm', 'lawn green'
         self.damage_radius = 1.5
 
     def update(self, grid):
-        for bot in grid.get_all_bots():
-            if math.hypot(self.x-bot.x, self.y-bot.y) <= self.damage_radius:
+        field = grid.swarm_field
+        if field:
+            # With SWARM_DYNAMICS the first swarm to act deals the whole tick's decay damage.
+            if field.tick != grid.tick: field.apply_decay(grid)
+        else:
+            for bot in grid.bots_within(self.x, self.y, self.damage_radius):
                 damage = self.size * 2
                 bot.energy -= damage
-                grid.log(f"[SWARM] Dealt {damage} decay damage to {bot.bot_id}.")
+                grid.events.emit('swarm', DEBUG, "Dealt {} decay damage to {}.", damage, bot.bot_id)
 
         self.move(grid)
+        if field and self.merge(grid): return
         entity = grid.get_entity(self.x, self.y)
         if entity and entity.type == 'spare_part':
             grid.remove_entity(entity); self.size += 1
-            grid.log(f"[SWARM] Consumed a part at ({self.x},{self.y}). Size is now {self.size}.")
+            grid.parts_lost_to_swarms += 1
+            grid.events.emit('swarm', INFO, "Consumed a part at ({},{}). Size is now {}.", self.x, self.y, self.size)
+        if field: self.replicate(grid)
 
     def move(self, grid):
-        dx, dy = random.choice([(0,1), (0,-1), (1,0), (-1,0)])
-        grid.move_entity(self, self.x + dx, self.y + dy)
\ No newline at end of file
+        dx, dy = grid.rng.choice(MOVES)
+        grid.move_entity(self, self.x + dx, self.y + dy)
+
+    def merge(self, grid):
+        """Joins a swarm already on this cell, if there is one. Returns True if this swarm is gone."""
+        other = swarm_at(grid, self.x, self.y, self)
+        if other is None: return False
+        other.size += self.size
+        grid.remove_entity(self)
+        grid.events.emit('swarm', DEBUG, "Swarms merged at ({},{}). Size is now {}.", self.x, self.y, other.size)
+        return True
+
+    def replicate(self, grid):
+        """At SWARM_REPLICATION_THRESHOLD units or more, splits off half of them onto a neighbouring
+        cell with SWARM_REPLICATION_CHANCE each tick. A swarm already there takes them in."""
+        settings = grid.settings
+        # A single unit cannot split, whatever the threshold.
+        if self.size < max(2, settings.SWARM_REPLICATION_THRESHOLD) or grid.rng.random() >= settings.SWARM_REPLICATION_CHANCE: return
+        dx, dy = grid.rng.choice(MOVES)
+        x, y = (self.x + dx) % grid.width, (self.y + dy) % grid.height
+        half, self.size = self.size // 2, self.size - self.size // 2
+        other = swarm_at(grid, x, y)
+        if other: other.size += half
+        else: grid.add_entity(ScavengerSwarm(x, y, half))
+        grid.events.emit('swarm', INFO, "A swarm split at ({},{}).", x, y)
+
+def swarm_at(grid, x, y, besides=None):
+    for entity in grid.cells.get((x, y), ()):
+        if entity.type == 'swarm' and entity is not besides: return entity
+    return None
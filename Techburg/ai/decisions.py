@@ -0,0 +1,46 @@
+# Techburg/ai/decisions.py
+from itertools import islice
+
+class DecisionScheduler:
+    """Spreads bot goal decisions (get_new_goal, and dropping the cached A* path) over ticks.
+    Bots ask for a decision only when something relevant happened: their target is gone,
+    they arrived, their energy fell below the recharge threshold, or a threat came within
+    BOT_THREAT_DETECTION_RADIUS. At the start of each tick up to `budget` waiting bots
+    decide, first come first served; the rest keep walking to their current target (or
+    wait, if they have none) until their turn comes. A threatened bot picks a target away
+    from the threats (see SurvivorBot.avoid_threats)."""
+
+    def __init__(self, budget, threat_radius):
+        self.budget, self.threat_radius = budget, threat_radius
+        self.pending = {}      # bots waiting for a decision, in request order
+        self.threatened = set()  # bots within threat radius of a threat at the last check
+
+    def request(self, bot):
+        if bot not in self.pending: self.pending[bot] = None
+
+    def run(self, grid):
+        """Called by Grid.update_world before the agents act. Returns how many bots decided."""
+        self._check_threats(grid)
+        decided = 0
+        for bot in list(islice(self.pending, self.budget)):
+            del self.pending[bot]
+            if grid.contains(bot):
+                bot.decide(grid)
+                decided += 1
+        return decided
+
+    def _check_threats(self, grid):
+        # The threats look around them, instead of every bot looking for threats.
+        from grid import BOT_TYPES
+        radius = self.threat_radius
+        reach, limit = int(radius), radius * radius
+        indexes = [index for index in map(grid.get_index, BOT_TYPES) if index.order]
+        near = set()
+        for threat in grid.get_threats():
+            tx, ty = threat.x, threat.y
+            for index in indexes:
+                for bot in index.candidates(tx, ty, reach):
+                    if (bot.x - tx) ** 2 + (bot.y - ty) ** 2 > limit or bot in near or not hasattr(bot, 'decide'): continue
+                    near.add(bot)
+                    if bot not in self.threatened: self.request(bot)
+        self.threatened = near
@@ -0,0 +1,116 @@
+# Techburg/ai/distance_field.py
+import heapq
+from array import array
+from collections import deque
+
+UNREACHED = 2**31 - 1
+# Bots step diagonally, so distances are counted over the 8-neighbourhood.
+NEIGHBOURS = ((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+class DistanceField:
+    """Multi-source BFS field over the grid. For every cell it keeps the step distance to,
+    and the identity of, the nearest source entity. Sources are expected not to move;
+    adding or removing one only repairs the cells whose nearest source changes."""
+
+    def __init__(self, width, height):
+        self.width, self.height = width, height
+        size = width * height
+        self.distance = array('i', [UNREACHED]) * size
+        self.owner = [None] * size
+        self.sources = {}  # source -> cell index
+        self.at = {}       # cell index -> sources on that cell
+
+    def neighbours(self, i):
+        width = self.width
+        x, y = i % width, i // width
+        if 0 < x < width - 1 and 0 < y < self.height - 1:
+            return (i - width - 1, i - width, i - width + 1, i - 1, i + 1, i + width - 1, i + width, i + width + 1)
+        return [ny * width + nx for nx, ny in ((x + dx, y + dy) for dx, dy in NEIGHBOURS)
+                if 0 <= nx < width and 0 <= ny < self.height]
+
+    def rebuild(self, sources):
+        size = self.width * self.height
+        self.distance = array('i', [UNREACHED]) * size
+        self.owner = [None] * size
+        self.sources, self.at = {}, {}
+        queue = deque()
+        for source in sources:
+            i = self._register(source)
+            if self.owner[i] is None:
+                self.distance[i], self.owner[i] = 0, source
+                queue.append(i)
+        self._spread(queue)
+
+    def add_source(self, source):
+        i = self._register(source)
+        if self.distance[i] > 0:
+            self.distance[i], self.owner[i] = 0, source
+            self._spread(deque([i]))
+
+    def remove_source(self, source):
+        i = self.sources.pop(source, None)
+        if i is None: return
+        self.at[i].remove(source)
+        if not self.at[i]: del self.at[i]
+        if self.owner[i] is not source: return  # another source on the same cell owns it
+
+        # Clear the region the removed source owned, then refill it from its border.
+        owner, distance, neighbours = self.owner, self.distance, self.neighbours
+        region, stack = [i], [i]
+        owner[i] = None
+        while stack:
+            for n in neighbours(stack.pop()):
+                if owner[n] is source:
+                    owner[n] = None
+                    region.append(n); stack.append(n)
+
+        border = {}
+        for r in region:
+            distance[r] = UNREACHED
+            if r in self.at:
+                distance[r], owner[r] = 0, self.at[r][0]
+                border[r] = 0
+        for r in region:
+            for n in neighbours(r):
+                if owner[n] is not None: border[n] = distance[n]
+        frontier = [(d, n) for n, d in border.items()]
+        heapq.heapify(frontier)
+        while frontier:
+            d, i = heapq.heappop(frontier)
+            if d > distance[i]: continue
+            d += 1
+            for n in neighbours(i):
+                if distance[n] > d:
+                    distance[n], owner[n] = d, owner[i]
+                    heapq.heappush(frontier, (d, n))
+
+    def nearest(self, x, y):
+        return self.owner[y * self.width + x]
+
+    def distance_at(self, x, y):
+        d = self.distance[y * self.width + x]
+        return None if d == UNREACHED else d
+
+    def next_step(self, x, y):
+        """Direction (dx, dy) of a shortest step towards the nearest source, or None.
+        On the open 8-connected grid stepping straight at the owner is always a shortest
+        step, so the direction is derived from the owner instead of stored per cell."""
+        owner = self.nearest(x, y)
+        if owner is None: return None
+        return (owner.x > x) - (owner.x < x), (owner.y > y) - (owner.y < y)
+
+    def _register(self, source):
+        i = source.y * self.width + source.x
+        self.sources[source] = i
+        self.at.setdefault(i, []).append(source)
+        return i
+
+    def _spread(self, queue):
+        distance, owner = self.distance, self.owner
+        while queue:
+            i = queue.popleft()
+            d = distance[i] + 1
+            for n in self.neighbours(i):
+                if distance[n] > d:
+                    distance[n], owner[n] = d, owner[i]
+                    queue.append(n)
@@ -0,0 +1,53 @@
+# Techburg/ai/neighbours.py
+
+class NeighbourIndex:
+    """Uniform bucket grid over the entities of one type. Each bucket covers a square of
+    bucket_size cells and holds its entities in arrival order, so a query only visits
+    the buckets around the query cell. Positions are always in-grid (the grid wraps
+    them in move_entity), so an entity crossing the edge simply changes bucket."""
+
+    def __init__(self, width, height, bucket_size):
+        self.width, self.height, self.size = width, height, bucket_size
+        self.columns = -(-width // bucket_size)
+        self.rows = -(-height // bucket_size)
+        self.buckets = [{} for _ in range(self.columns * self.rows)]
+        self.order = {}  # entity -> arrival number, the grid's insertion order for tie-breaks
+        self.counter = 0
+
+    def bucket_of(self, x, y):
+        return (y // self.size) * self.columns + x // self.size
+
+    def add(self, entity):
+        self.order[entity] = self.counter
+        self.counter += 1
+        self.buckets[self.bucket_of(entity.x, entity.y)][entity] = None
+
+    def remove(self, entity):
+        if self.order.pop(entity, None) is None: return
+        del self.buckets[self.bucket_of(entity.x, entity.y)][entity]
+
+    def move(self, entity, x, y):
+        """Called before entity.x and entity.y change to (x, y)."""
+        old, new = self.bucket_of(entity.x, entity.y), self.bucket_of(x, y)
+        if old != new and entity in self.order:
+            del self.buckets[old][entity]
+            self.buckets[new][entity] = None
+
+    def candidates(self, x, y, reach, wrap=False):
+        """Every entity within reach cells of (x, y) along both axes, and possibly a few more."""
+        buckets, columns = self.buckets, self.columns
+        xs = self._span(x, reach, self.width, self.columns, wrap)
+        for row in self._span(y, reach, self.height, self.rows, wrap):
+            row *= columns
+            for column in xs:
+                yield from buckets[row + column]
+
+    def _span(self, c, reach, length, count, wrap):
+        """Bucket coordinates along one axis that cover cells c-reach .. c+reach."""
+        size = self.size
+        lo, hi = c - reach, c + reach
+        if not wrap: return range(max(lo, 0) // size, min(hi, length - 1) // size + 1)
+        if hi - lo + 1 >= length: return range(count)
+        lo, hi = lo % length, hi % length
+        if lo <= hi: return range(lo // size, hi // size + 1)
+        return sorted(set(range(lo // size, count)) | set(range(0, hi // size + 1)))
@@ -1,32 +1,125 @@
 # Techburg/ai/pathfinding.py
 import heapq
+from array import array
+from collections import deque
+
+# Searches kept, and cells reached by all of them together; past either, the least recently
+# used searches are dropped (the one just used is always kept). At about 130 bytes a reached
+# cell, the cache stays under about 26 MB whatever the map size.
+CACHE_LIMIT = 64
+CACHE_CELLS = 200_000
+# The steps bots take (see SurvivorBot.move_towards): straight and diagonal.
+MOVES = ((0, -1), (0, 1), (-1, 0), (1, 0), (-1, -1), (1, -1), (-1, 1), (1, 1))
+
+class GoalSearch:
+    """A breadth-first search run backwards from one goal cell: parent[i] is the next cell
+    from i towards the goal, for every cell reached so far (and only those, so a search costs
+    memory for the area it covered, not the map). It stops once the start asked for is
+    reached and goes on from its frontier for the next one, so every bot heading for the same
+    goal shares it. Blocked cells are reached (a bot's start is blocked by the bot itself)
+    but not expanded."""
+    __slots__ = ('goal', 'parent', 'frontier')
+
+    def __init__(self, width, goal):
+        self.goal = goal
+        index = goal[1] * width + goal[0]
+        self.parent = {index: -1}
+        self.frontier = deque([index])
+
+    def reach(self, target, grid):
+        """Expands the search until target is reached. Returns False if it never is."""
+        parent, frontier = self.parent, self.frontier
+        width, height, blocked = grid.width, grid.height, grid.blocked
+        while target not in parent:
+            if not frontier: return False
+            i = frontier.popleft()
+            x, y = i % width, i // width
+            for dx, dy in MOVES:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < width and 0 <= ny < height): continue
+                n = ny * width + nx
+                if n in parent: continue
+                parent[n] = i
+                if not blocked[n]: frontier.append(n)
+        return True
+
+    def path_from(self, start, grid):
+        """The path from start to the goal as a list of (x, y), or None if start cannot be
+        reached or a cell on the way has been blocked since it was searched."""
+        width, blocked, parent = grid.width, grid.blocked, self.parent
+        i = start[1] * width + start[0]
+        if not self.reach(i, grid): return None
+        path = [start]
+        i = parent[i]
+        while i != -1:
+            step = (i % width, i // width)
+            if blocked[i] and step != self.goal: return None
+            path.append(step)
+            i = parent[i]
+        return path
+
+class PathPlanner:
+    """Shortest paths over the grid's blocked-cell counts, using flat arrays indexed by
+    y*width+x. plan() keeps one GoalSearch per goal; find_path() is a one-off A*, whose
+    arrays are allocated once per grid and told apart by a search stamp, so nothing is
+    cleared between calls."""
+
+    def __init__(self, grid):
+        self.grid = grid
+        size = grid.width * grid.height
+        self.g = array('i', [0]) * size
+        self.parent = array('i', [0]) * size
+        self.stamp = array('i', [0]) * size
+        self.search_id = 0
+        self.cache = {}  # goal -> GoalSearch, least recently used first
+
+    def find_path(self, start, end):
+        """Shortest 8-connected path from start to end as a list of (x, y), or None."""
+        grid = self.grid
+        width, height, blocked = grid.width, grid.height, grid.blocked
+        (sx, sy), (ex, ey) = start, end
+        if not (grid.is_valid(sx, sy) and grid.is_valid(ex, ey)): return None
+        g, parent, stamp = self.g, self.parent, self.stamp
+        self.search_id += 1; search = self.search_id
+        start_i, end_i = sy * width + sx, ey * width + ex
+        g[start_i], parent[start_i], stamp[start_i] = 0, -1, search
+        open_list = [(max(abs(sx - ex), abs(sy - ey)), 0, start_i)]
+        while open_list:
+            _, cost, i = heapq.heappop(open_list)
+            if cost > g[i]: continue  # a cheaper entry for this cell was already expanded
+            if i == end_i:
+                path = []
+                while i != -1: path.append((i % width, i // width)); i = parent[i]
+                return path[::-1]
+            x, y = i % width, i // width
+            cost += 1
+            for dx, dy in MOVES:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < width and 0 <= ny < height): continue
+                n = ny * width + nx
+                if blocked[n]: continue
+                if stamp[n] == search and g[n] <= cost: continue
+                g[n], parent[n], stamp[n] = cost, i, search
+                heapq.heappush(open_list, (cost + max(abs(nx - ex), abs(ny - ey)), cost, n))
+        return None
+
+    def plan(self, start, end):
+        """Shortest path from start to end, from the goal's shared search. The search is started
+        over when the path it gives crosses a cell blocked since, or when it cannot reach start
+        (cells may have opened up since it ran). The cache is bounded by CACHE_LIMIT and CACHE_CELLS."""
+        grid = self.grid
+        if not (grid.is_valid(*start) and grid.is_valid(*end)): return None
+        search = self.cache.pop(end, None)
+        path = search.path_from(start, grid) if search else None
+        if path is None:
+            search = GoalSearch(grid.width, end)
+            path = search.path_from(start, grid)
+        cache = self.cache
+        cells = len(search.parent) + sum(len(kept.parent) for kept in cache.values())
+        while cache and (len(cache) >= CACHE_LIMIT or cells > CACHE_CELLS):
+            cells -= len(cache.pop(next(iter(cache))).parent)
+        cache[end] = search
+        return path
 
 def find_path(grid, start, end):
-    class Node:
-        def __init__(self, parent=None, position=None):
-            self.parent, self.position = parent, position; self.g, self.h, self.f = 0, 0, 0
-        def __eq__(self, other): return self.position == other.position
-        def __lt__(self, other): return self.f < other.f
-        def __hash__(self): return hash(self.position)
-    start_node, end_node = Node(None, start), Node(None, end)
-    open_list, closed_set = [], set()
-    heapq.heappush(open_list, (start_node.f, start_node))
-    while open_list:
-        current_node = heapq.heappop(open_list)[1]
-        if current_node.position in closed_set: continue
-        closed_set.add(current_node.position)
-        if current_node == end_node:
-            path = []; current = current_node
-            while current is not None: path.append(current.position); current = current.parent
-            return path[::-1]
-        for new_position in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
-            node_position = (current_node.position[0] + new_position[0], current_node.position[1] + new_position[1])
-            if not grid.is_valid(node_position[0], node_position[1]): continue
-            entity = grid.get_entity(node_position[0], node_position[1])
-            if entity and entity.type not in ['spare_part', 'recharge_station']: continue
-            child = Node(current_node, node_position)
-            child.g = current_node.g + 1
-            child.h = abs(child.position[0] - end_node.position[0]) + abs(child.position[1] - end_node.position[1])
-            child.f = child.g + child.h
-            heapq.heappush(open_list, (child.f, child))
-    return None
\ No newline at end of file
+    return grid.get_planner().find_path(start, end)
@@ -0,0 +1,48 @@
+# Techburg/ai/swarm_field.py
+from array import array
+from events import DEBUG
+
+class SwarmField:
+    """Swarm units per cell, for decay damage when swarms replicate and merge (SWARM_DYNAMICS).
+    Swarms sharing a cell merge, so there is at most one swarm per occupied cell and the
+    field is rebuilt from them once per tick, before the first swarm moves. Each bot then
+    reads the cells within the decay radius around it: a tick costs O(occupied cells + bots)
+    however many units the swarms hold. The damage is what each swarm dealing 2 per unit to
+    every bot within its radius would deal, as the radius does not wrap around the edges."""
+
+    def __init__(self, width, height, radius):
+        self.width, self.height = width, height
+        reach = int(radius)
+        self.offsets = [(dx, dy) for dy in range(-reach, reach + 1) for dx in range(-reach, reach + 1)
+                        if dx * dx + dy * dy <= radius * radius]
+        self.units = array('i', [0]) * (width * height)
+        self.occupied = []  # cells with units, so clearing the field does not touch the rest
+        self.tick = None    # tick the field was built and the damage dealt for
+
+    def build(self, swarms):
+        units, width = self.units, self.width
+        for i in self.occupied: units[i] = 0
+        self.occupied = []
+        for swarm in swarms:
+            i = swarm.y * width + swarm.x
+            if not units[i]: self.occupied.append(i)
+            units[i] += swarm.size
+
+    def units_near(self, x, y):
+        units, width, height = self.units, self.width, self.height
+        total = 0
+        for dx, dy in self.offsets:
+            cx, cy = x + dx, y + dy
+            if 0 <= cx < width and 0 <= cy < height: total += units[cy * width + cx]
+        return total
+
+    def apply_decay(self, grid):
+        """Builds the field for this tick and deals the decay damage to every bot in reach."""
+        self.tick = grid.tick
+        self.build(grid.get_by_type('swarm'))
+        if not self.occupied: return
+        for bot in grid.get_all_bots():
+            damage = 2 * self.units_near(bot.x, bot.y)
+            if damage:
+                bot.energy -= damage
+                grid.events.emit('swarm', DEBUG, "Dealt {} decay damage to {}.", damage, bot.bot_id)
@@ -0,0 +1,46 @@
+# Techburg/benchmarks/bench_backends.py
+"""
+Compares ticks/sec of the object and vectorized (NumPy) backends as agents grow.
+Run with: python Techburg/benchmarks/bench_backends.py
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from simulation import Simulation
+
+AGENTS = [1000, 5000, 10000, 20000]
+TICKS = 5
+# Ticks run before timing, past the opening rush where every bot picks its first goal.
+WARMUP = 5
+
+def settings_for(num_agents):
+    # Agents are bots, drones and swarms; parts and stations scale along with them.
+    side = int((num_agents * 8) ** 0.5)
+    return config.load({
+        'GRID_WIDTH': side, 'GRID_HEIGHT': side,
+        'NUM_GATHERERS': num_agents * 6 // 10, 'NUM_REPAIR_BOTS': num_agents * 2 // 10,
+        'NUM_DRONES': num_agents // 10, 'NUM_SWARMS': num_agents // 10,
+        'NUM_PARTS': num_agents, 'NUM_STATIONS': max(1, num_agents // 100),
+    })
+
+def ticks_per_second(settings, backend, ticks=TICKS):
+    sim = Simulation(settings, seed=0, backend=backend)
+    for _ in range(WARMUP): sim.step()
+    start = time.perf_counter()
+    for _ in range(ticks): sim.step()
+    return ticks / (time.perf_counter() - start)
+
+def main():
+    print(f"{'agents':>8} {'object t/s':>12} {'vector t/s':>12} {'speedup':>8}")
+    for n in AGENTS:
+        settings = settings_for(n)
+        obj = ticks_per_second(settings, 'object')
+        vec = ticks_per_second(settings, 'vectorized')
+        print(f"{n:>8} {obj:>12.2f} {vec:>12.2f} {vec / obj:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+# Techburg/benchmarks/bench_grid.py
+"""
+Measures how world tick time grows with the number of entities.
+Run with: python Techburg/benchmarks/bench_grid.py
+"""
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grid import Grid
+
+SCALES = [100, 500, 1000, 2000, 4000]
+TICKS = 20
+
+def build_world(num_entities):
+    # Keep roughly the default mix of parts, bots and threats, at ~25% fill.
+    side = int((num_entities * 4) ** 0.5)
+    grid = Grid(side, side, seed=0)
+    grid.populate_world(
+        num_parts=num_entities // 2, num_stations=max(1, num_entities // 20),
+        num_drones=num_entities // 20, num_swarms=num_entities // 25,
+        num_gatherers=num_entities // 5, num_repair_bots=num_entities // 10
+    )
+    return grid
+
+def time_ticks(grid, ticks=TICKS):
+    start = time.perf_counter()
+    for _ in range(ticks): grid.update_world()
+    return (time.perf_counter() - start) / ticks
+
+def main():
+    print(f"{'entities':>10} {'grid':>10} {'ms/tick':>10}")
+    for n in SCALES:
+        grid = build_world(n)
+        count = len(grid.entities)
+        ms = time_ticks(grid) * 1000
+        print(f"{count:>10} {f'{grid.width}x{grid.height}':>10} {ms:>10.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+# Techburg/benchmarks/bench_memory.py
+"""
+Reports memory per entity, for sizing workers. Counts everything an entity
+allocates (instance, attribute dicts, enhancement dict), measured with tracemalloc.
+
+Figures are compared with a baseline, by default memory_baseline.json next to this
+file, which holds the figures of the entity layout before the classes got __slots__
+(this script run on that tree with --save-baseline). Byte counts depend on the Python
+version, so a baseline is only compared on the version that wrote it.
+Run with: python Techburg/benchmarks/bench_memory.py [--baseline PATH] [--save-baseline]
+"""
+import argparse
+import json
+import platform
+import sys
+import os
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from simulation import Simulation
+from entities import SparePart, RechargeStation
+from agents.survivor_bot import SurvivorBot, GathererBot
+from agents.drone import MalfunctioningDrone
+from agents.swarm import ScavengerSwarm
+
+COUNT = 100000
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'memory_baseline.json')
+
+FACTORIES = [
+    ('SparePart', lambda i: SparePart(('small', 'medium', 'large')[i % 3], i, i)),
+    ('RechargeStation', lambda i: RechargeStation(i, i)),
+    ('SurvivorBot', lambda i: SurvivorBot('bot', i, i, 500)),
+    ('GathererBot', lambda i: GathererBot('gatherer', i, i)),
+    ('MalfunctioningDrone', lambda i: MalfunctioningDrone(i, i)),
+    ('ScavengerSwarm', lambda i: ScavengerSwarm(i, i)),
+]
+
+def measure(build):
+    """Bytes allocated by build(), and the object it returned (kept alive while measuring)."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+def bytes_per_instance(factory, count=COUNT):
+    holder = [None] * count
+    def build():
+        for i in range(count): holder[i] = factory(i)
+    size, _ = measure(build)
+    return size / count
+
+def bytes_per_world_entity():
+    settings = config.load({'GRID_WIDTH': 400, 'GRID_HEIGHT': 400, 'NUM_PARTS': 40000, 'NUM_GATHERERS': 4000})
+    size, sim = measure(lambda: Simulation(settings, seed=0))
+    return size / len(sim.grid.entities), len(sim.grid.entities)
+
+def run():
+    """Bytes per instance of every entity class, and per entity of a populated world."""
+    results = {name: round(bytes_per_instance(factory)) for name, factory in FACTORIES}
+    per_entity, count = bytes_per_world_entity()
+    results['whole world'] = round(per_entity)
+    return {'python': platform.python_version(), 'world_entities': count, 'results': results}
+
+def report(document, baseline):
+    """The figures next to the baseline's, with the change in percent."""
+    old = baseline['results'] if baseline else {}
+    lines = [f"{'entity':<22} {'bytes':>8} {'baseline':>9} {'change':>8}"]
+    for name, size in document['results'].items():
+        before = old.get(name)
+        change = f"{(size - before) / before:+.0%}" if before else '-'
+        lines.append(f"{name:<22} {size:>8} {before if before is not None else '-':>9} {change:>8}")
+    lines.append(f"(whole world: {document['world_entities']} entities, including grid indexes)")
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure memory per entity against a baseline.")
+    parser.add_argument('--baseline', default=BASELINE, help="Figures to compare against (default: the pre-slots layout)")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run's figures as the baseline")
+    args = parser.parse_args(argv)
+
+    document = run()
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f: json.dump(document, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f: baseline = json.load(f)
+        if baseline.get('python') != document['python']:
+            print(f"Baseline {args.baseline} was written by Python {baseline.get('python')}; not comparing.")
+            baseline = None
+    print(report(document, baseline))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+# Techburg/benchmarks/suite.py
+"""
+Regression benchmarks for the core simulation paths: placing entities on a crowded
+map, world ticks, A* on mazes, nearest-target lookups and rendering. Every case
+reports seconds per operation (lower is better), the best of a few repeats.
+
+Results are saved as JSON and compared against a stored baseline; a case slower than
+the baseline by more than the threshold counts as a regression. Baselines are only
+comparable on the machine (and Python) that wrote them.
+Run with: python run_benchmarks.py (see --help)
+"""
+import json
+import os
+import platform
+import sys
+import time
+from functools import partial
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grid import Grid
+from renderer import GridRenderer
+from profiler import clock
+from benchmarks.bench_grid import build_world
+
+FORMAT_VERSION = 1
+REPEATS = 3
+THRESHOLD = 0.25  # 25% slower than the baseline is a regression
+
+# Sizes per case group, full and --quick.
+FILL_RATIOS = (0.5, 0.9, 0.99)
+POPULATE_SIDE = {'full': 100, 'quick': 30}
+TICK_ENTITIES = {'full': (500, 2000, 8000), 'quick': (200,)}
+TICKS = {'full': 20, 'quick': 3}
+MAZE_SIDES = {'full': (51, 101, 201), 'quick': (21,)}
+NEAREST_WORLD = {'full': 4000, 'quick': 400}
+RENDER_WORLD = {'full': 4000, 'quick': 400}
+
+class NullCanvas:
+    """Takes canvas calls and does nothing, so render cases time the renderer itself."""
+    def __init__(self):
+        self.next_id = 0
+    def _create(self, *coords, **options):
+        self.next_id += 1
+        return self.next_id
+    create_line = create_rectangle = _create
+    def coords(self, item, *coords): pass
+    def itemconfigure(self, item, **options): pass
+    def delete(self, item): pass
+
+def maze(side):
+    """A perfect maze (randomised depth-first carving) on an odd-sided grid, walls blocked.
+    Walls are set in the blocked-cell counts directly, which is all the planner reads."""
+    grid = Grid(side, side, seed=side)
+    blocked = grid.blocked
+    for i in range(side * side): blocked[i] = 1
+    stack = [(1, 1)]
+    blocked[side + 1] = 0
+    while stack:
+        x, y = stack[-1]
+        options = [(x + dx, y + dy, dx, dy) for dx, dy in ((0, 2), (0, -2), (2, 0), (-2, 0))
+                   if 0 < x + dx < side - 1 and 0 < y + dy < side - 1 and blocked[(y + dy) * side + x + dx]]
+        if not options: stack.pop(); continue
+        nx, ny, dx, dy = grid.rng.choice(options)
+        blocked[(y + dy // 2) * side + x + dx // 2] = blocked[ny * side + nx] = 0
+        stack.append((nx, ny))
+    return grid
+
+# --- Cases: each sets up once and returns a run() giving seconds per operation ---
+
+def populate(side, fill):
+    """Placing a world that fills the given share of the map (add_at_empty does the placing)."""
+    def run():
+        grid = Grid(side, side, seed=0)
+        start = clock()
+        grid.populate_world(num_parts=int(side * side * fill) - 12, num_stations=4, num_drones=2,
+                            num_swarms=2, num_gatherers=2, num_repair_bots=1)
+        return clock() - start
+    return run
+
+def ticks(entities, count):
+    def run():
+        grid = build_world(entities)
+        start = clock()
+        for _ in range(count): grid.update_world()
+        return (clock() - start) / count
+    return run
+
+def find_path(side):
+    grid = maze(side)
+    planner = grid.get_planner()
+    def run():
+        start = clock()
+        path = planner.find_path((1, 1), (side - 2, side - 2))
+        assert path, "maze has no way through"
+        return clock() - start
+    return run
+
+def find_nearest(entities, target_type):
+    grid = build_world(entities)
+    bots = grid.get_all_bots()
+    grid.find_nearest(target_type, 0, 0)  # builds the field, so runs time lookups only
+    def run():
+        start = clock()
+        for bot in bots: bot.find_nearest_target(grid, target_type)
+        return (clock() - start) / len(bots)
+    return run
+
+def render_reset(entities):
+    grid = build_world(entities)
+    def run():
+        start = clock()
+        GridRenderer(NullCanvas(), grid, 4)
+        return clock() - start
+    return run
+
+def render_frame(entities, count):
+    def run():
+        grid = build_world(entities)
+        renderer = GridRenderer(NullCanvas(), grid, 4)
+        spent = 0.0
+        for _ in range(count):
+            grid.update_world()
+            start = clock()
+            renderer.refresh()
+            spent += clock() - start
+        return spent / count
+    return run
+
+def cases(quick=False):
+    """[(name, unit, case)] of every benchmark; case() does the setup and returns the run."""
+    size = 'quick' if quick else 'full'
+    found = []
+    for fill in FILL_RATIOS:
+        found.append((f'populate/fill={fill:.2f}', 'world', partial(populate, POPULATE_SIDE[size], fill)))
+    for n in TICK_ENTITIES[size]:
+        found.append((f'update_world/entities={n}', 'tick', partial(ticks, n, TICKS[size])))
+    for side in MAZE_SIDES[size]:
+        found.append((f'find_path/maze={side}', 'path', partial(find_path, side)))
+    for target_type in ('spare_part', 'recharge_station'):
+        found.append((f'find_nearest_target/{target_type}', 'query', partial(find_nearest, NEAREST_WORLD[size], target_type)))
+    found.append(('render/reset', 'frame', partial(render_reset, RENDER_WORLD[size])))
+    found.append(('render/frame', 'frame', partial(render_frame, RENDER_WORLD[size], TICKS[size])))
+    return found
+
+def run(quick=False, only=None, repeats=REPEATS, progress=None):
+    """Runs the cases whose name contains `only` (all by default). Returns the results document."""
+    results = {}
+    for name, unit, case in cases(quick):
+        if only and only not in name: continue
+        case = case()
+        seconds = min(case() for _ in range(repeats))
+        results[name] = {'seconds': seconds, 'unit': unit}
+        if progress: progress(name, seconds, unit)
+    return {
+        'format': FORMAT_VERSION,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'machine': platform.platform(),
+        'quick': quick,
+        'results': results,
+    }
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """[(name, seconds, baseline seconds or None, ratio or None, status)] for every result.
+    status is 'regressed', 'improved', 'ok' or 'new' (not in the baseline)."""
+    rows = []
+    old = baseline.get('results', {}) if baseline else {}
+    for name, result in results['results'].items():
+        seconds = result['seconds']
+        if name not in old or not old[name]['seconds']:
+            rows.append((name, seconds, None, None, 'new')); continue
+        ratio = seconds / old[name]['seconds']
+        status = 'regressed' if ratio > 1 + threshold else 'improved' if ratio < 1 - threshold else 'ok'
+        rows.append((name, seconds, old[name]['seconds'], ratio, status))
+    return rows
+
+def duration(seconds):
+    """seconds in ms, or in us when that would round to nothing; 12 characters wide."""
+    return f"{1000 * seconds:10.3f}ms" if seconds >= 1e-4 else f"{1e6 * seconds:10.3f}us"
+
+def report(rows):
+    lines = [f"{'benchmark':<36} {'time':>12} {'baseline':>12} {'change':>8}  status"]
+    for name, seconds, base, ratio, status in rows:
+        base_text = duration(base) if base is not None else f"{'-':>12}"
+        change = f"{ratio - 1:+7.1%}" if ratio is not None else f"{'':>8}"
+        lines.append(f"{name:<36} {duration(seconds)} {base_text} {change}  {status}")
+    return "\n".join(lines)
+
+def save(document, path):
+    with open(path, 'w') as f: json.dump(document, f, indent=2, sort_keys=True)
+
+def load(path):
+    with open(path) as f: return json.load(f)
@@ -3,6 +3,9 @@
 Central configuration file for the Techburg Simulation.
 Tune all game balance and parameters from here.
 """
+import os
+import re
+from types import SimpleNamespace
 
 # --- Grid & UI ---
 GRID_WIDTH = 40
@@ -21,8 +24,10 @@ NUM_REPAIR_BOTS = 3
 # --- Survivor Bot Parameters ---
 BOT_BASE_ENERGY = 200
 BOT_ENERGY_DEPLETION_RATE = 0.1
-BOT_RECHARGE_THRESHOLD = 0.5  # Seek energy when below 50%
+BOT_RECHARGE_THRESHOLD = 0.4  # Seek energy when below 40%
 BOT_THREAT_DETECTION_RADIUS = 6
+BOT_USE_PATHFINDING = False  # Follow cached A* plans instead of stepping straight at the target
+BOT_DECISION_BUDGET = 0  # Goal decisions per tick, spread out by ai/decisions.py; 0 decides on the spot
 ENHANCEMENT_DECAY_RATE = 0.1
 
 # --- Recharge Station Parameters ---
@@ -30,10 +35,12 @@ STATION_CAPACITY = 5
 GATHERER_CREATION_CHANCE = 0.002  # 0.2% chance per tick
 REPAIRER_CREATION_CHANCE = 0.001  # 0.1% chance per tick
 BOT_CREATION_ENERGY_COST = 50
+BOT_SPAWNING = False  # Build new gatherers and repair bots at runtime, paid for by the main bot
 
 # --- Spare Part Parameters ---
 PART_CORROSION_RATE = 0.999  # Loses 0.1% of value per tick
 PART_DISPOSAL_THRESHOLD = 1.0 # Becomes useless below 1% value
+PART_DISPOSAL = False  # Remove parts from the grid once they corrode below the threshold
 
 # --- Drone Parameters ---
 DRONE_MAX_ENERGY = 500
@@ -46,4 +53,67 @@ DRONE_DISABLE_DAMAGE = 60
 SWARM_DECAY_FIELD_RADIUS = 1.5
 SWARM_ENERGY_DRAIN_PERCENT = 0.03 # Drains 3% of max energy
 SWARM_REPLICATION_CHANCE = 0.02
-SWARM_REPLICATION_THRESHOLD = 8
\ No newline at end of file
+SWARM_REPLICATION_THRESHOLD = 8
+SWARM_DYNAMICS = False  # Swarms replicate and merge, with decay damage from a per-cell density field
+
+# --- Spatial Queries ---
+NEIGHBOUR_BUCKET_SIZE = 8  # Cells per side of a bucket in the neighbourhood query index
+
+# --- Sharded World (backend 'sharded') ---
+CHUNK_SIZE = 250  # Cells per side of a chunk
+CHUNK_HALO = 2    # Cells of neighbouring chunks each chunk can see (covers swarm and drone reach)
+SHARD_WORKERS = 1  # Worker processes; results do not depend on this
+
+# --- Two-Phase Tick (backend 'two_phase') ---
+TWO_PHASE_WORKERS = 1  # Threads computing agent intents; results do not depend on this
+
+# --- Event Log ---
+EVENT_LOG_CAPACITY = 1000  # Most recent events kept in memory
+
+# --- Metrics ---
+METRICS_INTERVAL = 10  # Ticks between metrics samples (headless.py --metrics)
+
+
+def load(overrides=None):
+    """Returns the settings above as a namespace, with any overrides applied.
+    Override values are coerced to the type of the default, so strings from the
+    command line work as well."""
+    settings = {name: value for name, value in globals().items() if name.isupper()}
+    for name, value in (overrides or {}).items():
+        if name not in settings: raise KeyError(f"Unknown config setting: {name}")
+        if isinstance(settings[name], bool) and isinstance(value, str):
+            settings[name] = value.strip().lower() in ('1', 'true', 'yes', 'on')
+        else:
+            settings[name] = type(settings[name])(value)
+    return SimpleNamespace(**settings)
+
+def unread():
+    """The settings above that no module reads yet (they are listed for reference), found by
+    looking for attribute reads of each name in the sources outside config.py and the tests."""
+    root = os.path.dirname(os.path.abspath(__file__))
+    read = set()
+    for folder, folders, files in os.walk(root):
+        folders[:] = [f for f in folders if f not in ('test', 'benchmarks', '__pycache__')]
+        for name in files:
+            path = os.path.join(folder, name)
+            if not name.endswith('.py') or path == os.path.join(root, 'config.py'): continue
+            with open(path, encoding='utf-8') as f: read.update(re.findall(r'\.([A-Z][A-Z0-9_]*)\b', f.read()))
+    return {name for name in globals() if name.isupper()} - read
+
+def inert(overrides, settings):
+    """The names in overrides that change nothing in a run under settings: those no code reads
+    (see unread()), those that never affect results, and those only read while a switch is on."""
+    # These only tune speed, memory or output, never what happens in a run.
+    tuning = {'NEIGHBOUR_BUCKET_SIZE', 'EVENT_LOG_CAPACITY', 'METRICS_INTERVAL', 'SHARD_WORKERS', 'TWO_PHASE_WORKERS'}
+    switches = {'GATHERER_CREATION_CHANCE': lambda s: s.BOT_SPAWNING,
+                'REPAIRER_CREATION_CHANCE': lambda s: s.BOT_SPAWNING,
+                'BOT_CREATION_ENERGY_COST': lambda s: s.BOT_SPAWNING,
+                'PART_CORROSION_RATE': lambda s: s.PART_DISPOSAL,
+                'PART_DISPOSAL_THRESHOLD': lambda s: s.PART_DISPOSAL,
+                'BOT_THREAT_DETECTION_RADIUS': lambda s: s.BOT_DECISION_BUDGET > 0,
+                'SWARM_DECAY_FIELD_RADIUS': lambda s: s.SWARM_DYNAMICS,
+                'SWARM_REPLICATION_CHANCE': lambda s: s.SWARM_DYNAMICS,
+                'SWARM_REPLICATION_THRESHOLD': lambda s: s.SWARM_DYNAMICS}
+    skipped = unread() | tuning
+    return [name for name in overrides
+            if name in skipped or (name in switches and not switches[name](settings))]
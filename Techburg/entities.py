@@ -1,33 +1,60 @@
 # Techburg/entities.py
+import math
+
+# Enhancement and color for each part size. Parts point at these shared strings
+# instead of carrying their own.
+PART_KINDS = {
+    "large": ("energy_capacity", "orange"),
+    "medium": ("vision", "light blue"),
+    "small": ("speed", "light green"),
+}
+# Value of a part when it appears, in percent. It corrodes by PART_CORROSION_RATE per tick.
+FULL_VALUE = 100.0
+
+def corrosion_value(rate, age):
+    return FULL_VALUE * rate ** age
+
+def corrosion_lifetime(rate, threshold):
+    """Ticks until a part corrodes below threshold, or None if it never does."""
+    if rate >= 1 or threshold <= 0: return None
+    if rate <= 0: return 1 if threshold <= FULL_VALUE else 0
+    age = max(0, int(math.log(threshold / FULL_VALUE) / math.log(rate)))
+    # Settle rounding in the logarithms against the value actually computed.
+    while age > 0 and corrosion_value(rate, age - 1) < threshold: age -= 1
+    while corrosion_value(rate, age) >= threshold: age += 1
+    return age
+
 class SparePart:
+    __slots__ = ('x', 'y', 'size', 'enhancement_type', 'color', 'created')
+    type = "spare_part"
+    max_corrosion = 1000 # Used for enhancement duration
+
     def __init__(self, size, x, y):
         self.x = x; self.y = y; self.size = size
-        self.type = "spare_part"
+        self.created = None  # tick it was first added to a grid; corrosion counts from here
         
         # --- THIS IS THE FIX ---
         # The enhancement_type is now correctly assigned based on the part's size.
-        if self.size == "large":
-            self.enhancement_type = "energy_capacity"
-            self.color = "orange"
-        elif self.size == "medium":
-            self.enhancement_type = "vision"
-            self.color = "light blue"
-        else: # small
-            self.enhancement_type = "speed"
-            self.color = "light green"
-
-        self.max_corrosion = 1000 # Used for enhancement duration
+        self.enhancement_type, self.color = PART_KINDS.get(size, PART_KINDS["small"])
+
+    def value(self, grid):
+        """Remaining value in percent, worked out from the part's age when asked."""
+        age = grid.tick - (grid.tick if self.created is None else self.created)
+        return corrosion_value(grid.settings.PART_CORROSION_RATE, age)
 
     def update(self, grid):
-        """Entities can have update logic, but parts are static until collected."""
+        """Entities can have update logic, but parts are static until collected.
+        Corrosion is scheduled by the grid (see Grid.add_entity)."""
         pass
 
 
 class RechargeStation:
+    __slots__ = ('x', 'y')
+    type = "recharge_station"; color = "purple"
+
     def __init__(self, x, y):
         self.x = x; self.y = y
-        self.type = "recharge_station"; self.color = "purple"
 
     def update(self, grid):
         """Stations are static."""
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,70 @@
+# Techburg/events.py
+"""
+Structured event log. Agents emit typed Event records instead of formatted strings.
+Records go into a bounded ring buffer and straight to the sinks, or, while the log is
+batching, to the sinks in batches when the owner calls flush() (the App batches per
+frame). An event below the log level, in a muted category, or that neither a sink nor
+the history would keep, is dropped before anything is formatted or allocated.
+"""
+from collections import deque, namedtuple
+
+DEBUG, INFO, WARNING = 10, 20, 30
+
+class Event(namedtuple('Event', 'tick category level template args')):
+    __slots__ = ()
+
+    @property
+    def message(self):
+        return self.template.format(*self.args)
+
+    def __str__(self):
+        return f"[{self.category.upper()}] {self.message}"
+
+class EventLog:
+    def __init__(self, capacity=1000, level=INFO, batching=False):
+        self.history = deque(maxlen=capacity)  # the most recent events, for inspection; off at capacity 0
+        self.batching = batching  # hold events for flush() instead of delivering each as it comes
+        self.pending = []  # held for the sinks until the next flush(), while batching
+        self.sinks = []
+        self.level = level
+        self.muted = set()
+        self.tick = 0  # stamped on new events, kept current by the grid
+
+    def enabled_for(self, category, level):
+        return level >= self.level and category not in self.muted and bool(self.sinks or self.history.maxlen != 0)
+
+    def emit(self, category, level, template, *args):
+        if level < self.level or category in self.muted: return
+        if not self.sinks and self.history.maxlen == 0: return  # nobody would see it
+        event = Event(self.tick, category, level, template, args)
+        self.history.append(event)
+        if not self.sinks: return
+        if self.batching: self.pending.append(event)
+        else: self._deliver([event])
+
+    def subscribe(self, sink, level=DEBUG, categories=None):
+        """sink(batch) receives lists of events at or above level, optionally only from some categories."""
+        self.sinks.append((sink, level, set(categories) if categories else None))
+
+    def flush(self):
+        if not self.pending: return
+        batch, self.pending = self.pending, []
+        self._deliver(batch)
+
+    def _deliver(self, batch):
+        for sink, level, categories in self.sinks:
+            selected = [e for e in batch if e.level >= level and (categories is None or e.category in categories)]
+            if selected: sink(selected)
+
+    def mute(self, category): self.muted.add(category)
+    def unmute(self, category): self.muted.discard(category)
+
+    def recent(self, count=None, category=None):
+        events = [e for e in self.history if category is None or e.category == category]
+        return events[-count:] if count else events
+
+def line_sink(write):
+    """Adapts a one-line-at-a-time logger (like print) into a batch sink."""
+    def sink(batch):
+        for event in batch: write(str(event))
+    return sink
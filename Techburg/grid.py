@@ -1,42 +1,299 @@
 # Techburg/grid.py
+import math
 import random
+from array import array
+import config
 from agents.survivor_bot import PlayerBot, GathererBot, RepairBot, SurvivorBot
 from agents.drone import MalfunctioningDrone
 from agents.swarm import ScavengerSwarm
-from entities import SparePart, RechargeStation
+from entities import SparePart, RechargeStation, corrosion_lifetime
+from ai.distance_field import DistanceField
+from ai.neighbours import NeighbourIndex
+from events import EventLog, line_sink, DEBUG, INFO, WARNING
+from timers import TimerQueue
+from profiler import TickStats, COUNTED_CALLS, counted, clock, allocated_blocks
+
+BOT_TYPES = ('player_bot', 'survivor_bot', 'gatherer_bot', 'repair_bot')
+THREAT_TYPES = ('drone', 'swarm')
+# Everything else on a cell blocks movement for pathfinding.
+PASSABLE_TYPES = ('spare_part', 'recharge_station')
+# Static entity types that get a distance field for nearest-target lookups.
+FIELD_TYPES = ('recharge_station', 'spare_part')
+# Order in which agents act each tick. Parts and stations are static and never updated.
+UPDATE_PHASES = (('bots', BOT_TYPES), ('drones', ('drone',)), ('swarms', ('swarm',)))
+
+class GridFullError(ValueError):
+    """Raised when an entity has to be placed on an empty cell and none is left."""
 
 class Grid:
-    def __init__(self, width, height, logger_func=None):
+    def __init__(self, width, height, logger_func=None, seed=None, settings=None):
         self.width = width
         self.height = height
-        self.entities = []
+        # Every entity on the grid, as an insertion-ordered set ({entity: None}) for O(1) removal.
+        self.entities = {}
+        # Spatial index: (x, y) -> entities on that cell, in arrival order.
+        self.cells = {}
+        # Type buckets: entity.type -> {entity: None}, an insertion-ordered set.
+        self.by_type = {}
+        # Number of blocking entities per cell, indexed by y*width+x.
+        self.blocked = array('i', [0]) * (width * height)
+        # Indices of the empty cells in no particular order, and each cell's position in it
+        # (-1 when occupied), for O(1) random placement. Built on first use (see get_free_cells).
+        self.free = None
+        self.free_slot = None
+        self.planner = None
+        self.fields = {}
+        # Bucket indexes for neighbourhood queries, per entity type, built on first use (see get_index).
+        self.indexes = {}
+        # Entities added, moved or removed since the last pop_changes(), or None when nobody tracks them.
+        self.changes = None
         self.parts_collected = 0
+        self.parts_lost_to_swarms = 0
         self.initial_part_count = 0
-        self.log = logger_func if logger_func else lambda message: None
+        self.parts_corroded = 0
+        self.settings = settings if settings else config.load()
+        self.tick = 0
+        # Callbacks due on later ticks: enhancement expiries and part disposal (see timers.py).
+        self.timers = TimerQueue()
+        # Ticks a part lasts before corroding below PART_DISPOSAL_THRESHOLD, or None if it is never disposed of.
+        self.part_lifetime = None
+        if self.settings.PART_DISPOSAL:
+            self.part_lifetime = corrosion_lifetime(self.settings.PART_CORROSION_RATE, self.settings.PART_DISPOSAL_THRESHOLD)
+        self.events = EventLog(self.settings.EVENT_LOG_CAPACITY)
+        if logger_func: self.events.subscribe(line_sink(logger_func))
+        # All simulation randomness goes through this so a seed reproduces a run.
+        self.rng = random.Random(seed)
+        # TickStats while profiling is enabled (see enable_profiling), otherwise None.
+        self.stats = None
+        # ReplayRecorder that captures every tick (see replay.py), or None.
+        self.recorder = None
+        # MetricsCollector sampling the world every few ticks (see metrics.py), or None.
+        self.metrics = None
+        # Spreads bot goal decisions over ticks when BOT_DECISION_BUDGET is set, otherwise None.
+        budget = self.settings.BOT_DECISION_BUDGET
+        self.decisions = None
+        if budget > 0:
+            from ai.decisions import DecisionScheduler
+            self.decisions = DecisionScheduler(budget, self.settings.BOT_THREAT_DETECTION_RADIUS)
+        # Swarm units per cell when swarms replicate and merge (SWARM_DYNAMICS), otherwise None.
+        self.swarm_field = None
+        if self.settings.SWARM_DYNAMICS:
+            from ai.swarm_field import SwarmField
+            self.swarm_field = SwarmField(width, height, self.settings.SWARM_DECAY_FIELD_RADIUS)
 
     def is_valid(self, x, y):
         return 0 <= x < self.width and 0 <= y < self.height
 
     def get_entity(self, x, y):
-        for entity in self.entities:
-            if entity.x == x and entity.y == y: return entity
-        return None
+        cell = self.cells.get((x, y))
+        return cell[0] if cell else None
+
+    def get_entities(self, x, y):
+        return list(self.cells.get((x, y), ()))
+
+    def is_empty(self, x, y):
+        return (x, y) not in self.cells
+
+    def contains(self, entity):
+        return entity in self.by_type.get(entity.type, ())
+
+    def get_by_type(self, *types):
+        found = []
+        for entity_type in types:
+            found.extend(self.by_type.get(entity_type, ()))
+        return found
 
     def add_entity(self, entity):
-        if self.is_valid(entity.x, entity.y): self.entities.append(entity)
+        if self.is_valid(entity.x, entity.y):
+            self.entities[entity] = None
+            self._link_cell(entity, entity.x, entity.y)
+            self.by_type.setdefault(entity.type, {})[entity] = None
+            if entity.type in self.fields: self.fields[entity.type].add_source(entity)
+            if entity.type in self.indexes: self.indexes[entity.type].add(entity)
+            if self.changes is not None: self.changes[entity] = None
+            if entity.type == 'spare_part': self._schedule_corrosion(entity)
+            elif getattr(entity, 'active_enhancements', None): entity.schedule_expiries(self)
 
     def remove_entity(self, entity):
-        if entity in self.entities: self.entities.remove(entity)
+        if not self.contains(entity): return
+        del self.entities[entity]
+        self._unlink_cell(entity)
+        del self.by_type[entity.type][entity]
+        if entity.type in self.fields: self.fields[entity.type].remove_source(entity)
+        if entity.type in self.indexes: self.indexes[entity.type].remove(entity)
+        if self.changes is not None: self.changes[entity] = None
 
     def move_entity(self, entity, new_x, new_y):
-        entity.x = new_x % self.width
-        entity.y = new_y % self.height
-        
+        new_x, new_y = new_x % self.width, new_y % self.height
+        if self.contains(entity) and (new_x, new_y) != (entity.x, entity.y):
+            self._unlink_cell(entity)
+            self._link_cell(entity, new_x, new_y)
+            if entity.type in self.indexes: self.indexes[entity.type].move(entity, new_x, new_y)
+            if entity.type in self.fields:
+                self.fields[entity.type].remove_source(entity)
+                entity.x, entity.y = new_x, new_y
+                self.fields[entity.type].add_source(entity)
+            if self.changes is not None: self.changes[entity] = None
+        entity.x = new_x
+        entity.y = new_y
+
+    def clear(self):
+        """Removes every entity at once, with their timers. Counters, tick, RNG and settings are kept."""
+        if self.changes is not None: self.changes.update(dict.fromkeys(self.entities))
+        self.entities, self.cells, self.by_type = {}, {}, {}
+        self.timers = TimerQueue()
+        self.blocked = array('i', [0]) * (self.width * self.height)
+        self.planner, self.fields, self.indexes = None, {}, {}
+        self.free = self.free_slot = None
+
+    def _link_cell(self, entity, x, y):
+        cell = self.cells.get((x, y))
+        if cell is None:
+            cell = self.cells[(x, y)] = []
+            if self.free is not None: self._take_free(y * self.width + x)
+        cell.append(entity)
+        if entity.type not in PASSABLE_TYPES:
+            self.blocked[y * self.width + x] += 1
+
+    def _unlink_cell(self, entity):
+        key = (entity.x, entity.y)
+        cell = self.cells[key]
+        cell.remove(entity)
+        if not cell:
+            del self.cells[key]
+            if self.free is not None: self._put_free(entity.y * self.width + entity.x)
+        if entity.type not in PASSABLE_TYPES: self.blocked[entity.y * self.width + entity.x] -= 1
+
+    def get_free_cells(self):
+        """The empty-cell set, built on first use and kept up to date by the cell links after."""
+        if self.free is None:
+            size, width = self.width * self.height, self.width
+            occupied = bytearray(size)
+            for x, y in self.cells: occupied[y * width + x] = 1
+            self.free = array('i', [i for i in range(size) if not occupied[i]])
+            self.free_slot = array('i', [-1]) * size
+            for slot, index in enumerate(self.free): self.free_slot[index] = slot
+        return self.free
+
+    def _take_free(self, index):
+        # Swap-remove: the last free cell fills the hole.
+        free, slot = self.free, self.free_slot
+        last = free.pop()
+        if last != index:
+            free[slot[index]] = last
+            slot[last] = slot[index]
+        slot[index] = -1
+
+    def _put_free(self, index):
+        self.free_slot[index] = len(self.free)
+        self.free.append(index)
+
+    def random_empty_cell(self):
+        """A uniformly random empty cell, in O(1). Raises GridFullError when there is none."""
+        free = self.get_free_cells()
+        if not free: raise GridFullError(f"No empty cell left on the {self.width}x{self.height} grid")
+        index = free[self.rng.randrange(len(free))]
+        return index % self.width, index // self.width
+
+    def _schedule_corrosion(self, part):
+        """A part corrodes from the tick it first lands on a grid; it is disposed of once its
+        value drops below PART_DISPOSAL_THRESHOLD. Nothing is done for it in between."""
+        if part.created is None: part.created = self.tick
+        if self.part_lifetime is not None:
+            self.timers.schedule(part.created + self.part_lifetime, self._dispose_part, part)
+
+    def _dispose_part(self, part):
+        if not self.contains(part): return  # picked up or eaten meanwhile
+        self.remove_entity(part)
+        self.parts_corroded += 1
+        self.events.emit('part', DEBUG, "A {} part corroded away at ({},{}).", part.size, part.x, part.y)
+
+    def track_changes(self):
+        """Starts recording changed entities for pop_changes(). Every current entity counts as changed."""
+        self.changes = dict.fromkeys(self.entities)
+
+    def pop_changes(self):
+        """Entities added, moved or removed since the last call, in the order they first changed."""
+        changed, self.changes = self.changes or {}, {}
+        return list(changed)
+
+    def get_planner(self):
+        """The grid's shared A* planner, created on first use."""
+        if not self.planner:
+            from ai.pathfinding import PathPlanner  # only bots using BOT_USE_PATHFINDING need it
+            self.planner = PathPlanner(self)
+        return self.planner
+
+    def get_field(self, entity_type):
+        """Distance field for a static entity type, built on first use and kept up to date after."""
+        field = self.fields.get(entity_type)
+        if field is None:
+            field = self.fields[entity_type] = DistanceField(self.width, self.height)
+            field.rebuild(self.by_type.get(entity_type, ()))
+        return field
+
+    def get_index(self, entity_type):
+        """Bucket index over one entity type, built on first use and kept up to date after."""
+        index = self.indexes.get(entity_type)
+        if index is None:
+            index = self.indexes[entity_type] = NeighbourIndex(self.width, self.height, self.settings.NEIGHBOUR_BUCKET_SIZE)
+            for entity in self.by_type.get(entity_type, ()): index.add(entity)
+        return index
+
+    def find_nearest(self, entity_type, x, y):
+        """Nearest entity of a type, in steps for field types and straight-line distance otherwise."""
+        if entity_type in FIELD_TYPES: return self.get_field(entity_type).nearest(x, y)
+        return self.query_nearest(x, y, (entity_type,))
+
+    def distance(self, x, y, entity, wrap=False):
+        """Straight-line distance from (x, y) to entity, optionally across the wrapping edges."""
+        dx, dy = abs(entity.x - x), abs(entity.y - y)
+        if wrap: dx, dy = min(dx, self.width - dx), min(dy, self.height - dy)
+        return math.hypot(dx, dy)
+
+    def query_radius(self, x, y, radius, types, wrap=False):
+        """Entities of the given types within radius of (x, y), in get_by_type order."""
+        found = []
+        for entity_type in types:
+            index = self.get_index(entity_type)
+            hits = [e for e in index.candidates(x, y, int(radius), wrap) if self.distance(x, y, e, wrap) <= radius]
+            if len(hits) > 1: hits.sort(key=index.order.__getitem__)
+            found.extend(hits)
+        return found
+
+    def query_k_nearest(self, x, y, k, types, wrap=False):
+        """Up to k entities of the given types closest to (x, y), nearest first. Equally distant
+        entities come in get_by_type order, as with min() over get_by_type."""
+        indexes = [self.get_index(entity_type) for entity_type in types]
+        # Widen the searched square until it holds k entities no farther away than its half-width.
+        whole = max(self.width, self.height) // (2 if wrap else 1)
+        reach = self.settings.NEIGHBOUR_BUCKET_SIZE
+        while True:
+            ranked = []
+            for rank, index in enumerate(indexes):
+                for e in index.candidates(x, y, reach, wrap):
+                    ranked.append((self.distance(x, y, e, wrap), rank, index.order[e], e))
+            ranked.sort(key=lambda item: item[:3])
+            if reach >= whole: return [item[3] for item in ranked[:k]]
+            if len(ranked) >= k and ranked[k - 1][0] <= reach: return [item[3] for item in ranked[:k]]
+            reach *= 2
+
+    def query_nearest(self, x, y, types, wrap=False):
+        """The entity of the given types closest to (x, y), or None."""
+        found = self.query_k_nearest(x, y, 1, types, wrap)
+        return found[0] if found else None
+
+    def nearest_bot(self, x, y):
+        return self.query_nearest(x, y, BOT_TYPES)
+
+    def bots_within(self, x, y, radius):
+        return self.query_radius(x, y, radius, BOT_TYPES)
+
     def get_all_bots(self):
-        return [e for e in self.entities if isinstance(e, SurvivorBot)]
+        return self.get_by_type(*BOT_TYPES)
     
     def get_threats(self):
-        return [e for e in self.entities if isinstance(e, (MalfunctioningDrone, ScavengerSwarm))]
+        return self.get_by_type(*THREAT_TYPES)
 
     def increment_parts_collected(self):
         self.parts_collected += 1
@@ -49,26 +306,84 @@ class Grid:
         for i in range(num_repair_bots): entities_to_place.append(RepairBot(f'repair_{i}', 0, 0))
         for _ in range(num_drones): entities_to_place.append(MalfunctioningDrone(0, 0))
         for _ in range(num_swarms): entities_to_place.append(ScavengerSwarm(0, 0))
-        for _ in range(num_parts): entities_to_place.append(SparePart(random.choice(['small', 'medium', 'large']), 0, 0))
+        for _ in range(num_parts): entities_to_place.append(SparePart(self.rng.choice(['small', 'medium', 'large']), 0, 0))
         for _ in range(num_stations): entities_to_place.append(RechargeStation(0, 0))
 
+        room = len(self.get_free_cells())
+        if len(entities_to_place) > room:
+            raise GridFullError(f"Cannot place {len(entities_to_place)} entities on the {self.width}x{self.height} grid, "
+                                f"which has {room} empty cells")
         for entity in entities_to_place: self.add_at_empty(entity)
         return player_instance
 
     def add_at_empty(self, entity):
-        while True:
-            x, y = random.randint(0, self.width-1), random.randint(0, self.height-1)
-            if not self.get_entity(x, y):
-                entity.x, entity.y = x, y
-                self.add_entity(entity)
-                break
+        entity.x, entity.y = self.random_empty_cell()
+        self.add_entity(entity)
+
+    def spawn_bots(self):
+        """Runtime bot building (BOT_SPAWNING): each tick, while any recharge station stands, a new
+        gatherer and a new repair bot each appear with their creation chance, at a random empty cell.
+        The main bot pays BOT_CREATION_ENERGY_COST for each, and nothing is built while it cannot."""
+        settings = self.settings
+        if not self.by_type.get('recharge_station'): return
+        payer = next(iter(self.by_type.get('player_bot', ())), None)
+        for cls, chance, prefix in ((GathererBot, settings.GATHERER_CREATION_CHANCE, 'gatherer'),
+                                    (RepairBot, settings.REPAIRER_CREATION_CHANCE, 'repair')):
+            if self.rng.random() >= chance: continue
+            if payer is None or payer.energy <= settings.BOT_CREATION_ENERGY_COST or not self.get_free_cells(): continue
+            payer.energy -= settings.BOT_CREATION_ENERGY_COST
+            bot = cls(f'{prefix}_t{self.tick}', 0, 0)
+            self.add_at_empty(bot)
+            self.events.emit('event', INFO, "{} was built.", bot.bot_id)
+
+    def snapshot(self, meta=None):
+        """The whole world as versioned snapshot bytes (see snapshot.py)."""
+        import snapshot
+        return snapshot.dump(self, meta)
+
+    @staticmethod
+    def restore(data):
+        """A Grid rebuilt from snapshot() bytes, continuing exactly where the original was."""
+        import snapshot
+        return snapshot.load(data)[0]
+
+    def save(self, path):
+        import snapshot
+        snapshot.save(self, path)
+
+    @staticmethod
+    def load(path):
+        """Like restore(), reading the file through a memory map."""
+        import snapshot
+        return snapshot.load_file(path)[0]
+
+    def enable_profiling(self):
+        """Starts recording tick timings and query call counts. Returns the TickStats."""
+        if self.stats is None:
+            self.stats = TickStats()
+            for name in COUNTED_CALLS: setattr(self, name, counted(getattr(self, name), name, self.stats.calls))
+        return self.stats
+
+    def disable_profiling(self):
+        """Stops profiling and restores the unwrapped methods. Returns the collected TickStats."""
+        for name in COUNTED_CALLS: self.__dict__.pop(name, None)
+        stats, self.stats = self.stats, None
+        return stats
 
     def update_world(self):
         """Updates all entities and removes those with no energy."""
-        # First, update the state of all entities
-        for entity in self.entities[:]:
-            if entity in self.entities:
-                entity.update(self)
+        started = clock() if self.metrics else 0.0
+        self.tick += 1
+        self.events.tick = self.tick
+        self.timers.run_due(self.tick)
+        if self.decisions: self.decisions.run(self)
+        # First, update the state of all agents, one phase (agent kind) at a time
+        if self.stats: self._update_phases_profiled()
+        else:
+            for phase, types in UPDATE_PHASES:
+                for entity in self.get_by_type(*types):
+                    if self.contains(entity):
+                        entity.update(self)
         
         # --- THIS IS THE FIX ---
         # Now, check for and remove any bots that have run out of energy.
@@ -77,5 +392,25 @@ class Grid:
         ]
         if bots_to_remove:
             for bot in bots_to_remove:
-                self.log(f"[EVENT] {getattr(bot, 'bot_id', 'A bot')} has been destroyed!")
-                self.remove_entity(bot)
\ No newline at end of file
+                self.events.emit('event', WARNING, "{} has been destroyed!", getattr(bot, 'bot_id', 'A bot'))
+                self.remove_entity(bot)
+        if self.settings.BOT_SPAWNING: self.spawn_bots()
+        if self.recorder: self.recorder.capture(self)
+        if self.metrics: self.metrics.capture(self, clock() - started)
+
+    def _update_phases_profiled(self):
+        """The phase loop of update_world, timing every phase and every entity update."""
+        stats = self.stats
+        tick_start = clock()
+        for phase, types in UPDATE_PHASES:
+            phase_start, phase_blocks = clock(), allocated_blocks()
+            for entity in self.get_by_type(*types):
+                if self.contains(entity):
+                    start, blocks = clock(), allocated_blocks()
+                    entity.update(self)
+                    # Read the block count first so the bookkeeping below is not counted against the update.
+                    blocks = allocated_blocks() - blocks
+                    stats.record('type:' + entity.type, clock() - start, blocks)
+            phase_blocks = allocated_blocks() - phase_blocks
+            stats.record('phase:' + phase, clock() - phase_start, phase_blocks)
+        stats.end_tick(clock() - tick_start)
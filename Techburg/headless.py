@@ -0,0 +1,114 @@
+# Techburg/headless.py
+"""
+Command line entry point for running simulations without a display.
+
+    python Techburg/headless.py --ticks 5000 --seed 1 --runs 10 --set NUM_DRONES=8
+"""
+import argparse
+import sys
+import config
+from simulation import Simulation
+from events import DEBUG, line_sink
+
+def parse_overrides(pairs):
+    overrides = {}
+    for pair in pairs:
+        name, sep, value = pair.partition('=')
+        if not sep: raise argparse.ArgumentTypeError(f"Expected KEY=VALUE, got '{pair}'")
+        overrides[name.strip().upper()] = value.strip()
+    return overrides
+
+def positive_int(text):
+    value = int(text)
+    if value < 1: raise argparse.ArgumentTypeError(f"Expected a whole number of at least 1, got '{text}'")
+    return value
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run the Techburg simulation headless.")
+    parser.add_argument('--ticks', type=int, default=5000, help="Maximum ticks per run (default: 5000)")
+    parser.add_argument('--seed', type=int, default=None, help="Seed of the first run; later runs use seed+1, seed+2, ...")
+    parser.add_argument('--runs', type=int, default=1, help="Number of independent runs (default: 1)")
+    parser.add_argument('--set', dest='overrides', action='append', default=[], metavar='KEY=VALUE',
+                        help="Override a setting from config.py, e.g. --set NUM_DRONES=8")
+    parser.add_argument('--backend', choices=Simulation.BACKENDS, default='object',
+                        help="'vectorized' runs agents on NumPy arrays, 'sharded' on map chunks (default: object)")
+    parser.add_argument('--save', metavar='PATH', help="Write a snapshot of the final state of the last run to PATH")
+    parser.add_argument('--resume', metavar='PATH', help="Continue from a snapshot instead of starting new runs (ignores --seed and --set)")
+    parser.add_argument('--record', metavar='PATH', help="Record a replay of the last run to PATH (object backend only)")
+    parser.add_argument('--metrics', metavar='PATH', action='append', default=[],
+                        help="Stream metrics samples of the last run to PATH: .csv, .jsonl or .prom (may be repeated)")
+    parser.add_argument('--metrics-interval', type=positive_int, default=None, metavar='TICKS',
+                        help="Ticks between metrics samples (default: METRICS_INTERVAL from config.py)")
+    parser.add_argument('--templates', metavar='DIR',
+                        help="Cache the seeded starting worlds in DIR and start runs from them (see templates.py)")
+    parser.add_argument('--profile', action='store_true', help="Print per-phase and per-type tick timings after each run")
+    parser.add_argument('--verbose', action='store_true', help="Print the activity log, including per-tick damage")
+    return parser
+
+def format_summary(summary):
+    return (f"seed={summary['seed']} outcome={summary['outcome']} ticks={summary['ticks']} "
+            f"tps={summary['ticks_per_second']:.0f} parts={summary['parts_collected']}/{summary['parts_goal']} "
+            f"survivors={summary['survivors']} destroyed={summary['bots_destroyed']}")
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        settings = config.load(parse_overrides(args.overrides))
+    except (argparse.ArgumentTypeError, KeyError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr); return 2
+    if args.record and args.backend != 'object':
+        print("error: --record needs the object backend", file=sys.stderr); return 2
+    # Metrics, replays and templates are imported only when asked for, to keep startup short.
+    if args.metrics:
+        from metrics import MetricsCollector, sink_for
+        try:
+            for path in args.metrics: sink_for(path).close()  # checks the extension; an unstarted sink opens nothing
+        except ValueError as error:
+            print(f"error: {error}", file=sys.stderr); return 2
+        if args.metrics_interval is None and settings.METRICS_INTERVAL < 1 and not args.resume:
+            print(f"error: METRICS_INTERVAL must be at least 1, got {settings.METRICS_INTERVAL}", file=sys.stderr); return 2
+    logger = print if args.verbose else None
+    templates = None
+    if args.templates:
+        from templates import TemplateCache
+        templates = TemplateCache(args.templates)
+
+    summaries = []
+    for run in range(args.runs):
+        seed = None if args.seed is None else args.seed + run
+        if args.resume:
+            sim = Simulation.load(args.resume, args.backend)
+            if logger: sim.grid.events.subscribe(line_sink(logger))
+        else:
+            try:
+                sim = Simulation(settings, seed, logger, args.backend, templates)
+            except ValueError as error:  # GridFullError when the entities do not fit, or a backend refusing the settings
+                print(f"error: {error}", file=sys.stderr); return 2
+        if args.verbose: sim.grid.events.level = DEBUG
+        if args.profile: sim.grid.enable_profiling()
+        if args.record and run == args.runs - 1:
+            from replay import ReplayRecorder
+            sim.grid.recorder = ReplayRecorder(sim.grid, args.record)
+        if args.metrics and run == args.runs - 1:
+            interval = sim.settings.METRICS_INTERVAL if args.metrics_interval is None else args.metrics_interval
+            sim.grid.metrics = MetricsCollector(map(sink_for, args.metrics), interval)
+        summaries.append(sim.run(sim.ticks + args.ticks if args.resume else args.ticks))
+        if sim.grid.recorder: sim.grid.recorder.close()
+        if sim.grid.metrics: sim.grid.metrics.close()
+        sim.close()
+        print(format_summary(summaries[-1]))
+        if args.profile: print(sim.grid.stats.report())
+
+    if args.save: sim.save(args.save)
+
+    total_ticks = sum(s['ticks'] for s in summaries)
+    total_time = sum(s['elapsed'] for s in summaries)
+    wins = sum(1 for s in summaries if s['outcome'] == 'won')
+    print(f"--- {len(summaries)} run(s): {wins} won, {total_ticks} ticks, "
+          f"{total_ticks / total_time if total_time else 0:.0f} ticks/sec, "
+          f"avg parts collected {sum(s['parts_collected'] for s in summaries) / len(summaries):.1f}, "
+          f"avg survivors {sum(s['survivors'] for s in summaries) / len(summaries):.1f} ---")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,20 +1,34 @@
 # Techburg/main.py
 import tkinter as tk
 from tkinter import font as tkFont, scrolledtext
-import random
-import sys
+import argparse
+import time
 import os
 from grid import Grid
-from agents.survivor_bot import SurvivorBot
+from simulation import check_outcome
+from renderer import GridRenderer
+from scheduler import TickScheduler
 
 class App:
-    def __init__(self, master):
+    def __init__(self, master, replay_path=None, metrics_path=None):
         self.master = master
-        self.master.title("Techburg AI Simulation")
+        # Streams metrics samples of every game to this file (see metrics.py); Try Again starts it over
+        self.metrics_path = metrics_path
+        # Plays a recording (see replay.py) instead of running the simulation
+        self.player = None
+        if replay_path:
+            from replay import ReplayPlayer
+            self.player = ReplayPlayer(replay_path)
+        self.master.title("Techburg AI Simulation" + (f" - Replay of {os.path.basename(replay_path)}" if replay_path else ""))
         self.master.configure(bg="gray10")
 
         self.SIMULATION_SPEED = 100 
+        self.FRAME_RATE_MS = 33  # Redraw at ~30 fps, independently of the tick rate
+        self.MAX_LOG_LINES = 500
         self.simulation_paused = False
+        self.scheduler = TickScheduler(self.SIMULATION_SPEED / 1000, frame_budget=0.8 * self.FRAME_RATE_MS / 1000)
+        self.frame_job = None
+        self.show_stats = False
         
         # --- Main UI Frame ---
         self.top_frame = tk.Frame(self.master, bg="gray10")
@@ -46,6 +60,7 @@ class App:
 
         # Game Canvas
         self.GRID_WIDTH, self.GRID_HEIGHT, self.CELL_SIZE = 30, 20, 20
+        if self.player: self.GRID_WIDTH, self.GRID_HEIGHT = self.player.width, self.player.height
         self.canvas = tk.Canvas(left_frame, width=self.GRID_WIDTH*self.CELL_SIZE, height=self.GRID_HEIGHT*self.CELL_SIZE, bg='black', highlightthickness=0)
         self.canvas.pack()
 
@@ -53,10 +68,11 @@ class App:
         status_frame = tk.Frame(left_frame, bg="gray25", relief=tk.SUNKEN, borderwidth=1)
         status_frame.pack(fill=tk.X, pady=(5,0))
         self.status_text = tk.StringVar()
-        self.status_bar = tk.Label(status_frame, textvariable=self.status_text, anchor=tk.W, fg="white", bg="gray25", font=("Consolas", 10), padx=5)
+        self.status_bar = tk.Label(status_frame, textvariable=self.status_text, anchor=tk.W, justify=tk.LEFT, fg="white", bg="gray25", font=("Consolas", 10), padx=5)
         self.status_bar.pack(fill=tk.X)
 
         self.create_buttons(left_frame)
+        if self.player: self.create_seek_bar(left_frame)
         self.start_new_game()
 
     def create_color_key(self, parent_frame):
@@ -76,80 +92,159 @@ class App:
             entry_frame.pack(anchor='w', pady=2)
 
     def log_message(self, message):
+        self.log_lines([message])
+
+    def log_events(self, batch):
+        self.log_lines([str(event) for event in batch])
+
+    def log_lines(self, lines):
+        # One widget update per batch, keeping only the last MAX_LOG_LINES lines.
         self.log_widget.configure(state='normal')
-        self.log_widget.insert(tk.END, message + "\n")
+        self.log_widget.insert(tk.END, "\n".join(lines) + "\n")
+        excess = int(self.log_widget.index('end-1c').split('.')[0]) - 1 - self.MAX_LOG_LINES
+        if excess > 0: self.log_widget.delete(1.0, f"{excess + 1}.0")
         self.log_widget.see(tk.END)
         self.log_widget.configure(state='disabled')
 
     def create_buttons(self, parent_frame):
         button_frame = tk.Frame(parent_frame, bg="gray10"); button_frame.pack(fill=tk.X, pady=5)
         self.pause_button = tk.Button(button_frame, text="Pause", command=self.toggle_pause, width=10); self.pause_button.pack(side=tk.LEFT)
+        self.turbo_button = tk.Button(button_frame, text="Turbo", command=self.toggle_turbo, width=10); self.turbo_button.pack(side=tk.LEFT, padx=5)
+        self.stats_button = tk.Button(button_frame, text="Stats", command=self.toggle_stats, width=10); self.stats_button.pack(side=tk.LEFT)
         quit_button = tk.Button(button_frame, text="Quit Game", command=self.master.destroy, bg="dark red", fg="white", activebackground="red"); quit_button.pack(side=tk.RIGHT, padx=5)
         tk.Button(button_frame, text="Try Again", command=self.start_new_game, bg="steel blue", fg="white", activebackground="light blue").pack(side=tk.RIGHT)
         self.master.bind('<space>', self.toggle_pause)
 
+    def create_seek_bar(self, parent_frame):
+        self.seek_bar = tk.Scale(parent_frame, from_=self.player.first_tick, to=self.player.last_tick, orient=tk.HORIZONTAL,
+                                 label="Tick", bg="gray10", fg="white", highlightthickness=0, showvalue=True)
+        self.seek_bar.pack(fill=tk.X)
+        self.seek_bar.bind('<ButtonRelease-1>', lambda event: self.seek_replay(self.seek_bar.get()))
+
+    def seek_replay(self, tick):
+        self.grid = self.player.seek(tick)
+        self.main_bot = self.player.main_bot
+        self.renderer.reset(self.grid)
+        self.log_message(f"--- Jumped to tick {self.grid.tick} ---")
+        self.update_ui()
+        if self.game_is_over:
+            self.game_is_over = False
+            self.schedule_frame()
+
+    def start_replay(self):
+        self.grid = self.player.seek(self.player.first_tick)
+        self.main_bot = self.player.main_bot
+        self.initial_survivor_count = len(self.grid.get_all_bots())
+        self.renderer = GridRenderer(self.canvas, self.grid, self.CELL_SIZE)
+        self.log_message(f"--- Replaying ticks {self.player.first_tick} to {self.player.last_tick} ---")
+        self.game_is_over = False
+        self.schedule_frame()
+
     def start_new_game(self):
         self.simulation_paused = False
         if hasattr(self, 'pause_button'): self.pause_button.config(text="Pause")
         self.log_widget.configure(state='normal'); self.log_widget.delete(1.0, tk.END); self.log_widget.configure(state='disabled')
+        if self.player: return self.start_replay()
         
-        self.grid = Grid(self.GRID_WIDTH, self.GRID_HEIGHT, self.log_message)
+        if getattr(self, 'grid', None) and self.grid.metrics: self.grid.metrics.close()
+        self.grid = Grid(self.GRID_WIDTH, self.GRID_HEIGHT)
+        self.grid.events.batching = True  # flushed once per frame, in draw_grid
+        self.grid.events.subscribe(self.log_events)
+        if self.metrics_path:
+            from metrics import MetricsCollector, sink_for
+            self.grid.metrics = MetricsCollector([sink_for(self.metrics_path)], self.grid.settings.METRICS_INTERVAL)
+        if self.show_stats: self.grid.enable_profiling()
         self.main_bot = self.grid.populate_world(
             num_parts=50, num_stations=5, num_drones=4, 
             num_swarms=3, num_gatherers=6, num_repair_bots=3
         )
         self.initial_survivor_count = len(self.grid.get_all_bots())
+        self.renderer = GridRenderer(self.canvas, self.grid, self.CELL_SIZE)
         
         self.log_message("--- Welcome to the Techburg Simulation ---")
         self.log_message("Goal: The AI bots must collect all 50 parts.")
         self.log_message("--- Simulation Starting ---")
-        self.simulation_step()
+        self.game_is_over = False
+        self.schedule_frame()
 
     def toggle_pause(self, event=None):
         self.simulation_paused = not self.simulation_paused
         self.log_message(f"--- Simulation {'Paused' if self.simulation_paused else 'Resumed'} ---")
         self.pause_button.config(text="Resume" if self.simulation_paused else "Pause")
-        if not self.simulation_paused: self.simulation_step()
+        if not self.simulation_paused: self.schedule_frame()
 
-    def simulation_step(self):
-        if self.simulation_paused or 'normal' != self.master.state(): return
+    def toggle_turbo(self):
+        self.scheduler.turbo = not self.scheduler.turbo
+        self.turbo_button.config(text="Normal" if self.scheduler.turbo else "Turbo")
+
+    def toggle_stats(self):
+        # Profiling only runs while the overlay is shown
+        self.show_stats = not self.show_stats
+        if self.show_stats: self.grid.enable_profiling()
+        else: self.grid.disable_profiling()
+        self.stats_button.config(text="Hide Stats" if self.show_stats else "Stats")
+        self.update_ui()
+
+    def schedule_frame(self):
+        # Only ever one pending frame, even after Try Again or a quick pause/resume.
+        if self.frame_job: self.master.after_cancel(self.frame_job)
+        self.scheduler.reset()
+        self.frame_job = self.master.after(self.FRAME_RATE_MS, self.frame)
+
+    def frame(self):
+        self.frame_job = None
+        if self.simulation_paused or self.game_is_over or 'normal' != self.master.state(): return
         
-        # First, update the state of the world
+        # Run the ticks that are due, then draw only the latest state
+        ran = self.scheduler.run_frame(self.simulation_step)
+        if self.game_is_over: return
+        if ran: self.draw_grid()
+        self.frame_job = self.master.after(self.FRAME_RATE_MS, self.frame)
+
+    def simulation_step(self):
+        """Runs one tick. Returns False once the game is over."""
+        if self.player: return self.replay_step()
         self.grid.update_world()
-        self.draw_grid()
         
-        # Now, check for end conditions based on the new state
-        game_is_over = False
-        if self.grid.initial_part_count > 0 and self.grid.parts_collected >= self.grid.initial_part_count:
-            self.game_won(); game_is_over = True
-        # **THE FIX:** This is now the primary lose condition.
-        elif not self.main_bot or self.main_bot.energy <= 0:
-            self.game_over("The main survivor bot ran out of energy!"); game_is_over = True
-        elif not self.grid.get_all_bots():
-            self.game_over("All other survivor bots were eliminated!"); game_is_over = True
-        
-        # If the game is not over, schedule the next step
-        if not game_is_over:
-            self.master.after(self.SIMULATION_SPEED, self.simulation_step)
+        # Now, check for end conditions based on the new state (shared with the headless runner)
+        outcome, reason = check_outcome(self.grid, self.main_bot)
+        if outcome:
+            self.game_is_over = True
+            self.draw_grid()
+            if outcome == 'won': self.game_won()
+            else: self.game_over(reason)
+        return not outcome
+
+    def replay_step(self):
+        """Applies one recorded tick. Returns False at the end of the recording."""
+        if self.player.step():
+            self.seek_bar.set(self.grid.tick)
+            return True
+        self.game_is_over = True
+        self.draw_grid()
+        outcome, reason = check_outcome(self.grid, self.main_bot)
+        if outcome == 'won': self.game_won()
+        elif outcome: self.game_over(reason)
+        else: self.log_message("--- End of Replay ---")
+        return False
 
     def draw_grid(self):
-        self.canvas.delete("all")
-        for x in range(self.GRID_WIDTH):
-            for y in range(self.GRID_HEIGHT):
-                x1, y1 = x*self.CELL_SIZE, y*self.CELL_SIZE; x2, y2 = x1+self.CELL_SIZE, y1+self.CELL_SIZE
-                self.canvas.create_rectangle(x1, y1, x2, y2, outline="gray25", fill="")
-        for entity in self.grid.entities:
-            x1, y1 = entity.x*self.CELL_SIZE, entity.y*self.CELL_SIZE; x2, y2 = x1+self.CELL_SIZE, y1+self.CELL_SIZE
-            self.canvas.create_rectangle(x1, y1, x2, y2, fill=getattr(entity, 'color', 'white'), outline="")
+        self.grid.events.flush()
+        if self.grid.stats:
+            start = time.perf_counter()
+            self.renderer.refresh()
+            self.grid.stats.record('render', time.perf_counter() - start)
+        else: self.renderer.refresh()
         self.update_ui()
 
     def update_ui(self):
         all_bots = self.grid.get_all_bots()
         num_survivors = len(all_bots)
         bots_destroyed = self.initial_survivor_count - num_survivors
-        main_bot_energy = int(self.main_bot.energy) if self.main_bot and self.main_bot in all_bots else "---"
+        main_bot_energy = int(self.main_bot.energy) if self.main_bot and self.grid.contains(self.main_bot) else "---"
         parts_goal = self.grid.initial_part_count
-        self.status_text.set(f"Main Bot Energy: {main_bot_energy} | Bots Active: {num_survivors} | Parts Collected: {self.grid.parts_collected}/{parts_goal} | Bots Destroyed: {bots_destroyed}")
+        self.status_text.set(f"Main Bot Energy: {main_bot_energy} | Bots Active: {num_survivors} | Parts Collected: {self.grid.parts_collected}/{parts_goal} | Bots Destroyed: {bots_destroyed}"
+                             + (f"\n{self.grid.stats.overlay()}" if self.grid.stats else ""))
 
     def game_won(self):
         self.log_message("--- SIMULATION SUCCESSFUL ---")
@@ -161,7 +256,19 @@ class App:
         if reason:
             self.canvas.create_text(self.GRID_WIDTH*self.CELL_SIZE/2, self.GRID_HEIGHT*self.CELL_SIZE/2 + 25, text=reason, font=("Helvetica", 14), fill="white")
 
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run the Techburg simulation with its Tk interface.")
+    parser.add_argument('--replay', metavar='PATH', help="Play back a recording made with headless.py --record")
+    parser.add_argument('--metrics', metavar='PATH', help="Stream metrics samples to PATH: .csv, .jsonl or .prom")
+    return parser
+
 if __name__ == "__main__":
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.metrics:
+        from metrics import SINKS
+        if os.path.splitext(args.metrics)[1].lower() not in SINKS:
+            parser.error(f"--metrics needs a {', '.join(SINKS)} file")
     root = tk.Tk()
-    app = App(root)
-    root.mainloop()
\ No newline at end of file
+    app = App(root, args.replay, args.metrics)
+    root.mainloop()
@@ -0,0 +1,167 @@
+# Techburg/metrics.py
+"""
+Streaming metrics. A MetricsCollector attached to a Grid (grid.metrics) is handed every
+tick's duration, and every `interval` ticks it takes a sample of the world: counters,
+gauges, the bot energy and swarm size distributions as histograms, ticks per second and
+tick latency percentiles over the ticks since the last sample. Samples are sent to sinks,
+generators that write them out as they come (CSV, JSON Lines, a Prometheus text file),
+so a long run keeps nothing but the current sampling window in memory.
+
+A sample is a dict. Histograms are {'buckets': {upper bound: cumulative count, ...,
+'+Inf': count}, 'sum': ..., 'count': ...}; tick latency is {'p50': ..., 'p90': ...,
+'p99': ..., 'max': ...} in seconds. flatten() turns a sample into one flat row.
+"""
+import csv
+import json
+import os
+from profiler import clock
+
+ENERGY_BUCKETS = (50, 100, 200, 300, 400, 500, 600)
+SWARM_SIZE_BUCKETS = (2, 4, 8, 16, 32)
+PERCENTILES = (50, 90, 99)
+
+# Prometheus help text for every sampled value; values missing here are not exported.
+HELP = {
+    'tick': ('counter', "Ticks simulated"),
+    'bots': ('gauge', "Survivor bots on the grid"),
+    'main_bot_energy': ('gauge', "Energy of the main bot"),
+    'drones': ('gauge', "Drones on the grid"),
+    'swarms': ('gauge', "Scavenger swarms on the grid"),
+    'parts_remaining': ('gauge', "Spare parts on the grid"),
+    'parts_collected': ('counter', "Parts brought to a station"),
+    'parts_lost_to_swarms': ('counter', "Parts eaten by swarms"),
+    'parts_corroded': ('counter', "Parts that corroded away"),
+    'ticks_per_second': ('gauge', "Ticks per second since the last sample"),
+    'tick_seconds': ('summary', "Tick duration since the last sample"),
+    'bot_energy': ('histogram', "Energy of the survivor bots"),
+    'swarm_size': ('histogram', "Size of the scavenger swarms"),
+}
+
+def histogram(values, bounds):
+    counts = [0] * (len(bounds) + 1)
+    for value in values:
+        for i, bound in enumerate(bounds):
+            if value <= bound: counts[i] += 1; break
+        else: counts[-1] += 1
+    buckets, running = {}, 0
+    for bound, count in zip(bounds + ('+Inf',), counts):
+        running += count
+        buckets[str(bound)] = running
+    return {'buckets': buckets, 'sum': sum(values), 'count': len(values)}
+
+def percentiles(durations):
+    """Nearest-rank percentiles and the maximum of a list of durations."""
+    if not durations: return {**{f'p{p}': 0.0 for p in PERCENTILES}, 'max': 0.0}
+    ordered = sorted(durations)
+    found = {f'p{p}': ordered[min(len(ordered) - 1, -(-p * len(ordered) // 100) - 1)] for p in PERCENTILES}
+    found['max'] = ordered[-1]
+    return found
+
+def take_sample(grid, durations, elapsed):
+    bots = grid.get_all_bots()
+    main = next(iter(grid.by_type.get('player_bot', ())), None)
+    swarms = grid.by_type.get('swarm', ())
+    return {
+        'tick': grid.tick,
+        'bots': len(bots),
+        'main_bot_energy': main.energy if main else 0,
+        'drones': len(grid.by_type.get('drone', ())),
+        'swarms': len(swarms),
+        'parts_remaining': len(grid.by_type.get('spare_part', ())),
+        'parts_collected': grid.parts_collected,
+        'parts_lost_to_swarms': grid.parts_lost_to_swarms,
+        'parts_corroded': grid.parts_corroded,
+        'ticks_per_second': len(durations) / elapsed if elapsed else 0.0,
+        'tick_seconds': percentiles(durations),
+        'bot_energy': histogram([bot.energy for bot in bots], ENERGY_BUCKETS),
+        'swarm_size': histogram([swarm.size for swarm in swarms], SWARM_SIZE_BUCKETS),
+    }
+
+def flatten(sample):
+    """One flat row: nested values become name_key columns (bot_energy_le_50, tick_seconds_p99, ...)."""
+    row = {}
+    for name, value in sample.items():
+        if not isinstance(value, dict): row[name] = value
+        elif 'buckets' in value:
+            for bound, count in value['buckets'].items(): row[f'{name}_le_{bound}'] = count
+            row[f'{name}_sum'], row[f'{name}_count'] = value['sum'], value['count']
+        else:
+            for key, item in value.items(): row[f'{name}_{key}'] = item
+    return row
+
+class MetricsCollector:
+    def __init__(self, sinks, interval, clock=clock):
+        if interval < 1: raise ValueError(f"Metrics interval must be at least 1 tick, got {interval}")
+        self.sinks = list(sinks)
+        for sink in self.sinks: next(sink)
+        self.interval, self.clock = interval, clock
+        self.durations = []  # tick durations since the last sample
+        self.window_start = clock()
+        self.latest = None
+
+    def due(self, tick):
+        return tick % self.interval == 0
+
+    def capture(self, grid, duration, world=None):
+        """Called at the end of every tick with its duration; samples on every interval-th tick.
+        A backend world (vectorized, sharded) is synced into the grid before it is sampled."""
+        self.durations.append(duration)
+        if not self.due(grid.tick): return None
+        if world: world.sync()
+        now = self.clock()
+        self.latest = take_sample(grid, self.durations, now - self.window_start)
+        self.durations, self.window_start = [], now
+        for sink in self.sinks: sink.send(self.latest)
+        return self.latest
+
+    def close(self):
+        for sink in self.sinks: sink.close()
+        self.sinks = []
+
+# --- Sinks: generators that are sent samples and clean up when closed ---
+
+def csv_sink(path):
+    with open(path, 'w', newline='') as f:
+        writer = None
+        while True:
+            row = flatten((yield))
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+            f.flush()
+
+def jsonl_sink(path):
+    with open(path, 'w') as f:
+        while True:
+            f.write(json.dumps((yield)) + "\n")
+            f.flush()
+
+def prometheus_sink(path, prefix='techburg'):
+    """Keeps a Prometheus text-format file (for the node exporter's textfile collector) holding
+    the latest sample. The file is replaced whole, so a scrape never sees half of it."""
+    while True:
+        sample = yield
+        lines = []
+        for name, value in sample.items():
+            if name not in HELP: continue
+            kind, text = HELP[name]
+            metric = f'{prefix}_{name}'
+            lines += [f'# HELP {metric} {text}', f'# TYPE {metric} {kind}']
+            if kind == 'histogram':
+                lines += [f'{metric}_bucket{{le="{bound}"}} {count}' for bound, count in value['buckets'].items()]
+                lines += [f'{metric}_sum {value["sum"]}', f'{metric}_count {value["count"]}']
+            elif kind == 'summary':
+                lines += [f'{metric}{{quantile="{int(key[1:]) / 100}"}} {item}' for key, item in value.items() if key != 'max']
+            else: lines.append(f'{metric} {value}')
+        temporary = path + '.tmp'
+        with open(temporary, 'w') as f: f.write("\n".join(lines) + "\n")
+        os.replace(temporary, path)
+
+SINKS = {'.csv': csv_sink, '.jsonl': jsonl_sink, '.prom': prometheus_sink}
+
+def sink_for(path):
+    """The sink for a file, chosen by its extension (.csv, .jsonl or .prom)."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINKS: raise ValueError(f"Unknown metrics format '{extension}' (use {', '.join(SINKS)})")
+    return SINKS[extension](path)
@@ -0,0 +1,75 @@
+# Techburg/profiler.py
+"""
+Opt-in tick instrumentation. Grid.enable_profiling() attaches a TickStats that records
+wall time and allocated-block deltas per update phase and per entity type, and counts
+calls to the grid's hot query methods. While profiling is off the grid runs its plain
+update loop and the query methods are the unwrapped class methods, so the cost is one
+attribute check per tick.
+"""
+import sys
+import time
+from collections import defaultdict
+
+# Grid methods whose calls are counted. Bots reach find_nearest through find_nearest_target.
+COUNTED_CALLS = ('get_entity', 'get_all_bots', 'find_nearest')
+
+class TickStats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.ticks = 0
+        self.tick_time = 0.0
+        self.last_tick_time = 0.0
+        self.times = defaultdict(float)        # 'phase:bots', 'type:drone', 'render', ... -> seconds
+        self.counts = defaultdict(int)         # same keys -> number of samples
+        self.allocations = defaultdict(int)    # same keys -> net memory blocks allocated
+        self.calls = defaultdict(int)          # counted grid method -> calls
+
+    def record(self, name, seconds, blocks=0):
+        self.times[name] += seconds
+        self.counts[name] += 1
+        self.allocations[name] += blocks
+
+    def end_tick(self, seconds):
+        self.ticks += 1
+        self.tick_time += seconds
+        self.last_tick_time = seconds
+
+    def mean(self, name):
+        """Average seconds per sample of name (per tick for phases, per update for types)."""
+        return self.times[name] / self.counts[name] if self.counts[name] else 0.0
+
+    def breakdown(self, prefix):
+        """[(name, total seconds, share of tick time)] for keys starting with prefix, slowest first."""
+        rows = [(key[len(prefix):], t, t / self.tick_time if self.tick_time else 0.0)
+                for key, t in self.times.items() if key.startswith(prefix)]
+        return sorted(rows, key=lambda row: -row[1])
+
+    def overlay(self):
+        """One line for the App status bar."""
+        per_tick = 1000 * self.tick_time / self.ticks if self.ticks else 0.0
+        phases = " ".join(f"{name} {share:.0%}" for name, _, share in self.breakdown('phase:'))
+        render = f" | render {1000 * self.mean('render'):.2f}ms" if self.counts['render'] else ""
+        return f"tick {per_tick:.2f}ms ({phases}){render}"
+
+    def report(self):
+        lines = [f"--- profile: {self.ticks} ticks, {1000 * self.tick_time / max(self.ticks, 1):.3f} ms/tick ---"]
+        for prefix, unit in (('phase:', 'tick'), ('type:', 'update')):
+            for name, seconds, share in self.breakdown(prefix):
+                key = prefix + name
+                lines.append(f"  {key:<22} {seconds:9.4f}s {share:6.1%}  {1e6 * self.mean(key):9.2f} us/{unit}"
+                             f"  {self.allocations[key] / self.counts[key]:+8.1f} blocks/{unit}")
+        for name, count in sorted(self.calls.items()):
+            lines.append(f"  calls:{name:<16} {count:9d}  {count / max(self.ticks, 1):9.1f} /tick")
+        return "\n".join(lines)
+
+def counted(method, name, calls):
+    """Wraps a bound method so each call bumps calls[name]."""
+    def wrapper(*args, **kwargs):
+        calls[name] += 1
+        return method(*args, **kwargs)
+    return wrapper
+
+clock = time.perf_counter
+allocated_blocks = sys.getallocatedblocks
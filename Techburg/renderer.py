@@ -0,0 +1,54 @@
+# Techburg/renderer.py
+"""
+Incremental canvas renderer. The grid lines are drawn once, and every entity keeps
+one persistent canvas item. Each frame only the entities the Grid reports as changed
+are moved, recolored, created or deleted, so frame time follows the number of
+changes instead of the map area.
+"""
+
+class GridRenderer:
+    def __init__(self, canvas, grid, cell_size):
+        self.canvas, self.cell_size = canvas, cell_size
+        self.items = {}   # entity -> canvas item id
+        self.colors = {}  # entity -> color the item was last drawn with
+        self.reset(grid)
+
+    def reset(self, grid):
+        """Clears the canvas and draws a (new) grid from scratch."""
+        self.grid = grid
+        self.items.clear(); self.colors.clear()
+        self.canvas.delete("all")
+        self.draw_static()
+        grid.track_changes()
+        self.refresh()
+
+    def draw_static(self):
+        size = self.cell_size
+        width, height = self.grid.width * size, self.grid.height * size
+        for x in range(self.grid.width + 1):
+            self.canvas.create_line(x * size, 0, x * size, height, fill="gray25", tags="static")
+        for y in range(self.grid.height + 1):
+            self.canvas.create_line(0, y * size, width, y * size, fill="gray25", tags="static")
+
+    def refresh(self):
+        """Applies the changes since the last frame. Returns how many entities were redrawn."""
+        changed = self.grid.pop_changes()
+        for entity in changed:
+            item = self.items.get(entity)
+            if not self.grid.contains(entity):
+                if item is not None:
+                    self.canvas.delete(item)
+                    del self.items[entity], self.colors[entity]
+                continue
+            x1, y1 = entity.x * self.cell_size, entity.y * self.cell_size
+            x2, y2 = x1 + self.cell_size, y1 + self.cell_size
+            color = getattr(entity, 'color', 'white')
+            if item is None:
+                self.items[entity] = self.canvas.create_rectangle(x1, y1, x2, y2, fill=color, outline="")
+                self.colors[entity] = color
+            else:
+                self.canvas.coords(item, x1, y1, x2, y2)
+                if self.colors[entity] != color:
+                    self.canvas.itemconfigure(item, fill=color)
+                    self.colors[entity] = color
+        return len(changed)
@@ -0,0 +1,210 @@
+# Techburg/replay.py
+"""
+Replay recording and playback. A ReplayRecorder attached to a Grid (grid.recorder)
+writes one record per tick: a full snapshot keyframe every keyframe_interval ticks,
+and in between only what changed (moves, bot energies, swarm sizes, spawns and
+removals). Records stream to the file through a generator, so nothing is kept in
+memory. A ReplayPlayer rebuilds the world from the nearest keyframe at or before any
+tick and applies deltas from there, without running the simulation.
+
+File layout (little endian): a header, then records of
+    kind ('K' keyframe or 'D' delta), payload length, tick, payload
+Entities are named by recorder ids, which stay stable for the whole recording.
+"""
+import mmap
+import struct
+from array import array
+import snapshot
+
+MAGIC = b'TBRP'
+VERSION = 3
+KEYFRAME_INTERVAL = 250
+
+FILE_HEADER = struct.Struct('<4sHIII')
+RECORD = struct.Struct('<cIq')
+DELTA = struct.Struct('<qqqIIIII')
+SPAWN = struct.Struct('<iBiiH')
+COUNT = struct.Struct('<I')
+KEYFRAME, DELTA_RECORD = b'K', b'D'
+
+class ReplayError(ValueError):
+    pass
+
+def record_writer(f):
+    """Generator that writes every (kind, tick, payload) sent to it. Closing it closes f."""
+    try:
+        while True:
+            kind, tick, payload = yield
+            f.write(RECORD.pack(kind, len(payload), tick))
+            f.write(payload)
+    finally:
+        f.close()
+
+class ReplayRecorder:
+    def __init__(self, grid, path, keyframe_interval=KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.ids = {}       # entity -> recorder id
+        self.position = {}  # agent -> (x, y) last written
+        self.energy = {}    # bot -> energy last written
+        self.size = {}      # swarm -> size last written
+        self.next_id = 0
+        f = open(path, 'wb')
+        f.write(FILE_HEADER.pack(MAGIC, VERSION, grid.width, grid.height, keyframe_interval))
+        self.writer = record_writer(f)
+        next(self.writer)
+        self.delta(grid)  # assigns ids and takes the starting state; the keyframe carries it
+        self.keyframe(grid)
+
+    def capture(self, grid):
+        """Records the tick grid just finished. Called by Grid.update_world."""
+        self.writer.send((DELTA_RECORD, grid.tick, self.delta(grid)))
+        if grid.tick - self.keyframe_tick >= self.keyframe_interval: self.keyframe(grid)
+
+    def keyframe(self, grid):
+        """Writes the current world in full. Sequential playback skips it, seeking starts from it."""
+        self.keyframe_tick = grid.tick
+        ids = array('i', [self.ids[entity] for entity in grid.entities])
+        self.writer.send((KEYFRAME, grid.tick, COUNT.pack(len(ids)) + ids.tobytes() + grid.snapshot()))
+
+    def delta(self, grid):
+        ids, entities = self.ids, grid.entities
+        removed, spawns = array('i'), bytearray()
+        if len(ids) != len(entities) or ids.keys() != entities.keys():
+            gone = ids.keys() - entities.keys()
+            for entity in [e for e in ids if e in gone]:
+                removed.append(ids.pop(entity))
+                self.position.pop(entity, None); self.energy.pop(entity, None); self.size.pop(entity, None)
+            for entity in [e for e in entities if e not in ids]:
+                ids[entity], self.next_id = self.next_id, self.next_id + 1
+                name = spawn_name(entity).encode()
+                spawns += SPAWN.pack(ids[entity], snapshot.KINDS.index(entity.type), entity.x, entity.y, len(name)) + name
+
+        moves, bots, energies, sizes = array('i'), array('i'), array('f'), array('i')
+        position, energy, size = self.position, self.energy, self.size
+        for entity_type, entity in self._agents(grid):
+            if position.get(entity) != (entity.x, entity.y):
+                position[entity] = (entity.x, entity.y)
+                moves.extend((ids[entity], entity.x, entity.y))
+            if entity_type == 'swarm':
+                if size.get(entity) != entity.size:
+                    size[entity] = entity.size
+                    sizes.extend((ids[entity], entity.size))
+            elif entity_type != 'drone' and energy.get(entity) != entity.energy:
+                energy[entity] = entity.energy
+                bots.append(ids[entity]); energies.append(entity.energy)
+        return b''.join((DELTA.pack(grid.parts_collected, grid.parts_lost_to_swarms, grid.parts_corroded, len(removed), len(spawns),
+                                    len(moves) // 3, len(bots), len(sizes) // 2),
+                         removed.tobytes(), bytes(spawns), moves.tobytes(), bots.tobytes(), energies.tobytes(), sizes.tobytes()))
+
+    def close(self):
+        self.writer.close()
+
+    @staticmethod
+    def _agents(grid):
+        for entity_type in snapshot.BOT_KINDS + ('drone', 'swarm'):
+            for entity in grid.by_type.get(entity_type, ()): yield entity_type, entity
+
+class ReplayPlayer:
+    """Plays a recording back into a Grid. grid is replaced on seek(), and changed in place
+    (with change tracking, so a GridRenderer can follow it) by step()."""
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.width, self.height, self.keyframe_interval = FILE_HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC: raise ReplayError("Not a Techburg replay")
+        if version != VERSION: raise ReplayError(f"Unsupported replay version {version} (expected {VERSION})")
+        # Only the record headers are read here, to index the keyframes.
+        self.keyframes, self.last_tick = [], None
+        offset = FILE_HEADER.size
+        while offset + RECORD.size <= len(self.data):
+            kind, length, tick = RECORD.unpack_from(self.data, offset)
+            if offset + RECORD.size + length > len(self.data): break  # cut off mid-write
+            if kind == KEYFRAME: self.keyframes.append((tick, offset))
+            self.last_tick = tick
+            offset += RECORD.size + length
+        if not self.keyframes: raise ReplayError("Replay has no keyframe")
+        self.first_tick = self.keyframes[0][0]
+        self.seek(self.first_tick)
+
+    def seek(self, tick):
+        """Rebuilds the world as it was after tick (clamped to the recording). Returns the new grid."""
+        tick = max(self.first_tick, min(tick, self.last_tick))
+        offset = max(offset for keyframe_tick, offset in self.keyframes if keyframe_tick <= tick)
+        self.offset = self._load_keyframe(offset)
+        while self.grid.tick < tick: self.step()
+        return self.grid
+
+    def step(self):
+        """Applies the next tick. Returns False at the end of the recording."""
+        while self.offset + RECORD.size <= len(self.data):
+            kind, length, tick = RECORD.unpack_from(self.data, self.offset)
+            if self.offset + RECORD.size + length > len(self.data): break
+            start = self.offset + RECORD.size
+            self.offset = start + length
+            # A keyframe follows the delta of its own tick, which already brought the grid there.
+            if kind == KEYFRAME: continue
+            self._apply_delta(start)
+            self.grid.tick = self.grid.events.tick = tick
+            return True
+        return False
+
+    def frames(self):
+        """Generator yielding the grid after every remaining tick."""
+        while self.step(): yield self.grid
+
+    def close(self):
+        self.data.close(); self.file.close()
+
+    @property
+    def main_bot(self):
+        return next(iter(self.grid.by_type.get('player_bot', ())), None)
+
+    def _load_keyframe(self, offset):
+        kind, length, tick = RECORD.unpack_from(self.data, offset)
+        start = offset + RECORD.size
+        (count,) = COUNT.unpack_from(self.data, start)
+        ids = array('i'); ids.frombytes(self.data[start + COUNT.size:start + COUNT.size + 4 * count])
+        self.grid, _ = snapshot.load(self.data[start + COUNT.size + 4 * count:start + length])
+        self.entities = dict(zip(ids, self.grid.entities))
+        return start + length
+
+    def _apply_delta(self, offset):
+        data, grid, entities = self.data, self.grid, self.entities
+        grid.parts_collected, grid.parts_lost_to_swarms, grid.parts_corroded, removed, spawn_bytes, moves, bots, sizes = DELTA.unpack_from(data, offset)
+        offset += DELTA.size
+        for entity_id in self._ints(offset, removed): grid.remove_entity(entities.pop(entity_id))
+        offset += 4 * removed
+        end = offset + spawn_bytes
+        while offset < end:
+            entity_id, kind, x, y, length = SPAWN.unpack_from(data, offset); offset += SPAWN.size
+            name = bytes(data[offset:offset + length]).decode(); offset += length
+            entities[entity_id] = make_entity(snapshot.KINDS[kind], name, x, y)
+            grid.add_entity(entities[entity_id])
+        move = self._ints(offset, 3 * moves); offset += 12 * moves
+        for i in range(0, len(move), 3): grid.move_entity(entities[move[i]], move[i + 1], move[i + 2])
+        bot_ids = self._ints(offset, bots); offset += 4 * bots
+        energies = array('f'); energies.frombytes(data[offset:offset + 4 * bots]); offset += 4 * bots
+        for entity_id, energy in zip(bot_ids, energies): entities[entity_id].energy = energy
+        size = self._ints(offset, 2 * sizes)
+        for i in range(0, len(size), 2): entities[size[i]].size = size[i + 1]
+
+    def _ints(self, offset, count):
+        values = array('i'); values.frombytes(self.data[offset:offset + 4 * count])
+        return values
+
+def spawn_name(entity):
+    """What a spawn record needs besides kind and position: a bot's id or a part's size."""
+    if entity.type in snapshot.BOT_KINDS: return entity.bot_id
+    return entity.size if entity.type == 'spare_part' else ''
+
+def make_entity(kind, name, x, y):
+    """A display-only entity for a spawn record."""
+    classes = snapshot.entity_classes()
+    cls = classes[kind]
+    if kind in snapshot.BOT_KINDS:
+        entity = cls.__new__(cls)
+        classes['survivor_bot'].__init__(entity, name, x, y, 0)
+        return entity
+    if kind == 'spare_part': return cls(name, x, y)
+    return cls(x, y)
@@ -0,0 +1,49 @@
+# Techburg/scheduler.py
+"""
+Fixed-timestep tick scheduling, independent of how long rendering takes.
+The display calls run_frame() once per frame. The scheduler runs however many
+simulation ticks are due since the last frame, in one batch, and the display then
+draws only the latest state. Ticks that were never drawn are the dropped frames.
+"""
+import time
+
+class TickScheduler:
+    def __init__(self, tick_interval, frame_budget, max_ticks_per_frame=10, clock=time.perf_counter):
+        self.tick_interval = tick_interval     # seconds per tick at normal speed
+        self.frame_budget = frame_budget       # seconds of simulation work allowed per frame in turbo
+        self.max_ticks_per_frame = max_ticks_per_frame
+        self.clock = clock
+        self.turbo = False
+        self.reset()
+
+    def reset(self):
+        """Forgets any backlog, e.g. after a pause."""
+        self.last = self.clock()
+        self.backlog = 0.0
+
+    def ticks_due(self):
+        now = self.clock()
+        self.backlog += now - self.last
+        self.last = now
+        due = int(self.backlog // self.tick_interval)
+        self.backlog -= due * self.tick_interval
+        if due > self.max_ticks_per_frame:
+            # Too far behind to catch up: run a capped batch and drop the rest, so the UI stays responsive.
+            due, self.backlog = self.max_ticks_per_frame, 0.0
+        return due
+
+    def run_frame(self, step):
+        """Calls step() for every tick due this frame, or for the whole frame budget in turbo mode.
+        step returns False to stop early (game over). Returns the number of ticks run."""
+        ran = 0
+        if self.turbo:
+            deadline = self.clock() + self.frame_budget
+            while True:
+                ran += 1
+                if not step() or self.clock() >= deadline: break
+            self.reset()
+        else:
+            for _ in range(self.ticks_due()):
+                ran += 1
+                if not step(): break
+        return ran
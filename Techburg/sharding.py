@@ -0,0 +1,270 @@
+# Techburg/sharding.py
+"""
+Chunked world for very large maps. The map is cut into CHUNK_SIZE x CHUNK_SIZE chunks,
+each a small Grid of its own (with its own entity store, indexes, fields and RNG) that
+covers the chunk plus a CHUNK_HALO cell border. A tick runs in two phases:
+
+    update    every chunk runs Grid.update_world on the agents it owns, on its own,
+              so chunks can be spread over worker processes
+    exchange  the coordinator routes, in chunk order, the agents that left a chunk to
+              their new owner, copies of the bots near each border ("ghosts") into the
+              halos of the chunks next to it, the damage dealt to ghosts back to
+              the chunks that own those bots, and the events each chunk logged onto
+              the grid's event log
+
+Threats therefore see bots up to CHUNK_HALO cells into the next chunk (toroidal wrap
+included), and damage dealt across an edge lands at the start of the next tick. Bots
+look for parts and stations inside their own chunk. Every chunk gets its own RNG seeded
+from the grid's RNG, so a run depends on the seed and the chunk layout but not on the
+number of workers.
+"""
+import multiprocessing
+import pickle
+from grid import Grid
+
+class GhostBot:
+    """Read-only stand-in for a bot owned by a neighbouring chunk. Threats target and damage
+    it like a real bot; the damage is collected and sent to the owner instead of applied."""
+    __slots__ = ('x', 'y', 'type', 'bot_id', 'home', 'start_energy', 'damage')
+    color = 'gray50'
+
+    def __init__(self, bot_type, bot_id, home, x, y, energy):
+        self.type, self.bot_id, self.home = bot_type, bot_id, home
+        self.x, self.y = x, y
+        self.start_energy, self.damage = energy, 0
+
+    @property
+    def energy(self):
+        return self.start_energy
+
+    @energy.setter
+    def energy(self, value):
+        self.damage += self.start_energy - value
+
+    def update(self, grid):
+        pass
+
+class ChunkGrid(Grid):
+    """The Grid of one chunk. Local coordinates are offset by the halo, so the owned cells
+    are halo <= x < halo + owned width. Agents that step off them are handed to the
+    coordinator as migrants instead of wrapping around the chunk."""
+
+    def __init__(self, index, origin, owned, world_size, halo, seed, settings):
+        super().__init__(owned[0] + 2 * halo, owned[1] + 2 * halo, seed=seed, settings=settings)
+        self.index, self.origin, self.owned, self.world_size, self.halo = index, origin, owned, world_size, halo
+        self.migrants = []
+        self.ghosts = []
+        self.logged = []  # this tick's events, handed to the coordinator by step()
+        self.events.subscribe(self.logged.extend)
+
+    def owns(self, x, y):
+        halo = self.halo
+        return halo <= x < halo + self.owned[0] and halo <= y < halo + self.owned[1]
+
+    def to_global(self, x, y):
+        return (x - self.halo + self.origin[0]) % self.world_size[0], (y - self.halo + self.origin[1]) % self.world_size[1]
+
+    def local_positions(self, x, y):
+        """Every local position of global (x, y) on this chunk, owned cells and halo."""
+        found = []
+        for axis in (0, 1):
+            size, owned, d = self.world_size[axis], self.owned[axis], ((x, y)[axis] - self.origin[axis]) % self.world_size[axis]
+            found.append([c + self.halo for c in (d - size, d, d + size) if -self.halo <= c < owned + self.halo])
+        return [(lx, ly) for lx in found[0] for ly in found[1]]
+
+    def place(self, entity, x, y):
+        """Adds an owned entity at global (x, y)."""
+        entity.x, entity.y = (x - self.origin[0]) % self.world_size[0] + self.halo, (y - self.origin[1]) % self.world_size[1] + self.halo
+        self.add_entity(entity)
+
+    def move_entity(self, entity, new_x, new_y):
+        if self.owns(new_x, new_y) or not self.contains(entity):
+            return super().move_entity(entity, new_x, new_y)
+        self.remove_entity(entity)
+        entity.x, entity.y = new_x, new_y  # still local; made global when handed over
+        self.migrants.append(entity)
+
+    def step(self, damage, migrants, ghosts):
+        """One tick of this chunk. Takes what the exchange routed here, returns what leaves it."""
+        if damage:
+            bots = {bot.bot_id: bot for bot in self.get_all_bots()}
+            for bot_id, amount in damage:
+                if bot_id in bots: bots[bot_id].energy -= amount
+        for entity, x, y in migrants: self.place(entity, x, y)
+        for bot_type, bot_id, home, x, y, energy in ghosts:
+            for lx, ly in self.local_positions(x, y):
+                if not self.owns(lx, ly):
+                    ghost = GhostBot(bot_type, bot_id, home, lx, ly, energy)
+                    self.ghosts.append(ghost); self.add_entity(ghost)
+
+        self.update_world()
+        logged = [self.world_event(event) for event in self.logged]
+        self.logged.clear()
+
+        dealt = [(ghost.home, ghost.bot_id, ghost.damage) for ghost in self.ghosts if ghost.damage]
+        for ghost in self.ghosts: self.remove_entity(ghost)
+        self.ghosts = []
+        leaving = []
+        for entity in self.migrants:
+            for attribute in ('target_bot', 'target_entity', 'path'):
+                if hasattr(entity, attribute): setattr(entity, attribute, None)
+            leaving.append((entity,) + self.to_global(entity.x, entity.y))
+        self.migrants = []
+        return leaving, self.border_bots(), dealt, self.counters(leaving), logged
+
+    def world_event(self, event):
+        """event with the cells it names, the "({},{})" pairs of its template, made global."""
+        args, parts = list(event.args), event.template.split('{}')
+        for i in range(len(args) - 1):
+            if parts[i].endswith('(') and parts[i + 1] == ',': args[i], args[i + 1] = self.to_global(args[i], args[i + 1])
+        return event._replace(args=tuple(args))
+
+    def border_bots(self):
+        """(type, id, chunk, global x, global y, energy) of owned bots close enough to an edge to be seen from next door."""
+        halo, (width, height) = self.halo, self.owned
+        return [(bot.type, bot.bot_id, self.index) + self.to_global(bot.x, bot.y) + (bot.energy,)
+                for bot in self.get_all_bots()
+                if bot.x < 2 * halo or bot.y < 2 * halo or bot.x >= width or bot.y >= height]
+
+    def counters(self, leaving=()):
+        bots = self.get_all_bots() + [e for e, _, _ in leaving if hasattr(e, 'bot_id')]
+        main = [bot.energy for bot in bots if bot.type == 'player_bot']
+        return self.parts_collected, self.parts_lost_to_swarms, len(bots), main[0] if main else None, self.parts_corroded
+
+    def export(self):
+        """Pickled copies of the owned entities at global coordinates, for ShardedWorld.sync()."""
+        entities = list(self.entities)
+        copies = pickle.loads(pickle.dumps(entities))
+        for original, copy in zip(entities, copies):
+            copy.x, copy.y = self.to_global(original.x, original.y)
+            for attribute in ('target_bot', 'target_entity'):
+                if isinstance(getattr(copy, attribute, None), GhostBot): setattr(copy, attribute, None)
+        return copies
+
+def _serve(connection, chunks):
+    """Worker process loop: runs the chunks it was given, one request at a time."""
+    chunks = {chunk.index: chunk for chunk in chunks}
+    while True:
+        request = connection.recv()
+        if request is None: break
+        command, payload = request
+        if command == 'step': connection.send({i: chunks[i].step(*inputs) for i, inputs in payload.items()})
+        elif command == 'export': connection.send({i: chunks[i].export() for i in sorted(chunks)})
+    connection.close()
+
+class ShardedWorld:
+    """Runs the ticks of a populated Grid on chunks. Like VectorWorld, the grid itself is left
+    empty while the chunks run it, until sync() copies the chunk state back."""
+
+    def __init__(self, grid, main_bot=None, workers=None):
+        settings = grid.settings
+        self.grid = grid
+        size, halo = settings.CHUNK_SIZE, settings.CHUNK_HALO
+        self.columns, self.rows = -(-grid.width // size), -(-grid.height // size)
+        # Ghosts only travel to adjacent chunks, so no chunk may be narrower than the halo.
+        if min(size, grid.width % size or size, grid.height % size or size) < 2 * halo:
+            raise ValueError(f"Every chunk must be at least {2 * halo} cells wide (CHUNK_SIZE and the map size)")
+        # Bots built at runtime would need a placement over the whole map.
+        if settings.BOT_SPAWNING: raise ValueError("The sharded backend does not support BOT_SPAWNING")
+        # Swarms merging and splitting across chunk borders would need their own exchange.
+        if settings.SWARM_DYNAMICS: raise ValueError("The sharded backend does not support SWARM_DYNAMICS")
+        self.size = size
+        chunks = []
+        for row in range(self.rows):
+            for column in range(self.columns):
+                origin = (column * size, row * size)
+                owned = (min(size, grid.width - origin[0]), min(size, grid.height - origin[1]))
+                chunks.append(ChunkGrid(len(chunks), origin, owned, (grid.width, grid.height), halo,
+                                        grid.rng.getrandbits(64), settings))
+        for entity in list(grid.entities):
+            x, y = entity.x, entity.y
+            grid.remove_entity(entity)
+            chunks[self.chunk_at(x, y)].place(entity, x, y)
+        for chunk in chunks:
+            chunk.parts_collected = chunk.parts_lost_to_swarms = chunk.parts_corroded = 0
+            chunk.tick = chunk.events.tick = grid.tick  # timers are due on world ticks
+            chunk.events.level, chunk.events.muted = grid.events.level, set(grid.events.muted)
+        self.base_collected, self.base_lost, self.base_corroded = grid.parts_collected, grid.parts_lost_to_swarms, grid.parts_corroded
+        self.neighbours = [self._neighbours(chunk.index) for chunk in chunks]
+        self.inputs = {chunk.index: ([], [], []) for chunk in chunks}  # damage, migrants, ghosts per chunk
+        for chunk in chunks:  # the first tick needs ghosts too
+            self._route_ghosts(chunk.index, chunk.border_bots())
+        self.counters = {chunk.index: chunk.counters() for chunk in chunks}
+
+        self.workers = max(1, min(workers or settings.SHARD_WORKERS, len(chunks)))
+        self.chunks, self.processes = None, []
+        if self.workers == 1: self.chunks = chunks
+        else:
+            context = multiprocessing.get_context()
+            for w in range(self.workers):
+                parent, child = context.Pipe()
+                process = context.Process(target=_serve, args=(child, chunks[w::self.workers]), daemon=True)
+                process.start(); child.close()
+                self.processes.append((process, parent))
+
+    def chunk_at(self, x, y):
+        return (y // self.size) * self.columns + x // self.size
+
+    def _neighbours(self, index):
+        row, column = divmod(index, self.columns)
+        return sorted({((row + dy) % self.rows) * self.columns + (column + dx) % self.columns
+                       for dx in (-1, 0, 1) for dy in (-1, 0, 1)})
+
+    def _route_ghosts(self, source, border):
+        for neighbour in self.neighbours[source]:
+            self.inputs[neighbour][2].extend(border)
+
+    # --- Tick ---
+
+    def update_world(self):
+        self.grid.tick += 1
+        self.grid.events.tick = self.grid.tick
+        inputs, self.inputs = self.inputs, {i: ([], [], []) for i in self.inputs}
+        if self.chunks: results = {chunk.index: chunk.step(*inputs[chunk.index]) for chunk in self.chunks}
+        else:
+            for w, (process, connection) in enumerate(self.processes):
+                connection.send(('step', {i: inputs[i] for i in range(w, len(inputs), self.workers)}))
+            results = {}
+            for process, connection in self.processes: results.update(connection.recv())
+
+        # Exchange, always in chunk order so the outcome does not depend on the workers.
+        for index in sorted(results):
+            leaving, border, dealt, self.counters[index], logged = results[index]
+            for event in logged: self.grid.events.emit(event.category, event.level, event.template, *event.args)
+            for entity, x, y in leaving: self.inputs[self.chunk_at(x, y)][1].append((entity, x, y))
+            self._route_ghosts(index, border)
+            for home, bot_id, amount in dealt: self.inputs[home][0].append((bot_id, amount))
+        self.grid.parts_collected = self.base_collected + sum(c[0] for c in self.counters.values())
+        self.grid.parts_lost_to_swarms = self.base_lost + sum(c[1] for c in self.counters.values())
+        self.grid.parts_corroded = self.base_corroded + sum(c[4] for c in self.counters.values())
+
+    def bot_count(self):
+        return sum(c[2] for c in self.counters.values())
+
+    def main_bot_energy(self):
+        energies = [c[3] for c in self.counters.values() if c[3] is not None]
+        return energies[0] if energies else 0
+
+    def sync(self):
+        """Copies the chunk state into the grid (which is cleared first). Returns the grid."""
+        if self.chunks: exported = {chunk.index: chunk.export() for chunk in self.chunks}
+        else:
+            exported = {}
+            for process, connection in self.processes:
+                connection.send(('export', None)); exported.update(connection.recv())
+        grid = self.grid
+        grid.clear()
+        for index in sorted(exported):
+            for entity in exported[index]: grid.add_entity(entity)
+        # Agents in transit between chunks belong to the chunk they are heading for.
+        for index in sorted(self.inputs):
+            for entity, x, y in self.inputs[index][1]:
+                copy = pickle.loads(pickle.dumps(entity)); copy.x, copy.y = x, y
+                grid.add_entity(copy)
+        return grid
+
+    def close(self):
+        for process, connection in self.processes:
+            connection.send(None); connection.close()
+            process.join()
+        self.processes = []
@@ -0,0 +1,143 @@
+# Techburg/simulation.py
+"""
+UI-free simulation engine. Drives Grid.populate_world and Grid.update_world
+without any pacing, so it runs as fast as the CPU allows.
+"""
+import time
+import config
+from grid import Grid
+from events import line_sink
+from profiler import clock
+
+def new_world(settings, seed=None, logger_func=None):
+    """A Grid populated as the settings say. Returns (grid, main bot)."""
+    s = settings
+    grid = Grid(s.GRID_WIDTH, s.GRID_HEIGHT, logger_func, seed=seed, settings=s)
+    main_bot = grid.populate_world(
+        num_parts=s.NUM_PARTS, num_stations=s.NUM_STATIONS, num_drones=s.NUM_DRONES,
+        num_swarms=s.NUM_SWARMS, num_gatherers=s.NUM_GATHERERS, num_repair_bots=s.NUM_REPAIR_BOTS
+    )
+    return grid, main_bot
+
+def check_outcome(grid, main_bot, world=None):
+    """Applies the win/lose rules. Returns (outcome, reason); outcome is None while the game is running.
+    With a vectorized world, bot state is read from its arrays instead of the objects."""
+    # Parts that corroded away (PART_DISPOSAL) can no longer be collected, so they leave the goal.
+    goal = grid.initial_part_count - grid.parts_corroded
+    if grid.initial_part_count > 0 and grid.parts_collected > 0 and grid.parts_collected >= goal:
+        return 'won', "All parts were collected!"
+    if not main_bot or (world.main_bot_energy() if world else main_bot.energy) <= 0:
+        return 'lost', "The main survivor bot ran out of energy!"
+    if not (world.bot_count() if world else grid.get_all_bots()):
+        return 'lost', "All other survivor bots were eliminated!"
+    return None, ""
+
+class Simulation:
+    BACKENDS = ('object', 'vectorized', 'sharded', 'two_phase')
+
+    def __init__(self, settings=None, seed=None, logger_func=None, backend='object', templates=None):
+        """templates: a TemplateCache (see templates.py) to take seeded worlds from instead of populating them."""
+        if backend not in self.BACKENDS: raise ValueError(f"Unknown backend: {backend}")
+        self.settings = settings if settings else config.load()
+        self.seed = seed
+        if templates is not None and seed is not None:
+            self.grid = Grid.restore(templates.get(self.settings, seed))
+            if logger_func: self.grid.events.subscribe(line_sink(logger_func))
+            self.main_bot = next(iter(self.grid.by_type.get('player_bot', ())), None)
+        else: self.grid, self.main_bot = new_world(self.settings, seed, logger_func)
+        self.initial_survivor_count = len(self.grid.get_all_bots())
+        self._attach_backend(backend)
+        self.ticks = 0
+        self.elapsed = 0.0
+        self.outcome, self.reason = None, ""
+
+    def _attach_backend(self, backend):
+        self.world = None
+        if backend == 'vectorized':
+            from vectorized import VectorWorld  # needs numpy, so only imported on request
+            self.world = VectorWorld(self.grid, self.main_bot)
+        elif backend == 'sharded':
+            from sharding import ShardedWorld
+            self.world = ShardedWorld(self.grid, self.main_bot)
+        elif backend == 'two_phase':
+            from twophase import TwoPhaseWorld
+            self.world = TwoPhaseWorld(self.grid, self.main_bot)
+
+    def close(self):
+        """Stops the worker processes of a sharded world, or the threads of a two-phase one."""
+        if hasattr(self.world, 'close'): self.world.close()
+
+    def snapshot(self):
+        """The full simulation state as snapshot bytes (see snapshot.py)."""
+        if self.world: self.world.sync()
+        return self.grid.snapshot({'seed': self.seed, 'ticks': self.ticks, 'elapsed': self.elapsed,
+                                   'initial_survivor_count': self.initial_survivor_count})
+
+    @classmethod
+    def restore(cls, data, backend='object'):
+        """A simulation continuing from snapshot() bytes, on either backend."""
+        import snapshot
+        if backend not in cls.BACKENDS: raise ValueError(f"Unknown backend: {backend}")
+        grid, meta = snapshot.load(data)
+        return cls._resume(grid, meta, backend)
+
+    def save(self, path):
+        with open(path, 'wb') as f: f.write(self.snapshot())
+
+    @classmethod
+    def load(cls, path, backend='object'):
+        import snapshot
+        if backend not in cls.BACKENDS: raise ValueError(f"Unknown backend: {backend}")
+        grid, meta = snapshot.load_file(path)
+        return cls._resume(grid, meta, backend)
+
+    @classmethod
+    def _resume(cls, grid, meta, backend):
+        sim = cls.__new__(cls)
+        sim.settings, sim.grid, sim.seed = grid.settings, grid, meta.get('seed')
+        sim.main_bot = next(iter(grid.by_type.get('player_bot', ())), None)
+        sim.initial_survivor_count = meta.get('initial_survivor_count', len(grid.get_all_bots()))
+        sim._attach_backend(backend)
+        sim.ticks, sim.elapsed = meta.get('ticks', 0), meta.get('elapsed', 0.0)
+        sim.outcome, sim.reason = check_outcome(grid, sim.main_bot, sim.world)
+        return sim
+
+    def step(self):
+        """Runs one tick and updates the outcome. Returns True while the game is still running."""
+        if self.world:
+            metrics = self.grid.metrics
+            started = clock() if metrics else 0.0
+            self.world.update_world()
+            if metrics: metrics.capture(self.grid, clock() - started, self.world)
+            self.outcome, self.reason = check_outcome(self.grid, self.main_bot, self.world)
+        else:
+            self.grid.update_world()
+            self.outcome, self.reason = check_outcome(self.grid, self.main_bot)
+        self.grid.events.flush()
+        self.ticks += 1
+        return self.outcome is None
+
+    def run(self, max_ticks):
+        """Runs until the game ends or max_ticks is reached, then returns the summary."""
+        start = time.perf_counter()
+        while self.outcome is None and self.ticks < max_ticks and self.step(): pass
+        self.elapsed += time.perf_counter() - start
+        return self.summary()
+
+    def summary(self):
+        if self.world: self.world.sync()
+        survivors = len(self.grid.get_all_bots())
+        return {
+            'seed': self.seed,
+            'ticks': self.ticks,
+            'elapsed': self.elapsed,
+            'ticks_per_second': self.ticks / self.elapsed if self.elapsed else 0.0,
+            'outcome': self.outcome or 'timeout',
+            'reason': self.reason,
+            'parts_collected': self.grid.parts_collected,
+            'parts_goal': self.grid.initial_part_count,
+            'parts_lost_to_swarms': self.grid.parts_lost_to_swarms,
+            'parts_corroded': self.grid.parts_corroded,
+            'survivors': survivors,
+            'bots_destroyed': self.initial_survivor_count - survivors,
+        }
@@ -0,0 +1,266 @@
+# Techburg/snapshot.py
+"""
+Versioned binary snapshots of a whole Grid: every entity with its full state, the cell
+and update order, the RNG state and the distance fields. A restored grid continues
+exactly as the original would have, tick for tick. The planner's cached searches are not
+stored: dump() drops them from the grid it saves, so both grids search again on demand.
+
+Layout (little endian):
+    header   magic, version, width, height, entity count, tick and grid counters
+    meta     length-prefixed JSON: settings, caller metadata and the string table
+    rng      the 625 words of the Mersenne Twister state and the cached gauss value
+    entities one record per entity: kind, on-grid flag, x, y, rank in its cell, payload
+    fields   built distance fields as raw distance and owner-id arrays
+    free     the empty-cell list in its current order (placement draws from it), if built
+    decide   bots waiting for a goal decision, in queue order, and bots near a threat
+
+Entity references (targets, carried parts, field owners) are stored as indices into the
+entity list. The grid's entities come first, in grid order; entities that left the grid
+but are still referenced (a carried part, a drone's destroyed target) follow, flagged as
+off-grid. Files are read through mmap, so only the bytes actually unpacked are paged in.
+
+Snapshots written by earlier versions still load, with defaults for what they lack:
+    1  no corroded-part count (0); enhancements store ticks left, parts no landing tick
+       (corrosion counts from the tick the snapshot is loaded on)
+    <3 no free list (rebuilt on first placement)
+    <4 no decision queue (left empty)
+    <5 cached A* plans, skipped
+    5  the planner's goal searches, skipped
+"""
+import json
+import mmap
+import struct
+from array import array
+from types import SimpleNamespace
+import config
+
+MAGIC = b'TBSN'
+VERSION = 6
+NONE = -1
+
+HEADER = struct.Struct('<4sHIIIqqqqq')
+VERSION_FIELD = struct.Struct('<4sH')
+LENGTH = struct.Struct('<I')
+COUNT = struct.Struct('<i')
+RNG_STATE = struct.Struct('<625I?d')
+ENTITY = struct.Struct('<B?iiI')
+BOT = struct.Struct('<IddiiiiIi')
+PAIR = struct.Struct('<ii')
+ENHANCEMENT = struct.Struct('<Iq')
+DRONE = struct.Struct('<i')
+SWARM = struct.Struct('<id')
+PART = struct.Struct('<Iq')
+# Records of earlier versions, read by load() only.
+SEARCH = struct.Struct('<iiII')
+HEADER_V1 = struct.Struct('<4sHIIIqqqq')
+ENHANCEMENT_V1 = struct.Struct('<Ii')
+PART_V1 = struct.Struct('<I')
+PLAN = struct.Struct('<iiiiI')
+
+KINDS = ('player_bot', 'gatherer_bot', 'repair_bot', 'survivor_bot', 'drone', 'swarm', 'spare_part', 'recharge_station')
+BOT_KINDS = KINDS[:4]
+
+class SnapshotError(ValueError):
+    pass
+
+def entity_classes():
+    from agents.survivor_bot import PlayerBot, GathererBot, RepairBot, SurvivorBot
+    from agents.drone import MalfunctioningDrone
+    from agents.swarm import ScavengerSwarm
+    from entities import SparePart, RechargeStation
+    classes = (PlayerBot, GathererBot, RepairBot, SurvivorBot, MalfunctioningDrone, ScavengerSwarm, SparePart, RechargeStation)
+    return dict(zip(KINDS, classes))
+
+class _Strings:
+    def __init__(self):
+        self.index, self.table = {}, []
+
+    def __call__(self, text):
+        if text not in self.index:
+            self.index[text] = len(self.table); self.table.append(text)
+        return self.index[text]
+
+def dump(grid, meta=None):
+    """Serializes grid (and any JSON-serializable meta) to bytes. Drops the grid's cached path searches."""
+    order = list(grid.entities)
+    ids = {entity: i for i, entity in enumerate(order)}
+    def ref(entity):
+        if entity is None: return NONE
+        if entity not in ids: ids[entity] = len(order); order.append(entity)  # off-grid, written after the rest
+        return ids[entity]
+    strings = _Strings()
+    body = bytearray()
+
+    decisions = grid.decisions
+    # Referenced before the entity records are written, so off-grid ones are written too.
+    waiting = [ref(bot) for bot in decisions.pending] if decisions else []
+    threatened = sorted(ref(bot) for bot in decisions.threatened) if decisions else []
+
+    on_grid = len(grid.entities)
+    i = 0
+    while i < len(order):
+        entity = order[i]
+        rank = grid.cells[(entity.x, entity.y)].index(entity) if i < on_grid else 0
+        body += ENTITY.pack(KINDS.index(entity.type), i < on_grid, entity.x, entity.y, rank)
+        i += 1
+        if entity.type in BOT_KINDS:
+            path = entity.path
+            body += BOT.pack(strings(entity.bot_id), entity.energy, entity.energy_depletion_rate, entity.base_max_energy,
+                             entity.stunned, ref(entity.carrying_part), ref(entity.target_entity), len(entity.active_enhancements),
+                             NONE if path is None else len(path))
+            for name, expires in entity.active_enhancements.items(): body += ENHANCEMENT.pack(strings(name), expires)
+            for x, y in path or (): body += PAIR.pack(x, y)
+        elif entity.type == 'drone':
+            body += DRONE.pack(ref(entity.target_bot))
+        elif entity.type == 'swarm':
+            body += SWARM.pack(entity.size, entity.damage_radius)
+        elif entity.type == 'spare_part':
+            body += PART.pack(strings(entity.size), NONE if entity.created is None else entity.created)
+
+    body += LENGTH.pack(len(grid.fields))
+    for entity_type, field in grid.fields.items():
+        body += LENGTH.pack(strings(entity_type))
+        body += field.distance.tobytes()
+        body += array('i', [NONE if owner is None else ids[owner] for owner in field.owner]).tobytes()
+
+    # The searches only speed up planning, and can take many megabytes; they are rebuilt on demand.
+    if grid.planner: grid.planner.cache.clear()
+
+    body += COUNT.pack(NONE if grid.free is None else len(grid.free))
+    if grid.free is not None: body += grid.free.tobytes()
+
+    body += LENGTH.pack(len(waiting)) + array('i', waiting).tobytes()
+    body += LENGTH.pack(len(threatened)) + array('i', threatened).tobytes()
+
+    version, state, gauss = grid.rng.getstate()
+    info = json.dumps({'settings': vars(grid.settings), 'meta': meta or {}, 'strings': strings.table}).encode()
+    return b''.join((
+        HEADER.pack(MAGIC, VERSION, grid.width, grid.height, len(order), grid.tick,
+                    grid.parts_collected, grid.parts_lost_to_swarms, grid.initial_part_count, grid.parts_corroded),
+        LENGTH.pack(len(info)), info,
+        RNG_STATE.pack(*state, gauss is not None, gauss or 0.0),
+        bytes(body),
+    ))
+
+def load(data):
+    """Rebuilds a Grid from dump() output (bytes or any buffer, such as an mmap).
+    Returns (grid, meta)."""
+    from grid import Grid
+    from ai.distance_field import DistanceField
+    from entities import PART_KINDS
+    # Magic and version come first, so the version can be checked before the rest of the header.
+    if len(data) < HEADER_V1.size or bytes(data[:len(MAGIC)]) != MAGIC: raise SnapshotError("Not a Techburg snapshot")
+    _, version = VERSION_FIELD.unpack_from(data, 0)
+    if not 1 <= version <= VERSION: raise SnapshotError(f"Unsupported snapshot version {version} (expected up to {VERSION})")
+    if version == 1:
+        _, _, width, height, count, tick, collected, lost, initial_parts = HEADER_V1.unpack_from(data, 0)
+        corroded, offset = 0, HEADER_V1.size
+    else:
+        _, _, width, height, count, tick, collected, lost, initial_parts, corroded = HEADER.unpack_from(data, 0)
+        offset = HEADER.size
+    (length,) = LENGTH.unpack_from(data, offset); offset += LENGTH.size
+    info = json.loads(bytes(data[offset:offset + length])); offset += length
+    strings = info['strings']
+
+    # Settings added after the snapshot was written keep their defaults.
+    settings = vars(config.load())
+    settings.update(info['settings'])
+    grid = Grid(width, height, settings=SimpleNamespace(**settings))
+    grid.tick = grid.events.tick = tick
+    grid.parts_collected, grid.parts_lost_to_swarms, grid.initial_part_count = collected, lost, initial_parts
+    grid.parts_corroded = corroded
+    *state, has_gauss, gauss = RNG_STATE.unpack_from(data, offset); offset += RNG_STATE.size
+    grid.rng.setstate((3, tuple(state), gauss if has_gauss else None))
+
+    classes = entity_classes()
+    entities, ranks, links = [], [], []
+    for _ in range(count):
+        kind, placed, x, y, rank = ENTITY.unpack_from(data, offset); offset += ENTITY.size
+        kind = KINDS[kind]
+        entity = classes[kind].__new__(classes[kind])
+        entity.x, entity.y = x, y
+        if kind in BOT_KINDS:
+            (name, entity.energy, entity.energy_depletion_rate, entity.base_max_energy, entity.stunned,
+             carried, target, enhancements, path_length) = BOT.unpack_from(data, offset); offset += BOT.size
+            entity.bot_id = strings[name]
+            entity.active_enhancements = {}
+            for _ in range(enhancements):
+                if version == 1:  # ticks left; see SurvivorBot.enhancement_life
+                    name, life = ENHANCEMENT_V1.unpack_from(data, offset); offset += ENHANCEMENT_V1.size
+                    expires = tick + life + 1
+                else:
+                    name, expires = ENHANCEMENT.unpack_from(data, offset); offset += ENHANCEMENT.size
+                entity.active_enhancements[strings[name]] = expires
+            entity.path = None if path_length == NONE else []
+            for _ in range(max(path_length, 0)):
+                entity.path.append(PAIR.unpack_from(data, offset)); offset += PAIR.size
+            entity.recalculate_stats()
+            links += (entity, 'carrying_part', carried), (entity, 'target_entity', target)
+        elif kind == 'drone':
+            (target,) = DRONE.unpack_from(data, offset); offset += DRONE.size
+            links.append((entity, 'target_bot', target))
+        elif kind == 'swarm':
+            entity.size, entity.damage_radius = SWARM.unpack_from(data, offset); offset += SWARM.size
+        elif kind == 'spare_part':
+            if version == 1:
+                (size,) = PART_V1.unpack_from(data, offset); offset += PART_V1.size
+                created = NONE
+            else:
+                size, created = PART.unpack_from(data, offset); offset += PART.size
+            entity.size, entity.created = strings[size], None if created == NONE else created
+            entity.enhancement_type, entity.color = PART_KINDS.get(entity.size, PART_KINDS['small'])
+        entities.append(entity); ranks.append(rank if placed else None)
+
+    for entity, attribute, target in links:
+        setattr(entity, attribute, entities[target] if target != NONE else None)
+    # Adding an entity also schedules its timers (part corrosion, enhancement expiry).
+    for entity, rank in zip(entities, ranks):
+        if rank is not None: grid.add_entity(entity)
+    # add_entity appended to cells in entity order; put shared cells back in arrival order.
+    rank_of = dict(zip(entities, ranks))
+    for cell in grid.cells.values():
+        if len(cell) > 1: cell.sort(key=rank_of.__getitem__)
+
+    size = width * height
+    (field_count,) = LENGTH.unpack_from(data, offset); offset += LENGTH.size
+    for _ in range(field_count):
+        (name,) = LENGTH.unpack_from(data, offset); offset += LENGTH.size
+        field = DistanceField(width, height)
+        field.distance = array('i'); field.distance.frombytes(data[offset:offset + 4 * size]); offset += 4 * size
+        owners = array('i'); owners.frombytes(data[offset:offset + 4 * size]); offset += 4 * size
+        field.owner = [None if owner == NONE else entities[owner] for owner in owners]
+        for source in grid.by_type.get(strings[name], ()): field._register(source)
+        grid.fields[strings[name]] = field
+
+    if version < 6:  # the planner's cache, which is no longer stored
+        (searches,) = LENGTH.unpack_from(data, offset); offset += LENGTH.size
+        for _ in range(searches):
+            if version < 5:
+                *_, length = PLAN.unpack_from(data, offset); offset += PLAN.size + PAIR.size * length
+            else:
+                _, _, frontier, reached = SEARCH.unpack_from(data, offset); offset += SEARCH.size + 4 * (frontier + 2 * reached)
+
+    free = NONE
+    if version >= 3: (free,) = COUNT.unpack_from(data, offset); offset += COUNT.size
+    if free != NONE:
+        grid.free = array('i'); grid.free.frombytes(data[offset:offset + 4 * free]); offset += 4 * free
+        grid.free_slot = array('i', [-1]) * size
+        for slot, index in enumerate(grid.free): grid.free_slot[index] = slot
+
+    refs = []
+    for _ in range(2 if version >= 4 else 0):
+        (length,) = LENGTH.unpack_from(data, offset); offset += LENGTH.size
+        found = array('i'); found.frombytes(data[offset:offset + 4 * length]); offset += 4 * length
+        refs.append([entities[i] for i in found])
+    if grid.decisions and refs:
+        grid.decisions.pending = dict.fromkeys(refs[0])
+        grid.decisions.threatened = set(refs[1])
+    return grid, info['meta']
+
+def save(grid, path, meta=None):
+    with open(path, 'wb') as f: f.write(dump(grid, meta))
+
+def load_file(path):
+    """Like load(), reading the file through a read-only memory map."""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return load(data)
@@ -0,0 +1,115 @@
+# Techburg/sweep.py
+"""
+Parameter sweeps / Monte Carlo runs over the settings in config.py.
+Every combination of overrides is run once per seed, and the independent runs
+are spread across a process pool. The same seeds always give the same table.
+Each world is populated once, before the pool starts, and the workers start their
+runs from those templates (see templates.py) instead of populating their own.
+
+    python Techburg/sweep.py --param NUM_DRONES=2,5,8 --param BOT_RECHARGE_THRESHOLD=0.3,0.5 --seeds 20
+"""
+import argparse
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import config
+from simulation import Simulation
+from templates import TemplateCache
+
+# Read only by the UI or by backends other than the one sweeps run on.
+NOT_SWEPT = {'CELL_SIZE', 'CHUNK_SIZE', 'CHUNK_HALO'}
+
+_templates = None  # the sweep's TemplateCache; workers forked after it was warmed share it
+
+def expand_grid(param_grid):
+    """Turns {'NUM_DRONES': [2, 5], ...} into one override dict per combination."""
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[n] for n in names))]
+
+def template_cache(directory=None):
+    """The process's TemplateCache for directory, made on first use (in a worker that was not forked)."""
+    global _templates
+    if _templates is None or _templates.directory != directory: _templates = TemplateCache(directory)
+    return _templates
+
+def run_one(job):
+    """Worker: runs a single seeded simulation. Must stay a module-level function so it can be pickled."""
+    overrides, seed, max_ticks, template_dir = job
+    summary = Simulation(config.load(overrides), seed, templates=template_cache(template_dir)).run(max_ticks)
+    summary['overrides'] = overrides
+    return summary
+
+def run_sweep(param_grid, seeds, max_ticks, workers=None, template_dir=None):
+    """Runs every combination for every seed. Results come back in job order whatever the worker count.
+    The templates are kept in template_dir too, if given, for workers that are not forked and later sweeps."""
+    combinations = expand_grid(param_grid)
+    templates = template_cache(template_dir)
+    # Fails fast on bad settings, before starting workers.
+    for overrides in combinations:
+        settings = config.load(overrides)
+        inert = sorted(set(config.inert(overrides, settings)) | NOT_SWEPT.intersection(overrides))
+        if inert: raise ValueError(f"Settings with no effect on the sweep's runs: {', '.join(inert)}")
+        templates.warm(settings, seeds)
+    jobs = [(overrides, seed, max_ticks, template_dir) for overrides in combinations for seed in seeds]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [run_one(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Large chunks keep the pickling overhead small next to the runs themselves.
+        return list(pool.map(run_one, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+def aggregate(results):
+    """Combines the runs of each override combination into one row."""
+    groups = {}
+    for result in results:
+        groups.setdefault(tuple(sorted(result['overrides'].items())), []).append(result)
+    rows = []
+    for key, runs in groups.items():
+        wins = [r for r in runs if r['outcome'] == 'won']
+        rows.append({
+            'overrides': dict(key),
+            'runs': len(runs),
+            'win_rate': len(wins) / len(runs),
+            'avg_ticks_to_win': sum(r['ticks'] for r in wins) / len(wins) if wins else None,
+            'avg_parts_collected': sum(r['parts_collected'] for r in runs) / len(runs),
+            'avg_parts_lost_to_swarms': sum(r['parts_lost_to_swarms'] for r in runs) / len(runs),
+            'avg_survivors': sum(r['survivors'] for r in runs) / len(runs),
+        })
+    return rows
+
+def format_table(rows):
+    lines = [f"{'overrides':<40} {'runs':>5} {'win%':>6} {'ticks/win':>10} {'parts':>7} {'swarm-lost':>10} {'survivors':>9}"]
+    for row in rows:
+        label = ' '.join(f"{k}={v}" for k, v in row['overrides'].items()) or '(defaults)'
+        ticks = f"{row['avg_ticks_to_win']:.0f}" if row['avg_ticks_to_win'] is not None else '-'
+        lines.append(f"{label:<40} {row['runs']:>5} {row['win_rate']*100:>6.1f} {ticks:>10} "
+                     f"{row['avg_parts_collected']:>7.1f} {row['avg_parts_lost_to_swarms']:>10.1f} {row['avg_survivors']:>9.1f}")
+    return '\n'.join(lines)
+
+def parse_param(text):
+    name, sep, values = text.partition('=')
+    if not sep or not values: raise argparse.ArgumentTypeError(f"Expected NAME=v1,v2,..., got '{text}'")
+    return name.strip().upper(), [v.strip() for v in values.split(',')]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep config.py settings across seeded runs.")
+    parser.add_argument('--param', type=parse_param, action='append', default=[], metavar='NAME=v1,v2',
+                        help="A setting and the values to try; repeat for a grid of settings")
+    parser.add_argument('--seeds', type=int, default=10, help="Runs per combination (default: 10)")
+    parser.add_argument('--seed-base', type=int, default=0, help="First seed (default: 0)")
+    parser.add_argument('--ticks', type=int, default=5000, help="Maximum ticks per run (default: 5000)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--template-dir', default=None, help="Keep the populated worlds here for later sweeps")
+    args = parser.parse_args(argv)
+
+    seeds = range(args.seed_base, args.seed_base + args.seeds)
+    try:
+        results = run_sweep(dict(args.param), seeds, args.ticks, args.workers, args.template_dir)
+    except (KeyError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr); return 2
+    print(format_table(aggregate(results)))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,50 @@
+# Techburg/templates.py
+"""
+Prebuilt world templates. A template is the snapshot (see snapshot.py) of a freshly
+populated world, keyed by a hash of the settings and the seed that produced it. The
+snapshot carries the RNG state, so a run started from a template goes on tick for tick
+as one that populated its world itself.
+
+TemplateCache keeps templates in memory and, given a directory, in files named by key,
+so sweep workers load a layout instead of regenerating it. warm() builds templates up
+front; workers forked after it share the bytes with the parent copy-on-write.
+Unseeded worlds are never cached.
+"""
+import hashlib
+import json
+import os
+
+def template_key(settings, seed):
+    """Hex digest of the settings and the seed; any change to either gives a new key."""
+    text = json.dumps({'settings': vars(settings), 'seed': seed}, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()[:20]
+
+class TemplateCache:
+    def __init__(self, directory=None):
+        self.directory = directory
+        self.templates = {}  # key -> snapshot bytes
+        if directory: os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, f'{key}.snap')
+
+    def get(self, settings, seed):
+        """Snapshot bytes of the world populated from settings and seed, built on a miss."""
+        key = template_key(settings, seed)
+        data = self.templates.get(key)
+        if data is None and self.directory and os.path.exists(self.path(key)):
+            with open(self.path(key), 'rb') as f: data = f.read()
+        if data is None:
+            from simulation import new_world
+            data = new_world(settings, seed)[0].snapshot()
+            if self.directory:
+                # Written aside and renamed, so a worker never reads half a template.
+                temporary = f'{self.path(key)}.{os.getpid()}.tmp'
+                with open(temporary, 'wb') as f: f.write(data)
+                os.replace(temporary, self.path(key))
+        self.templates[key] = data
+        return data
+
+    def warm(self, settings, seeds):
+        """Builds (or loads) the templates for all the seeds now, e.g. before forking workers."""
+        for seed in seeds: self.get(settings, seed)
@@ -0,0 +1,30 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from benchmarks import suite
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_compare_flags_slowdowns_past_the_threshold(self):
+        baseline = {'results': {'a': {'seconds': 1.0}, 'b': {'seconds': 1.0}, 'c': {'seconds': 1.0}}}
+        results = {'results': {'a': {'seconds': 1.3}, 'b': {'seconds': 1.1}, 'c': {'seconds': 0.5}, 'd': {'seconds': 2.0}}}
+        status = {row[0]: row[4] for row in suite.compare(results, baseline, threshold=0.2)}
+        self.assertEqual(status, {'a': 'regressed', 'b': 'ok', 'c': 'improved', 'd': 'new'})
+        self.assertEqual({row[4] for row in suite.compare(results, None)}, {'new'})
+
+    def test_maze_has_a_way_through(self):
+        grid = suite.maze(21)
+        path = grid.get_planner().find_path((1, 1), (19, 19))
+        self.assertTrue(path)
+        self.assertTrue(all(not grid.blocked[y * 21 + x] for x, y in path))
+
+    def test_quick_run_produces_serializable_results(self):
+        results = suite.run(quick=True, only='find_path', repeats=1)
+        self.assertEqual(list(results['results']), ['find_path/maze=21'])
+        self.assertGreater(results['results']['find_path/maze=21']['seconds'], 0)
+        self.assertTrue(results['quick'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from grid import Grid
+from agents.survivor_bot import GathererBot
+from agents.drone import MalfunctioningDrone
+from entities import SparePart, RechargeStation
+
+def world(budget, bots=6):
+    grid = Grid(30, 30, seed=1, settings=config.load({'BOT_DECISION_BUDGET': budget}))
+    for i in range(bots): grid.add_entity(GathererBot(f'g{i}', i, 0))
+    for i in range(10): grid.add_entity(SparePart('small', 3 * i, 20))
+    grid.add_entity(RechargeStation(15, 15))
+    return grid
+
+class TestDecisionScheduler(unittest.TestCase):
+    def test_off_by_default(self):
+        self.assertIsNone(Grid(5, 5).decisions)
+
+    def test_budget_limits_decisions_per_tick(self):
+        grid = world(budget=2)
+        grid.update_world()  # everybody asks
+        self.assertEqual(len(grid.decisions.pending), 6)
+        for waiting in (4, 2, 0):
+            grid.update_world()
+            self.assertEqual(len(grid.decisions.pending), waiting)
+        self.assertTrue(all(bot.target_entity for bot in grid.get_all_bots()))
+
+    def test_bots_keep_walking_between_decisions(self):
+        grid = world(budget=10, bots=1)
+        bot = grid.get_all_bots()[0]
+        grid.update_world(); grid.update_world()
+        target = bot.target_entity
+        start = (bot.x, bot.y)
+        for _ in range(3): grid.update_world()
+        self.assertIs(bot.target_entity, target)
+        self.assertNotEqual((bot.x, bot.y), start)
+        self.assertEqual(grid.decisions.pending, {})
+
+    def test_running_low_and_threats_trigger_a_decision(self):
+        grid = world(budget=10, bots=1)
+        bot = grid.get_all_bots()[0]
+        grid.update_world(); grid.update_world()
+        bot.energy = bot.max_energy * grid.settings.BOT_RECHARGE_THRESHOLD
+        grid.update_world()
+        self.assertIn(bot, grid.decisions.pending)
+        grid.update_world()
+        self.assertEqual(bot.target_entity.type, 'recharge_station')
+
+        grid.add_entity(MalfunctioningDrone(bot.x + 2, bot.y))
+        grid.decisions.run(grid)
+        self.assertIn(bot, grid.decisions.threatened)
+        self.assertEqual(grid.decisions.pending, {})  # asked and answered in the same run
+
+    def test_threatened_bots_head_away_from_threats(self):
+        grid = Grid(30, 30, seed=1, settings=config.load({'BOT_DECISION_BUDGET': 10}))
+        bot, near, far = GathererBot('g', 0, 0), SparePart('small', 4, 0), SparePart('small', 0, 15)
+        for entity in (bot, near, far, RechargeStation(29, 29)): grid.add_entity(entity)
+        bot.decide(grid)
+        self.assertIs(bot.target_entity, near)
+        grid.add_entity(MalfunctioningDrone(5, 1))
+        grid.decisions.run(grid)
+        self.assertIn(bot, grid.decisions.threatened)
+        self.assertIs(bot.target_entity, far)
+
+    def test_snapshot_keeps_the_queue(self):
+        grid = world(budget=1)
+        grid.update_world(); grid.update_world()
+        restored = Grid.restore(grid.snapshot())
+        self.assertEqual([b.bot_id for b in restored.decisions.pending], [b.bot_id for b in grid.decisions.pending])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+import random
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grid import Grid
+from entities import SparePart
+
+class TestDistanceField(unittest.TestCase):
+    def test_incremental_updates_match_brute_force(self):
+        rng = random.Random(3)
+        grid = Grid(25, 18)
+        parts = []
+        for _ in range(12):
+            part = SparePart('small', 0, 0); grid.add_at_empty(part); parts.append(part)
+        field = grid.get_field('spare_part')
+        for step in range(10):
+            if step % 3 == 2:
+                part = SparePart('large', 0, 0); grid.add_at_empty(part); parts.append(part)
+            else:
+                part = parts.pop(rng.randrange(len(parts))); grid.remove_entity(part)
+            for x in range(grid.width):
+                for y in range(grid.height):
+                    best = min(max(abs(p.x - x), abs(p.y - y)) for p in parts)
+                    self.assertEqual(field.distance_at(x, y), best)
+                    nearest = grid.find_nearest('spare_part', x, y)
+                    self.assertEqual(max(abs(nearest.x - x), abs(nearest.y - y)), best)
+
+    def test_empty_field(self):
+        grid = Grid(5, 5)
+        self.assertIsNone(grid.find_nearest('recharge_station', 2, 2))
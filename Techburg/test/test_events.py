@@ -0,0 +1,49 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from grid import Grid
+from agents.drone import MalfunctioningDrone
+from agents.survivor_bot import GathererBot
+from events import EventLog, DEBUG, INFO, WARNING
+
+class TestEventLog(unittest.TestCase):
+    def test_level_gating_and_muting(self):
+        log = EventLog(capacity=10, level=INFO)
+        log.emit('swarm', DEBUG, "Dealt {} decay damage to {}.", 4, 'bot')
+        log.mute('drone')
+        log.emit('drone', INFO, "Acquired new target: {}", 'bot')
+        log.emit('event', WARNING, "{} has been destroyed!", 'bot')
+        self.assertEqual([str(e) for e in log.recent()], ["[EVENT] bot has been destroyed!"])
+
+    def test_ring_buffer_and_batched_flush(self):
+        log = EventLog(capacity=3, batching=True)
+        batches, warnings = [], []
+        log.subscribe(batches.append)
+        log.subscribe(warnings.append, level=WARNING, categories=['event'])
+        for i in range(5): log.emit('swarm', INFO, "event {}", i)
+        log.emit('event', WARNING, "{} has been destroyed!", 'bot')
+        self.assertEqual(len(log.history), 3)
+        self.assertEqual(batches, [])
+        log.flush()
+        self.assertEqual([e.message for e in batches[0]], [f"event {i}" for i in range(5)] + ["bot has been destroyed!"])
+        self.assertEqual(len(warnings[0]), 1)
+        log.flush()
+        self.assertEqual(len(batches), 1)
+
+    def test_grid_logger_gets_events_without_a_flush(self):
+        out = []
+        grid = Grid(10, 10, logger_func=out.append, seed=1, settings=config.load())
+        grid.add_entity(GathererBot('g', 5, 5)); grid.add_entity(MalfunctioningDrone(6, 5))
+        grid.update_world()
+        self.assertIn("[DRONE] Acquired new target: g", out)
+        self.assertEqual(grid.events.pending, [])
+
+    def test_nothing_is_built_when_nobody_listens(self):
+        log = EventLog(capacity=0)
+        self.assertFalse(log.enabled_for('drone', INFO))
+        log.emit('drone', INFO, "Acquired new target: {}", 'bot')
+        self.assertEqual((log.recent(), log.pending), ([], []))
@@ -1,9 +1,52 @@
 import unittest
-from Techburg.grid import Grid
+from Techburg import config
+from Techburg.grid import Grid, GridFullError
 from Techburg.agents.survivor_bot import SurvivorBot
 
 class TestGrid(unittest.TestCase):
     def test_initialization(self):
         grid = Grid(30, 20)
         self.assertEqual(grid.width, 30)
-        self.assertEqual(grid.height, 20)
\ No newline at end of file
+        self.assertEqual(grid.height, 20)
+
+    def test_spatial_index_follows_moves(self):
+        grid = Grid(10, 10)
+        bot = SurvivorBot('test_bot', 2, 3, 100)
+        grid.add_entity(bot)
+        self.assertIs(grid.get_entity(2, 3), bot)
+        grid.move_entity(bot, 10, 3)
+        self.assertIsNone(grid.get_entity(2, 3))
+        self.assertIs(grid.get_entity(0, 3), bot)
+        self.assertEqual(grid.get_all_bots(), [bot])
+        grid.remove_entity(bot)
+        self.assertTrue(grid.is_empty(0, 3))
+        self.assertFalse(grid.contains(bot))
+
+    def test_add_at_empty_fills_every_cell_then_raises(self):
+        grid = Grid(7, 5, seed=3)
+        for i in range(35): grid.add_at_empty(SurvivorBot(f'bot_{i}', 0, 0, 100))
+        self.assertEqual(len(grid.cells), 35)
+        self.assertRaises(GridFullError, grid.add_at_empty, SurvivorBot('extra', 0, 0, 100))
+
+    def test_free_cells_follow_moves_and_removals(self):
+        grid = Grid(6, 6, seed=1)
+        bots = [SurvivorBot(f'bot_{i}', 0, 0, 100) for i in range(20)]
+        for bot in bots: grid.add_at_empty(bot)
+        for bot in bots[:8]: grid.move_entity(bot, bot.x + 1, bot.y)
+        for bot in bots[8:12]: grid.remove_entity(bot)
+        empty = sorted(y * 6 + x for x in range(6) for y in range(6) if grid.is_empty(x, y))
+        self.assertEqual(sorted(grid.get_free_cells()), empty)
+        self.assertTrue(all(grid.free[grid.free_slot[i]] == i for i in empty))
+
+    def test_populate_world_refuses_to_overfill(self):
+        with self.assertRaises(GridFullError):
+            Grid(4, 4, seed=1).populate_world(10, 2, 1, 1, 2, 1)
+
+    def test_bots_are_built_at_runtime_when_enabled(self):
+        settings = config.load({'BOT_SPAWNING': True, 'GATHERER_CREATION_CHANCE': 1.0, 'REPAIRER_CREATION_CHANCE': 0.0})
+        grid = Grid(10, 10, seed=2, settings=settings)
+        main = grid.populate_world(0, 1, 0, 0, 0, 0)
+        energy = main.energy
+        grid.update_world()
+        self.assertEqual(len(grid.get_by_type('gatherer_bot')), 1)
+        self.assertAlmostEqual(main.energy, energy - main.energy_depletion_rate - settings.BOT_CREATION_ENERGY_COST)
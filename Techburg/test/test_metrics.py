@@ -0,0 +1,86 @@
+import unittest
+import sys
+import os
+import contextlib
+import csv
+import io
+import json
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from simulation import Simulation
+import headless
+from metrics import MetricsCollector, histogram, percentiles, sink_for
+
+def collect():
+    """A sink that keeps the samples it is sent in a list."""
+    samples = []
+    def sink():
+        while True: samples.append((yield))
+    return samples, sink()
+
+class TestMetrics(unittest.TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        found = histogram([10, 60, 60, 250, 900], (50, 100, 200))
+        self.assertEqual(found['buckets'], {'50': 1, '100': 3, '200': 3, '+Inf': 5})
+        self.assertEqual((found['sum'], found['count']), (1280, 5))
+
+    def test_percentiles(self):
+        found = percentiles([float(i) for i in range(1, 101)])
+        self.assertEqual((found['p50'], found['p90'], found['p99'], found['max']), (50.0, 90.0, 99.0, 100.0))
+
+    def test_samples_every_interval_and_keeps_only_the_window(self):
+        sim = Simulation(config.load(), seed=2)
+        samples, sink = collect()
+        sim.grid.metrics = MetricsCollector([sink], 5)
+        for _ in range(23): sim.step()
+        self.assertEqual([s['tick'] for s in samples], [5, 10, 15, 20])
+        self.assertEqual(len(sim.grid.metrics.durations), 3)
+        last = samples[-1]
+        self.assertEqual(last['bot_energy']['count'], last['bots'])
+        self.assertEqual(last['swarm_size']['count'], last['swarms'])
+        self.assertGreater(last['ticks_per_second'], 0)
+
+    def test_interval_must_be_at_least_one_tick(self):
+        with self.assertRaises(ValueError): MetricsCollector([], 0)
+        with tempfile.TemporaryDirectory() as folder, contextlib.redirect_stderr(io.StringIO()):
+            path = os.path.join(folder, 'metrics.csv')
+            self.assertEqual(headless.main(['--ticks', '5', '--metrics', path, '--set', 'METRICS_INTERVAL=0']), 2)
+            for interval in ('0', '-3'):
+                with self.assertRaises(SystemExit): headless.main(['--ticks', '5', '--metrics', path, '--metrics-interval', interval])
+            self.assertFalse(os.path.exists(path))
+
+    def test_backends_sample_the_same_world(self):
+        settings = config.load({'BOT_USE_PATHFINDING': False})
+        runs = []
+        for backend in ('object', 'vectorized'):
+            sim = Simulation(settings, seed=4, backend=backend)
+            samples, sink = collect()
+            sim.grid.metrics = MetricsCollector([sink], 10)
+            for _ in range(30): sim.step()
+            sim.close()
+            runs.append([{k: v for k, v in s.items() if k not in ('ticks_per_second', 'tick_seconds')} for s in samples])
+        self.assertEqual(runs[0], runs[1])
+
+    def test_file_sinks(self):
+        with tempfile.TemporaryDirectory() as folder:
+            paths = [os.path.join(folder, name) for name in ('m.csv', 'm.jsonl', 'm.prom')]
+            sim = Simulation(config.load(), seed=3)
+            sim.grid.metrics = MetricsCollector(map(sink_for, paths), 4)
+            for _ in range(12): sim.step()
+            sim.grid.metrics.close()
+            with open(paths[0]) as f: rows = list(csv.DictReader(f))
+            self.assertEqual([row['tick'] for row in rows], ['4', '8', '12'])
+            self.assertIn('bot_energy_le_+Inf', rows[0])
+            with open(paths[1]) as f: lines = [json.loads(line) for line in f]
+            self.assertEqual(lines[-1]['tick'], 12)
+            with open(paths[2]) as f: text = f.read()
+            self.assertIn('techburg_tick 12\n', text)
+            self.assertIn('techburg_tick_seconds{quantile="0.99"}', text)
+            self.assertFalse(os.path.exists(paths[2] + '.tmp'))
+        self.assertRaises(ValueError, sink_for, 'metrics.txt')
+
+if __name__ == '__main__':
+    unittest.main()
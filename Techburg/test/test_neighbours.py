@@ -0,0 +1,49 @@
+import unittest
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from grid import Grid, BOT_TYPES
+from agents.survivor_bot import GathererBot, RepairBot
+from agents.swarm import ScavengerSwarm
+
+class TestNeighbourQueries(unittest.TestCase):
+    def setUp(self):
+        self.grid = Grid(37, 23, seed=1, settings=config.load({'NEIGHBOUR_BUCKET_SIZE': 5}))
+        rng = random.Random(4)
+        for i in range(60):
+            cls = GathererBot if i % 2 else RepairBot
+            self.grid.add_entity(cls(f'bot_{i}', rng.randrange(37), rng.randrange(23)))
+        self.grid.get_index('gatherer_bot'); self.grid.get_index('repair_bot')
+        # Moves after the index exists, some of them across the wrapping edges
+        for bot in self.grid.get_all_bots()[::3]:
+            self.grid.move_entity(bot, bot.x + rng.choice((-20, 19, 1)), bot.y + rng.choice((-12, 11, 0)))
+
+    def brute(self, x, y, wrap):
+        bots = self.grid.get_all_bots()
+        return sorted(bots, key=lambda b: self.grid.distance(x, y, b, wrap))  # stable, so ties keep get_by_type order
+
+    def test_queries_match_a_full_scan(self):
+        for wrap in (False, True):
+            for x, y in ((0, 0), (36, 22), (18, 11), (3, 20)):
+                expected = self.brute(x, y, wrap)
+                self.assertIs(self.grid.query_nearest(x, y, BOT_TYPES, wrap), expected[0])
+                self.assertEqual(self.grid.query_k_nearest(x, y, 7, BOT_TYPES, wrap), expected[:7])
+                within = [b for b in self.grid.get_all_bots() if self.grid.distance(x, y, b, wrap) <= 4.5]
+                self.assertEqual(self.grid.query_radius(x, y, 4.5, BOT_TYPES, wrap), within)
+
+    def test_wrap_finds_entities_across_the_edge(self):
+        grid = Grid(20, 20, seed=1)
+        near, far = ScavengerSwarm(19, 0), ScavengerSwarm(5, 5)
+        grid.add_entity(near); grid.add_entity(far)
+        self.assertIs(grid.query_nearest(0, 0, ('swarm',)), far)
+        self.assertIs(grid.query_nearest(0, 0, ('swarm',), wrap=True), near)
+        grid.remove_entity(far)
+        self.assertEqual(grid.query_radius(0, 0, 1.5, ('swarm',), wrap=True), [near])
+        self.assertEqual(grid.query_radius(0, 0, 1.5, ('swarm',)), [])
+
+if __name__ == '__main__':
+    unittest.main()
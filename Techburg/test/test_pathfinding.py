@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grid import Grid
+from agents.drone import MalfunctioningDrone
+from entities import SparePart
+from ai.pathfinding import find_path
+
+class TestPathfinding(unittest.TestCase):
+    def test_path_goes_around_blockers(self):
+        grid = Grid(5, 5)
+        for y in range(4): grid.add_entity(MalfunctioningDrone(2, y))
+        grid.add_entity(SparePart('small', 4, 0))
+        path = find_path(grid, (0, 0), (4, 0))
+        self.assertEqual(path[0], (0, 0))
+        self.assertEqual(path[-1], (4, 0))
+        self.assertIn((2, 4), path)
+        self.assertEqual(len(path), 9)  # diagonal steps, as bots take them
+
+    def test_no_path(self):
+        grid = Grid(3, 3)
+        for y in range(3): grid.add_entity(MalfunctioningDrone(1, y))
+        self.assertIsNone(find_path(grid, (0, 0), (2, 2)))
+
+    def test_cached_plan_invalidated_when_blocked(self):
+        grid = Grid(6, 1)
+        planner = grid.get_planner()
+        path = planner.plan((0, 0), (5, 0))
+        self.assertEqual(planner.plan((0, 0), (5, 0)), path)
+        drone = MalfunctioningDrone(0, 0)
+        grid.add_entity(drone)
+        grid.move_entity(drone, 3, 0)
+        self.assertIsNone(planner.plan((0, 0), (5, 0)))
+
+    def test_starts_share_the_search_of_their_goal(self):
+        grid = Grid(20, 20)
+        for y in range(15): grid.add_entity(MalfunctioningDrone(10, y))
+        planner = grid.get_planner()
+        first = planner.plan((0, 0), (19, 0))
+        search = planner.cache[(19, 0)]
+        second = planner.plan((2, 5), (19, 0))
+        self.assertIs(planner.cache[(19, 0)], search)
+        self.assertEqual(len(first), len(find_path(grid, (0, 0), (19, 0))))
+        self.assertEqual(len(second), len(find_path(grid, (2, 5), (19, 0))))
+        self.assertTrue(all(max(abs(a - c), abs(b - d)) == 1 for (a, b), (c, d) in zip(second, second[1:])))
+
+    def test_cache_is_bounded_by_cells_reached(self):
+        grid = Grid(60, 60)
+        planner = grid.get_planner()
+        with mock.patch('ai.pathfinding.CACHE_CELLS', 5000):
+            planner.plan((59, 59), (0, 0))
+            planner.plan((0, 0), (0, 1))  # a neighbour: reaches a handful of cells
+            self.assertEqual(list(planner.cache), [(0, 0), (0, 1)])
+            planner.plan((0, 0), (59, 59))
+        self.assertEqual(list(planner.cache), [(0, 1), (59, 59)])
+        self.assertLessEqual(sum(len(search.parent) for search in planner.cache.values()), 5000)
+
+    def test_goal_on_an_occupied_cell_is_reachable(self):
+        grid = Grid(5, 5)
+        grid.add_entity(MalfunctioningDrone(4, 4))
+        self.assertEqual(grid.get_planner().plan((0, 0), (4, 4))[-1], (4, 4))
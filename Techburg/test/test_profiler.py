@@ -0,0 +1,32 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grid import Grid
+
+class TestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.grid = Grid(20, 20, seed=3)
+        self.grid.populate_world(num_parts=10, num_stations=2, num_drones=2, num_swarms=2, num_gatherers=2, num_repair_bots=1)
+
+    def test_records_phases_types_and_calls(self):
+        stats = self.grid.enable_profiling()
+        for _ in range(5): self.grid.update_world()
+        self.assertEqual(stats.ticks, 5)
+        self.assertEqual({name for name, _, _ in stats.breakdown('phase:')}, {'bots', 'drones', 'swarms'})
+        self.assertEqual(stats.counts['type:swarm'], 10)
+        self.assertGreater(stats.calls['get_all_bots'], 0)
+        self.assertIn("tick", stats.overlay())
+
+    def test_disable_restores_plain_methods(self):
+        self.grid.enable_profiling()
+        stats = self.grid.disable_profiling()
+        self.grid.update_world()
+        self.assertIsNone(self.grid.stats)
+        self.assertEqual(stats.ticks, 0)
+        self.assertNotIn('get_entity', vars(self.grid))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from grid import Grid
+from renderer import GridRenderer
+from agents.drone import MalfunctioningDrone
+from entities import RechargeStation
+
+class FakeCanvas:
+    """Records canvas calls; items are plain dicts."""
+    def __init__(self):
+        self.items, self.next_id, self.calls = {}, 1, []
+    def _create(self, kind, coords, **options):
+        self.calls.append(kind)
+        self.items[self.next_id] = {'kind': kind, 'coords': coords, **options}
+        self.next_id += 1
+        return self.next_id - 1
+    def create_line(self, *coords, **options): return self._create('line', coords, **options)
+    def create_rectangle(self, *coords, **options): return self._create('rectangle', coords, **options)
+    def coords(self, item, *coords): self.calls.append('coords'); self.items[item]['coords'] = coords
+    def itemconfigure(self, item, **options): self.calls.append('config'); self.items[item].update(options)
+    def delete(self, item):
+        self.calls.append('delete')
+        if item == "all": self.items.clear()
+        else: del self.items[item]
+
+class TestRenderer(unittest.TestCase):
+    def test_only_changed_entities_are_redrawn(self):
+        grid = Grid(10, 8)
+        drone, station = MalfunctioningDrone(1, 1), RechargeStation(5, 5)
+        grid.add_entity(drone); grid.add_entity(station)
+        canvas = FakeCanvas()
+        renderer = GridRenderer(canvas, grid, 20)
+        self.assertEqual(canvas.calls.count('line'), 11 + 9)
+        self.assertEqual(canvas.calls.count('rectangle'), 2)
+
+        canvas.calls.clear()
+        grid.move_entity(drone, 2, 1)
+        self.assertEqual(renderer.refresh(), 1)
+        self.assertEqual(canvas.calls, ['coords'])
+        self.assertEqual(canvas.items[renderer.items[drone]]['coords'], (40, 20, 60, 40))
+
+        canvas.calls.clear()
+        grid.remove_entity(drone)
+        renderer.refresh()
+        self.assertEqual(canvas.calls, ['delete'])
+        self.assertNotIn(drone, renderer.items)
+        self.assertEqual(renderer.refresh(), 0)
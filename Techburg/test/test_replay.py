@@ -0,0 +1,56 @@
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from simulation import Simulation
+from replay import ReplayRecorder, ReplayPlayer
+
+def display_state(grid):
+    return (sorted((e.type, e.x, e.y, round(getattr(e, 'energy', 0), 3)) for e in grid.entities),
+            grid.parts_collected, grid.tick)
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, 'run.rep')
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_playback_and_seek_match_the_recorded_run(self):
+        sim = Simulation(config.load(), seed=1)
+        sim.grid.recorder = ReplayRecorder(sim.grid, self.path, keyframe_interval=40)
+        states = [display_state(sim.grid)]
+        for _ in range(150):
+            sim.step(); states.append(display_state(sim.grid))
+        sim.grid.recorder.close()
+
+        player = ReplayPlayer(self.path)
+        self.assertEqual((player.first_tick, player.last_tick), (0, 150))
+        self.assertEqual([tick for tick, _ in player.keyframes], [0, 40, 80, 120])
+        played = [display_state(player.grid)] + [display_state(grid) for grid in player.frames()]
+        self.assertEqual(played, states)
+        for tick in (95, 3, 150, 40):
+            self.assertEqual(display_state(player.seek(tick)), states[tick])
+        player.close()
+        self.assertLess(os.path.getsize(self.path), 10 * len(sim.grid.snapshot()))
+
+    def test_counters_follow_the_recording(self):
+        settings = config.load({'PART_DISPOSAL': True, 'PART_CORROSION_RATE': 0.9, 'PART_DISPOSAL_THRESHOLD': 50.0})
+        sim = Simulation(settings, seed=2)
+        sim.grid.recorder = ReplayRecorder(sim.grid, self.path, keyframe_interval=1000)
+        counters = lambda grid: (grid.parts_collected, grid.parts_lost_to_swarms, grid.parts_corroded)
+        states = [counters(sim.grid)]
+        for _ in range(12): sim.step(); states.append(counters(sim.grid))
+        sim.grid.recorder.close()
+        self.assertGreater(sim.grid.parts_corroded, 0)
+        player = ReplayPlayer(self.path)
+        self.assertEqual([counters(player.grid)] + [counters(grid) for grid in player.frames()], states)
+        player.close()
+
+if __name__ == '__main__':
+    unittest.main()
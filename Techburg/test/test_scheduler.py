@@ -0,0 +1,36 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scheduler import TickScheduler
+
+class FakeClock:
+    def __init__(self): self.now = 0.0
+    def __call__(self): return self.now
+
+class TestTickScheduler(unittest.TestCase):
+    def test_fixed_rate_and_dropped_backlog(self):
+        clock = FakeClock()
+        scheduler = TickScheduler(0.1, frame_budget=0.03, max_ticks_per_frame=5, clock=clock)
+        ticks = []
+        step = lambda: ticks.append(clock.now) or True
+        clock.now = 0.25
+        self.assertEqual(scheduler.run_frame(step), 2)
+        clock.now = 0.35
+        self.assertEqual(scheduler.run_frame(step), 1)
+        clock.now = 10.0  # far behind: capped, and the backlog is dropped
+        self.assertEqual(scheduler.run_frame(step), 5)
+        clock.now = 10.05
+        self.assertEqual(scheduler.run_frame(step), 0)
+
+    def test_turbo_runs_until_budget_or_game_over(self):
+        clock = FakeClock()
+        scheduler = TickScheduler(0.1, frame_budget=0.03, clock=clock)
+        scheduler.turbo = True
+        def step():
+            clock.now += 0.001
+            return True
+        self.assertEqual(scheduler.run_frame(step), 30)
+        self.assertEqual(scheduler.run_frame(lambda: False), 1)
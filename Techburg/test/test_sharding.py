@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from grid import Grid
+from simulation import Simulation
+from sharding import ShardedWorld
+from agents.survivor_bot import GathererBot
+from agents.swarm import ScavengerSwarm
+from entities import SparePart
+
+SETTINGS = {'GRID_WIDTH': 36, 'GRID_HEIGHT': 24, 'NUM_PARTS': 60, 'NUM_GATHERERS': 20, 'NUM_SWARMS': 8,
+            'NUM_DRONES': 6, 'NUM_STATIONS': 6, 'CHUNK_SIZE': 12}
+
+def world_state(grid):
+    return (sorted((e.type, e.x, e.y, round(getattr(e, 'energy', 0), 6)) for e in grid.entities),
+            grid.parts_collected, grid.parts_lost_to_swarms)
+
+class TestShardedWorld(unittest.TestCase):
+    def test_result_does_not_depend_on_worker_count(self):
+        states = []
+        for workers in (1, 2):
+            sim = Simulation(config.load(dict(SETTINGS, SHARD_WORKERS=workers)), seed=3, backend='sharded')
+            try:
+                sim.run(60)
+                states.append(world_state(sim.grid))
+            finally:
+                sim.close()
+        self.assertEqual(states[0], states[1])
+
+    def test_agents_migrate_without_loss(self):
+        sim = Simulation(config.load(dict(SETTINGS, NUM_GATHERERS=0, NUM_REPAIR_BOTS=0, NUM_PARTS=0)), seed=1, backend='sharded')
+        for _ in range(40): sim.step()
+        grid = sim.world.sync()
+        self.assertEqual(len(grid.get_by_type('swarm')), 8)
+        self.assertEqual(len(grid.get_by_type('drone')), 6)
+        self.assertTrue(all(grid.is_valid(e.x, e.y) for e in grid.entities))
+
+    def test_swarm_damages_bots_across_chunk_edges(self):
+        grid = Grid(24, 12, seed=1, settings=config.load({'CHUNK_SIZE': 12}))
+        bot, swarm = GathererBot('g', 12, 5), ScavengerSwarm(11, 5)
+        grid.add_entity(bot); grid.add_entity(swarm)
+        world = ShardedWorld(grid, workers=1)
+        bot = next(iter(world.chunks[1].get_all_bots()))
+        start = bot.energy
+        world.update_world()
+        world.update_world()  # damage dealt to the ghost lands on the bot at the start of the next tick
+        self.assertLess(bot.energy, start - bot.energy_depletion_rate * 2)
+
+    def test_chunk_events_reach_the_world_log(self):
+        lines = []
+        grid = Grid(24, 12, logger_func=lines.append, seed=1, settings=config.load({'CHUNK_SIZE': 12}))
+        grid.add_entity(ScavengerSwarm(13, 5))
+        for x in range(12, 15):
+            for y in range(4, 7): grid.add_entity(SparePart('small', x, y))
+        world = ShardedWorld(grid, workers=1)
+        world.update_world()
+        chunk = world.chunks[1]
+        swarm = chunk.get_by_type('swarm')[0]
+        x, y = chunk.to_global(swarm.x, swarm.y)
+        self.assertEqual(lines, [f"[SWARM] Consumed a part at ({x},{y}). Size is now {swarm.size}."])
+        self.assertEqual(grid.events.recent()[-1].tick, 1)
+
+if __name__ == '__main__':
+    unittest.main()
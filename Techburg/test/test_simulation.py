@@ -0,0 +1,32 @@
+import unittest
+import sys
+import os
+import contextlib
+import io
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+import headless
+from simulation import Simulation
+
+class TestSimulation(unittest.TestCase):
+    def test_same_seed_gives_same_run(self):
+        first = Simulation(seed=7).run(200)
+        second = Simulation(seed=7).run(200)
+        for key in ('ticks', 'outcome', 'parts_collected', 'survivors'):
+            self.assertEqual(first[key], second[key])
+
+    def test_headless_reports_a_world_too_full_to_populate(self):
+        errors = io.StringIO()
+        with contextlib.redirect_stderr(errors):
+            self.assertEqual(headless.main(['--ticks', '5', '--set', 'NUM_PARTS=5000']), 2)
+        self.assertIn("Cannot place", errors.getvalue())
+
+    def test_config_overrides(self):
+        settings = config.load({'NUM_DRONES': '0', 'GRID_WIDTH': 12})
+        sim = Simulation(settings, seed=1)
+        self.assertEqual(sim.grid.width, 12)
+        self.assertEqual(sim.grid.get_by_type('drone'), [])
+        with self.assertRaises(KeyError):
+            config.load({'NOT_A_SETTING': 1})
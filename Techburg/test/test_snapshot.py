@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+import snapshot
+from grid import Grid
+from simulation import Simulation
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+def world_state(grid):
+    return ([(e.type, e.x, e.y, getattr(e, 'energy', None), getattr(e, 'size', None)) for e in grid.entities],
+            grid.tick, grid.parts_collected, grid.rng.getstate())
+
+class TestSnapshot(unittest.TestCase):
+    def test_restored_run_continues_identically(self):
+        for overrides in ({}, {'BOT_USE_PATHFINDING': True}):
+            original = Simulation(config.load(overrides), seed=2)
+            for _ in range(60): original.step()
+            restored = Simulation.restore(original.snapshot())
+            self.assertEqual(world_state(restored.grid), world_state(original.grid))
+            for _ in range(200):
+                self.assertEqual(original.step(), restored.step())
+            self.assertEqual(world_state(restored.grid), world_state(original.grid))
+            self.assertEqual(restored.snapshot(), original.snapshot())
+
+    def test_file_round_trip_through_mmap(self):
+        grid = Grid(15, 10, seed=5)
+        grid.populate_world(num_parts=8, num_stations=2, num_drones=1, num_swarms=1, num_gatherers=2, num_repair_bots=1)
+        for _ in range(10): grid.update_world()
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, 'world.snap')
+            grid.save(path)
+            self.assertEqual(world_state(Grid.load(path)), world_state(grid))
+
+    def test_loads_earlier_versions(self):
+        # Written at tick 25 by each earlier format (two cached plans or searches included), from
+        # the same settings and seed; versions 1 and 2 differ only in format, as do versions 3 and 4.
+        grids = [Grid.load(os.path.join(DATA, f'snapshot_v{version}.snap')) for version in range(1, 6)]
+        for grid in grids:
+            self.assertEqual(grid.tick, 25)
+            self.assertIsNone(grid.planner)
+            bots = [e for e in grid.entities if hasattr(e, 'active_enhancements')]
+            self.assertTrue(any(bot.active_enhancements for bot in bots))
+            for bot in bots:
+                for enhancement in bot.active_enhancements: self.assertGreaterEqual(bot.enhancement_life(enhancement, grid), 0)
+        self.assertEqual(world_state(grids[0])[:3], world_state(grids[1])[:3])
+        self.assertEqual(world_state(grids[2])[:3], world_state(grids[3])[:3])
+        self.assertIsNone(grids[1].free)
+        self.assertIsNotNone(grids[2].free)
+        for grid in grids:
+            for _ in range(30): grid.update_world()
+            self.assertEqual(world_state(Grid.restore(grid.snapshot())), world_state(grid))
+
+    def test_path_searches_are_not_stored(self):
+        sim = Simulation(config.load({'BOT_USE_PATHFINDING': True}), seed=2)
+        for _ in range(30): sim.step()
+        self.assertTrue(sim.grid.planner.cache)
+        data = sim.snapshot()
+        self.assertEqual(sim.grid.planner.cache, {})
+        self.assertEqual(sim.snapshot(), data)
+
+    def test_rejects_unknown_data(self):
+        with self.assertRaises(snapshot.SnapshotError): Grid.restore(b'not a snapshot at all, clearly not' * 2)
+        data = bytearray(Grid(5, 5, seed=1).snapshot())
+        data[4] = 99
+        with self.assertRaises(snapshot.SnapshotError): Grid.restore(bytes(data))
+
+if __name__ == '__main__':
+    unittest.main()
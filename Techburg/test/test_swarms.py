@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from grid import Grid
+from simulation import Simulation
+from agents.swarm import ScavengerSwarm
+from agents.survivor_bot import GathererBot
+
+def dynamics(**overrides):
+    return config.load({'SWARM_DYNAMICS': True, **overrides})
+
+def outbreak():
+    return dynamics(NUM_SWARMS=120, SWARM_REPLICATION_CHANCE=0.3, SWARM_REPLICATION_THRESHOLD=4,
+                    BOT_USE_PATHFINDING=False)
+
+class TestSwarmDynamics(unittest.TestCase):
+    def test_field_deals_what_each_swarm_would(self):
+        grid = Grid(12, 12, seed=1, settings=dynamics())
+        bots = [GathererBot(f'g{i}', x, y) for i, (x, y) in enumerate(((0, 0), (5, 5), (6, 7), (11, 3)))]
+        for entity in bots + [ScavengerSwarm(1, 1, 3), ScavengerSwarm(5, 6, 4), ScavengerSwarm(7, 7), ScavengerSwarm(10, 3, 9)]:
+            grid.add_entity(entity)
+        expected = {bot: bot.energy for bot in bots}
+        for swarm in grid.get_by_type('swarm'):
+            for bot in grid.bots_within(swarm.x, swarm.y, swarm.damage_radius): expected[bot] -= 2 * swarm.size
+        grid.swarm_field.apply_decay(grid)
+        self.assertEqual({bot: bot.energy for bot in bots}, expected)
+
+    def test_swarms_meeting_on_a_cell_merge(self):
+        grid = Grid(3, 1, seed=1, settings=dynamics(SWARM_REPLICATION_CHANCE=0.0))
+        for x in range(3): grid.add_entity(ScavengerSwarm(x, 0, 2 + x))
+        for _ in range(10): grid.update_world()
+        swarms = grid.get_by_type('swarm')
+        self.assertEqual(len({(s.x, s.y) for s in swarms}), len(swarms))
+        self.assertEqual(sum(s.size for s in swarms), 9)
+        self.assertLess(len(swarms), 3)
+
+    def test_large_swarms_split(self):
+        grid = Grid(9, 9, seed=1, settings=dynamics(SWARM_REPLICATION_CHANCE=1.0, SWARM_REPLICATION_THRESHOLD=8))
+        grid.add_entity(ScavengerSwarm(4, 4, 9))
+        grid.update_world()
+        self.assertEqual(sorted(s.size for s in grid.get_by_type('swarm')), [4, 5])
+        grid.update_world()
+        self.assertEqual(sum(s.size for s in grid.get_by_type('swarm')), 9)
+
+    def test_single_units_never_split(self):
+        grid = Grid(9, 9, seed=1, settings=dynamics(SWARM_REPLICATION_CHANCE=1.0, SWARM_REPLICATION_THRESHOLD=1))
+        grid.add_entity(ScavengerSwarm(4, 4, 1))
+        for _ in range(5): grid.update_world()
+        self.assertEqual([s.size for s in grid.get_by_type('swarm')], [1])
+
+    def test_outbreak_resumes_identically_from_a_snapshot(self):
+        sim = Simulation(outbreak(), seed=3)
+        for _ in range(20): sim.step()
+        copy = Simulation.restore(sim.snapshot())
+        for _ in range(30): sim.step(); copy.step()
+        state = lambda s: sorted((e.x, e.y, e.size) for e in s.grid.get_by_type('swarm'))
+        self.assertEqual(state(sim), state(copy))
+        self.assertEqual(sim.summary()['survivors'], copy.summary()['survivors'])
+
+    def test_other_backends_refuse(self):
+        for backend in ('vectorized', 'sharded', 'two_phase'):
+            with self.assertRaises(ValueError): Simulation(outbreak(), seed=1, backend=backend)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+import sweep
+from simulation import Simulation
+from sweep import expand_grid, run_sweep, aggregate
+
+def strip(results):
+    return [{k: v for k, v in r.items() if k not in ('elapsed', 'ticks_per_second')} for r in results]
+
+class TestSweep(unittest.TestCase):
+    def test_expand_grid(self):
+        combos = expand_grid({'NUM_DRONES': [1, 2], 'NUM_SWARMS': [0, 3, 4]})
+        self.assertEqual(len(combos), 6)
+        self.assertIn({'NUM_DRONES': 2, 'NUM_SWARMS': 3}, combos)
+
+    def test_results_do_not_depend_on_worker_count(self):
+        param_grid = {'NUM_DRONES': [0, 3]}
+        serial = run_sweep(param_grid, seeds=[1, 2], max_ticks=100, workers=1)
+        parallel = run_sweep(param_grid, seeds=[1, 2], max_ticks=100, workers=2)
+        self.assertEqual(strip(serial), strip(parallel))
+        rows = aggregate(serial)
+        self.assertEqual([row['runs'] for row in rows], [2, 2])
+
+    def test_runs_from_templates_match_populated_ones(self):
+        param_grid = {'NUM_SWARMS': [1, 4]}
+        expected = []
+        for overrides in expand_grid(param_grid):
+            for seed in (3, 4):
+                expected.append(dict(Simulation(config.load(overrides), seed).run(100), overrides=overrides))
+        with tempfile.TemporaryDirectory() as folder:
+            found = run_sweep(param_grid, seeds=[3, 4], max_ticks=100, workers=2, template_dir=folder)
+            self.assertEqual(len(os.listdir(folder)), 4)
+            self.assertEqual(len(sweep.template_cache(folder).templates), 4)
+        self.assertEqual(strip(found), strip(expected))
+
+    def test_rejects_settings_that_change_nothing(self):
+        for param_grid in ({'DRONE_VISION_RANGE': [5, 20]}, {'SWARM_REPLICATION_CHANCE': [0.1]}, {'CHUNK_SIZE': [50]},
+                           {'PART_CORROSION_RATE': [0.5, 0.9]}, {'BOT_THREAT_DETECTION_RADIUS': [1, 20]},
+                           {'EVENT_LOG_CAPACITY': [5, 50]}):
+            with self.assertRaises(ValueError): run_sweep(param_grid, seeds=[1], max_ticks=10, workers=1)
+        self.assertEqual(len(run_sweep({'SWARM_DYNAMICS': [True], 'SWARM_REPLICATION_CHANCE': [0.1]},
+                                       seeds=[1], max_ticks=10, workers=1)), 1)
+        self.assertEqual(len(run_sweep({'BOT_DECISION_BUDGET': [2], 'BOT_THREAT_DETECTION_RADIUS': [1, 20]},
+                                       seeds=[1], max_ticks=10, workers=1)), 2)
@@ -0,0 +1,48 @@
+import unittest
+import sys
+import os
+import subprocess
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from simulation import Simulation
+from templates import TemplateCache, template_key
+
+TECHBURG = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+def summary(sim):
+    found = sim.run(150)
+    del found['elapsed'], found['ticks_per_second']
+    return found
+
+class TestTemplates(unittest.TestCase):
+    def test_run_from_template_matches_a_populated_one(self):
+        settings = config.load()
+        cache = TemplateCache()
+        self.assertEqual(summary(Simulation(settings, 6, templates=cache)), summary(Simulation(settings, 6)))
+        self.assertEqual(len(cache.templates), 1)
+
+    def test_key_follows_settings_and_seed(self):
+        settings = config.load()
+        self.assertEqual(template_key(settings, 1), template_key(config.load(), 1))
+        self.assertNotEqual(template_key(settings, 1), template_key(settings, 2))
+        self.assertNotEqual(template_key(settings, 1), template_key(config.load({'NUM_PARTS': 51}), 1))
+
+    def test_templates_are_shared_through_the_directory(self):
+        settings = config.load()
+        with tempfile.TemporaryDirectory() as folder:
+            TemplateCache(folder).warm(settings, [1, 2])
+            self.assertEqual(len(os.listdir(folder)), 2)
+            other = TemplateCache(folder)
+            with open(other.path(template_key(settings, 1)), 'rb') as f: stored = f.read()
+            self.assertEqual(other.get(settings, 1), stored)
+            self.assertEqual(len(os.listdir(folder)), 2)
+
+    def test_headless_does_not_import_tkinter(self):
+        code = "import sys, headless; sys.exit('tkinter' in sys.modules)"
+        self.assertEqual(subprocess.run([sys.executable, '-c', code], cwd=TECHBURG).returncode, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from grid import Grid
+from timers import TimerQueue
+from entities import SparePart, corrosion_value
+from agents.survivor_bot import GathererBot
+from simulation import check_outcome
+
+class TestTimers(unittest.TestCase):
+    def test_queue_runs_due_callbacks_in_tick_then_schedule_order(self):
+        timers, ran = TimerQueue(), []
+        for tick, name in ((5, 'a'), (3, 'b'), (5, 'c'), (9, 'd')): timers.schedule(tick, ran.append, name)
+        self.assertEqual(timers.run_due(4), 1)
+        self.assertEqual(timers.run_due(5), 2)
+        self.assertEqual(ran, ['b', 'a', 'c'])
+        self.assertEqual(timers.next_tick(), 9)
+
+    def test_enhancement_lasts_max_corrosion_ticks_after_pickup(self):
+        grid = Grid(10, 10, seed=1)
+        bot = GathererBot('g', 0, 0); grid.add_entity(bot)
+        grid.tick = 7
+        part = SparePart('small', 0, 0)
+        bot.apply_enhancement(part, grid)
+        self.assertEqual(bot.enhancement_life('speed', grid), part.max_corrosion)
+        while grid.tick < 7 + part.max_corrosion:
+            grid.update_world()
+            self.assertIn('speed', bot.active_enhancements)
+        self.assertEqual(bot.enhancement_life('speed', grid), 0)
+        grid.update_world()
+        self.assertNotIn('speed', bot.active_enhancements)
+        self.assertEqual(bot.speed, bot.base_speed)
+
+    def test_renewed_enhancement_ignores_the_old_timer(self):
+        grid = Grid(10, 10, seed=1)
+        bot = GathererBot('g', 0, 0); grid.add_entity(bot)
+        bot.apply_enhancement(SparePart('large', 0, 0), grid)
+        grid.tick = 500
+        bot.apply_enhancement(SparePart('large', 0, 0), grid)
+        grid.tick = 1000; grid.update_world()
+        self.assertEqual(bot.max_energy, bot.base_max_energy + 100)
+
+    def test_parts_corrode_away_once_below_the_threshold(self):
+        settings = config.load({'PART_CORROSION_RATE': 0.9, 'PART_DISPOSAL_THRESHOLD': 50.0, 'PART_DISPOSAL': True})
+        grid = Grid(10, 10, seed=1, settings=settings)
+        part = SparePart('medium', 3, 3); grid.add_entity(part)
+        lifetime = grid.part_lifetime
+        self.assertLess(corrosion_value(0.9, lifetime), 50.0)
+        self.assertGreaterEqual(corrosion_value(0.9, lifetime - 1), 50.0)
+        for _ in range(lifetime - 1): grid.update_world()
+        self.assertTrue(grid.contains(part))
+        self.assertAlmostEqual(part.value(grid), corrosion_value(0.9, lifetime - 1))
+        grid.update_world()
+        self.assertFalse(grid.contains(part))
+        self.assertEqual(grid.parts_corroded, 1)
+
+    def test_parts_are_kept_unless_disposal_is_on(self):
+        grid = Grid(10, 10, seed=1, settings=config.load({'PART_CORROSION_RATE': 0.9}))
+        part = SparePart('medium', 3, 3); grid.add_entity(part)
+        self.assertIsNone(grid.part_lifetime)
+        for _ in range(100): grid.update_world()
+        self.assertTrue(grid.contains(part))
+
+    def test_corroded_parts_leave_the_goal(self):
+        grid = Grid(10, 10, seed=1)
+        bot = GathererBot('g', 0, 0); grid.add_entity(bot)
+        grid.initial_part_count, grid.parts_collected = 5, 3
+        self.assertEqual(check_outcome(grid, bot)[0], None)
+        grid.parts_corroded = 2
+        self.assertEqual(check_outcome(grid, bot)[0], 'won')
+        grid.parts_collected, grid.parts_corroded = 0, 5
+        self.assertEqual(check_outcome(grid, bot)[0], None)
+
+    def test_timers_survive_a_snapshot(self):
+        settings = config.load({'PART_CORROSION_RATE': 0.9, 'PART_DISPOSAL_THRESHOLD': 50.0, 'PART_DISPOSAL': True})
+        grid = Grid(10, 10, seed=1, settings=settings)
+        grid.add_entity(SparePart('medium', 3, 3))
+        bot = GathererBot('g', 5, 5); grid.add_entity(bot)
+        bot.stunned = 10 ** 6  # keeps it away from the part; timers run all the same
+        bot.apply_enhancement(SparePart('small', 0, 0), grid)
+        grid.update_world()
+        restored = Grid.restore(grid.snapshot())
+        for _ in range(grid.part_lifetime): restored.update_world()
+        self.assertEqual(restored.get_by_type('spare_part'), [])
+        self.assertEqual(restored.parts_corroded, 1)
+        restored.tick = 1001; restored.update_world()
+        self.assertNotIn('speed', restored.get_all_bots()[0].active_enhancements)
+
+if __name__ == '__main__':
+    unittest.main()
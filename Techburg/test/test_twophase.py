@@ -0,0 +1,62 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from grid import Grid
+from simulation import Simulation
+from twophase import TwoPhaseWorld
+from agents.survivor_bot import GathererBot
+from agents.drone import MalfunctioningDrone
+from agents.swarm import ScavengerSwarm
+from entities import SparePart
+
+def state(grid):
+    return ([(b.bot_id, b.x, b.y, b.energy) for b in grid.get_all_bots()],
+            [(e.type, e.x, e.y) for e in grid.entities], grid.parts_collected, grid.rng.getstate())
+
+class TestTwoPhase(unittest.TestCase):
+    def test_thread_count_does_not_change_the_result(self):
+        settings = config.load({'NUM_GATHERERS': 40, 'NUM_SWARMS': 10})
+        runs = []
+        for workers in (1, 4):
+            sim = Simulation(settings, seed=5)
+            world = sim.world = TwoPhaseWorld(sim.grid, sim.main_bot, workers=workers)
+            for _ in range(60): sim.step()
+            runs.append(state(sim.grid)); world.close()
+        self.assertEqual(runs[0], runs[1])
+
+    def test_contested_part_goes_to_the_lowest_bot_id(self):
+        grid = Grid(10, 10, seed=1)
+        part = SparePart('small', 4, 4); grid.add_entity(part)
+        late, early = GathererBot('b', 4, 4), GathererBot('a', 4, 4)
+        grid.add_entity(late); grid.add_entity(early)
+        grid.add_entity(ScavengerSwarm(4, 3))
+        world = TwoPhaseWorld(grid)
+        world.update_world()  # both pick the part as their goal
+        world.update_world()  # and arrive together
+        self.assertIs(early.carrying_part, part)
+        self.assertIsNone(late.carrying_part)
+        self.assertEqual(grid.parts_lost_to_swarms, 0)
+
+    def test_drones_strike_only_bots_still_in_range(self):
+        grid = Grid(20, 20, seed=1)
+        bot = GathererBot('g', 5, 5); grid.add_entity(bot)
+        grid.add_entity(SparePart('small', 15, 5))
+        drone = MalfunctioningDrone(4, 5); grid.add_entity(drone)
+        world = TwoPhaseWorld(grid)
+        world.update_world()  # the bot steps away while the drone aims at where it was
+        self.assertEqual(bot.energy, 500 - bot.energy_depletion_rate)
+        self.assertEqual((drone.x, drone.y), (5, 5))
+
+    def test_snapshot_resumes_identically(self):
+        a = Simulation(config.load(), seed=2, backend='two_phase')
+        for _ in range(40): a.step()
+        b = Simulation.restore(a.snapshot(), 'two_phase')
+        for _ in range(60): a.step(); b.step()
+        self.assertEqual(state(a.grid), state(b.grid))
+
+if __name__ == '__main__':
+    unittest.main()
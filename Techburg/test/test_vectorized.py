@@ -0,0 +1,42 @@
+import unittest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import config
+from simulation import Simulation
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def world_state(sim):
+    grid = sim.grid
+    bots = [(b.bot_id, b.x, b.y, b.energy, b.max_energy, b.active_enhancements, grid.contains(b),
+             b.carrying_part is not None, b.target_entity and (b.target_entity.x, b.target_entity.y))
+            for b in grid.get_all_bots()]
+    drones = [(d.x, d.y, d.target_bot and d.target_bot.bot_id) for d in grid.get_by_type('drone')]
+    swarms = [(s.x, s.y, s.size) for s in grid.get_by_type('swarm')]
+    parts = sorted((p.x, p.y) for p in grid.get_by_type('spare_part'))
+    return bots, drones, swarms, parts, grid.parts_collected, grid.rng.getstate()
+
+@unittest.skipUnless(numpy, "numpy is not installed")
+class TestVectorizedBackend(unittest.TestCase):
+    def assert_same_run(self, settings, seed, ticks):
+        reference = Simulation(settings, seed)
+        vectorized = Simulation(settings, seed, backend='vectorized')
+        reference.run(ticks); vectorized.run(ticks)
+        self.assertEqual(reference.ticks, vectorized.ticks)
+        self.assertEqual(reference.outcome, vectorized.outcome)
+        vectorized.world.sync()
+        self.assertEqual(world_state(reference), world_state(vectorized))
+
+    def test_matches_object_backend(self):
+        for seed in range(3):
+            self.assert_same_run(config.load(), seed, 200)
+
+    def test_matches_object_backend_when_crowded(self):
+        settings = config.load({'GRID_WIDTH': 25, 'GRID_HEIGHT': 25, 'NUM_PARTS': 200, 'NUM_SWARMS': 40,
+                                'NUM_DRONES': 20, 'NUM_GATHERERS': 80, 'NUM_REPAIR_BOTS': 30})
+        self.assert_same_run(settings, 4, 150)
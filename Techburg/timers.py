@@ -0,0 +1,38 @@
+# Techburg/timers.py
+"""
+Tick-indexed scheduler. Things that happen after a fixed number of ticks (an enhancement
+running out, a part corroding away) are scheduled once as a callback for the tick they
+are due, instead of being counted down on every tick. Grid.update_world runs the due
+callbacks at the start of each tick, so an idle entity costs nothing in between.
+
+Callbacks due on the same tick run in the order they were scheduled. A callback may find
+that its subject has changed since (the part was picked up, the enhancement renewed) and
+should then do nothing; cancelling is never needed.
+"""
+import heapq
+
+class TimerQueue:
+    def __init__(self):
+        self.heap = []  # (tick, sequence, callback, args)
+        self.sequence = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def schedule(self, tick, callback, *args):
+        """Runs callback(*args) at the start of the given tick."""
+        heapq.heappush(self.heap, (tick, self.sequence, callback, args))
+        self.sequence += 1
+
+    def next_tick(self):
+        """Tick of the earliest pending callback, or None."""
+        return self.heap[0][0] if self.heap else None
+
+    def run_due(self, tick):
+        """Runs every callback due at or before tick. Returns how many ran."""
+        heap, ran = self.heap, 0
+        while heap and heap[0][0] <= tick:
+            _, _, callback, args = heapq.heappop(heap)
+            callback(*args)
+            ran += 1
+        return ran
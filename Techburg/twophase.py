@@ -0,0 +1,186 @@
+# Techburg/twophase.py
+"""
+Two-phase tick (backend 'two_phase'). Grid.update_world lets every agent act on the
+world as the agents before it left it, so results depend on update order: a bot may
+pick up a part a swarm was about to eat, and a drone may strike a bot destroyed a
+moment earlier. Here every tick runs in two phases:
+
+    intents  every agent reads the world as it was at the end of the last tick (nothing
+             is written during this phase) and returns what it wants to do
+    apply    the intents are applied together, with conflicts settled by rules that do
+             not depend on the order agents are stored in:
+               - a part claimed by several arriving bots goes to the lowest bot_id
+               - a part claimed by swarms goes to no swarm if a bot took it, otherwise
+                 to the largest swarm (then the one first in grid order)
+               - a drone's attack lands only if its target is still in range after the
+                 bots moved; otherwise the drone follows it
+               - all damage dealt to a bot in a tick is summed and taken after its own
+                 update; bots at or below zero energy are removed at the end
+
+Since the intents phase only reads, it can be split over a thread pool (TWO_PHASE_WORKERS)
+with the same result. Random moves are drawn up front, one per drone and swarm in grid
+order, so the draws do not depend on the split either. Under the GIL the threads only
+pay off on a free-threaded Python build.
+
+Bots must use straight-line movement (BOT_USE_PATHFINDING off) and decide on the spot
+(BOT_DECISION_BUDGET 0); swarms keep a fixed count (SWARM_DYNAMICS off).
+"""
+import math
+from concurrent.futures import ThreadPoolExecutor
+from grid import BOT_TYPES, FIELD_TYPES
+from events import DEBUG, INFO, WARNING
+
+MOVES = ((0, 1), (0, -1), (1, 0), (-1, 0))
+# Intent actions
+MOVE, ARRIVE, ATTACK, STUNNED = 'move', 'arrive', 'attack', 'stunned'
+
+def step_towards(x, y, tx, ty):
+    return x + (tx > x) - (tx < x), y + (ty > y) - (ty < y)
+
+def bot_intent(bot, grid, move):
+    """(bot, energy after its update, target, action, (x, y)) or None for a bot that does nothing."""
+    if bot.energy <= 0: return None
+    if bot.stunned > 0: return bot, bot.energy, bot.target_entity, STUNNED, None
+    energy = bot.energy - bot.energy_depletion_rate
+    target = bot.target_entity
+    if not target or not grid.contains(target):
+        low = energy < bot.max_energy * grid.settings.BOT_RECHARGE_THRESHOLD
+        target = grid.find_nearest('recharge_station' if low or bot.carrying_part else 'spare_part', bot.x, bot.y)
+    if target is None: return bot, energy, None, None, None
+    if (bot.x, bot.y) == (target.x, target.y): return bot, energy, target, ARRIVE, None
+    return bot, energy, target, MOVE, step_towards(bot.x, bot.y, target.x, target.y)
+
+def drone_intent(drone, grid, move):
+    """(drone, target, action, (x, y))."""
+    target = drone.target_bot
+    if not target or not grid.contains(target):
+        target = grid.nearest_bot(drone.x, drone.y) or target
+    if target and grid.contains(target):
+        if math.hypot(drone.x - target.x, drone.y - target.y) <= drone.ATTACK_RANGE: return drone, target, ATTACK, None
+        return drone, target, MOVE, step_towards(drone.x, drone.y, target.x, target.y)
+    return drone, target, MOVE, (drone.x + move[0], drone.y + move[1])
+
+def swarm_intent(swarm, grid, move):
+    """(swarm, bots it drains, (x, y) it moves to, part it finds there or None)."""
+    drained = grid.bots_within(swarm.x, swarm.y, swarm.damage_radius)
+    x, y = (swarm.x + move[0]) % grid.width, (swarm.y + move[1]) % grid.height
+    found = grid.get_entity(x, y)
+    return swarm, drained, (x, y), found if found and found.type == 'spare_part' else None
+
+INTENTS = (('bots', BOT_TYPES, bot_intent), ('drones', ('drone',), drone_intent), ('swarms', ('swarm',), swarm_intent))
+
+class TwoPhaseWorld:
+    """Runs the ticks of a populated Grid in two phases. Agents stay the grid's own objects,
+    so unlike the other backends the grid is always current and sync() has nothing to do."""
+
+    def __init__(self, grid, main_bot=None, workers=None):
+        settings = grid.settings
+        if settings.BOT_USE_PATHFINDING:
+            raise ValueError("The two-phase backend does not support BOT_USE_PATHFINDING")
+        if settings.BOT_DECISION_BUDGET:
+            raise ValueError("The two-phase backend does not support BOT_DECISION_BUDGET")
+        if settings.SWARM_DYNAMICS:
+            raise ValueError("The two-phase backend does not support SWARM_DYNAMICS")
+        self.grid, self.main_bot = grid, main_bot
+        self.workers = max(1, workers or settings.TWO_PHASE_WORKERS)
+        self.pool = ThreadPoolExecutor(self.workers) if self.workers > 1 else None
+
+    # --- Tick ---
+
+    def update_world(self):
+        grid = self.grid
+        grid.tick += 1
+        grid.events.tick = grid.tick
+        grid.timers.run_due(grid.tick)
+        # Everything the intents phase reads lazily is built now, before it starts.
+        for entity_type in FIELD_TYPES: grid.get_field(entity_type)
+        for entity_type in BOT_TYPES: grid.get_index(entity_type)
+
+        intents = {}
+        for phase, types, intent in INTENTS:
+            agents = grid.get_by_type(*types)
+            moves = [grid.rng.choice(MOVES) for _ in agents] if phase != 'bots' else [None] * len(agents)
+            intents[phase] = self._gather(intent, agents, moves)
+        self._apply(intents['bots'], intents['drones'], intents['swarms'])
+
+        destroyed = [bot for bot in grid.get_all_bots() if bot.energy <= 0]
+        for bot in destroyed:
+            grid.events.emit('event', WARNING, "{} has been destroyed!", bot.bot_id)
+            grid.remove_entity(bot)
+        if grid.settings.BOT_SPAWNING: grid.spawn_bots()
+        if grid.recorder: grid.recorder.capture(grid)
+
+    def _gather(self, intent, agents, moves):
+        grid = self.grid
+        if not self.pool or len(agents) < 2 * self.workers:
+            return [intent(agent, grid, move) for agent, move in zip(agents, moves)]
+        size = -(-len(agents) // self.workers)
+        slices = [(agents[i:i + size], moves[i:i + size]) for i in range(0, len(agents), size)]
+        work = lambda part: [intent(agent, grid, move) for agent, move in zip(*part)]
+        return [found for part in self.pool.map(work, slices) for found in part]
+
+    def _apply(self, bots, drones, swarms):
+        grid, events = self.grid, self.grid.events
+        bots = [found for found in bots if found]
+
+        # Claims on parts, settled before anything moves.
+        claims = {}
+        for bot, energy, target, action, _ in bots:
+            if action == ARRIVE and target.type == 'spare_part' and not bot.carrying_part:
+                if target not in claims or bot.bot_id < claims[target].bot_id: claims[target] = bot
+        eaten = {}
+        for rank, (swarm, _, _, part) in enumerate(swarms):
+            if part is None or part in claims: continue
+            best = eaten.get(part)
+            if best is None or swarm.size > best[0]: eaten[part] = (swarm.size, rank, swarm)
+
+        damage = {}
+        for bot, energy, target, action, step in bots:
+            if action == STUNNED:
+                bot.stunned -= 1; continue
+            bot.energy, bot.target_entity = energy, target
+            if action == MOVE: grid.move_entity(bot, *step)
+            elif action == ARRIVE:
+                if target.type == 'recharge_station':
+                    bot.energy = bot.max_energy
+                    if bot.carrying_part: grid.increment_parts_collected(); bot.carrying_part = None
+                elif claims.get(target) is bot:
+                    bot.carrying_part = target
+                    grid.remove_entity(target); bot.apply_enhancement(target, grid)
+                bot.target_entity = None
+
+        for drone, target, action, step in drones:
+            if target is not drone.target_bot and target is not None and grid.contains(target):
+                events.emit('drone', INFO, "Acquired new target: {}", target.bot_id)
+            drone.target_bot = target
+            # An attack lands only if the target is still in range after the bots moved; otherwise the drone follows it.
+            if action == ATTACK and math.hypot(drone.x - target.x, drone.y - target.y) <= drone.ATTACK_RANGE:
+                damage[target] = damage.get(target, 0) + drone.ATTACK_DAMAGE
+                events.emit('drone', INFO, "Attacked {} for {} damage!", target.bot_id, drone.ATTACK_DAMAGE)
+            elif action == ATTACK: grid.move_entity(drone, *step_towards(drone.x, drone.y, target.x, target.y))
+            else: grid.move_entity(drone, *step)
+
+        for rank, (swarm, drained, cell, part) in enumerate(swarms):
+            amount = swarm.size * 2
+            for bot in drained:
+                damage[bot] = damage.get(bot, 0) + amount
+                events.emit('swarm', DEBUG, "Dealt {} decay damage to {}.", amount, bot.bot_id)
+            grid.move_entity(swarm, *cell)
+        for part, (_, rank, swarm) in sorted(eaten.items(), key=lambda item: item[1][1]):
+            grid.remove_entity(part); swarm.size += 1
+            grid.parts_lost_to_swarms += 1
+            events.emit('swarm', INFO, "Consumed a part at ({},{}). Size is now {}.", swarm.x, swarm.y, swarm.size)
+
+        for bot, amount in damage.items(): bot.energy -= amount
+
+    def bot_count(self):
+        return len(self.grid.get_all_bots())
+
+    def main_bot_energy(self):
+        return self.main_bot.energy if self.main_bot else 0
+
+    def sync(self):
+        return self.grid
+
+    def close(self):
+        if self.pool: self.pool.shutdown(); self.pool = None
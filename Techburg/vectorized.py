@@ -0,0 +1,339 @@
+# Techburg/vectorized.py
+"""
+Optional NumPy backend. Agent state (bots, drones, swarms) lives in flat arrays and
+each phase of Grid.update_world runs as batched array operations. Parts and stations
+stay as objects in the Grid, so distance fields and nearest-target lookups are shared.
+
+The tick follows the object backend step for step: phases run in the same order,
+damage is applied in the same order (np.subtract.at is unbuffered), and random moves
+are drawn from the grid's RNG exactly as random.choice would draw them. For a fixed
+seed both backends therefore produce identical worlds. Only the bot decisions that
+touch shared state (picking a new goal, arriving at a part or station) run per bot.
+
+Needs numpy. Bots must use straight-line movement (BOT_USE_PATHFINDING off), decide
+on the spot (BOT_DECISION_BUDGET 0) and are not built at runtime (BOT_SPAWNING off);
+swarms keep a fixed count (SWARM_DYNAMICS off).
+"""
+import heapq
+import random
+import numpy as np
+from events import DEBUG, INFO, WARNING
+
+MOVES = ((0, 1), (0, -1), (1, 0), (-1, 0))
+ENHANCEMENTS = ('energy_capacity', 'vision', 'speed')
+NO_TARGET, PART, STATION = 0, 1, 2
+# Upper bound on distance matrix cells built at once when pairing threats with bots.
+CHUNK_CELLS = 1 << 22
+
+def draw_choices(rng, n, count):
+    """Indices of `count` consecutive rng.choice() calls on a sequence of length n.
+    random.choice draws getrandbits(n.bit_length()) from one 32-bit output each and
+    retries values >= n, so the same stream can be read in bulk and the generator then
+    advanced by exactly the number of outputs the calls would have used."""
+    if count == 0: return np.empty(0, dtype=np.int64)
+    bits = n.bit_length()
+    clone = random.Random(); clone.setstate(rng.getstate())
+    values = np.empty(0, dtype=np.uint32)
+    while np.count_nonzero(values < n) < count:
+        words = max(64, 2 * count)
+        raw = clone.getrandbits(32 * words).to_bytes(4 * words, 'little')
+        values = np.concatenate((values, np.frombuffer(raw, dtype='<u4') >> np.uint32(32 - bits)))
+    accepted = np.nonzero(values < n)[0][:count]
+    rng.getrandbits(32 * (int(accepted[-1]) + 1))
+    return values[accepted].astype(np.int64)
+
+class VectorWorld:
+    """Runs the ticks of a populated Grid on arrays. The agent objects in the grid are
+    left untouched until sync() writes the array state back into them."""
+
+    def __init__(self, grid, main_bot=None):
+        if grid.settings.BOT_USE_PATHFINDING:
+            raise ValueError("The vectorized backend does not support BOT_USE_PATHFINDING")
+        if grid.settings.BOT_SPAWNING:
+            raise ValueError("The vectorized backend does not support BOT_SPAWNING")
+        if grid.settings.BOT_DECISION_BUDGET:
+            raise ValueError("The vectorized backend does not support BOT_DECISION_BUDGET")
+        if grid.settings.SWARM_DYNAMICS:
+            raise ValueError("The vectorized backend does not support SWARM_DYNAMICS")
+        self.grid = grid
+        self.width, self.height = grid.width, grid.height
+
+        self.parts = grid.get_by_type('spare_part')
+        on_grid = len(self.parts)
+        # Parts that already left the grid but are still carried or targeted (e.g. in a restored
+        # snapshot) get ids too, marked as gone. The same goes for destroyed bots still chased by drones.
+        for bot in grid.get_all_bots():
+            for part in (bot.carrying_part, bot.target_entity):
+                if part is not None and part.type == 'spare_part' and not grid.contains(part) and part not in self.parts:
+                    self.parts.append(part)
+        self.part_ids = {part: i for i, part in enumerate(self.parts)}
+        self.part_alive = np.arange(len(self.parts)) < on_grid
+        # Tick each part corrodes away on, as scheduled by the grid (whose timers do not run meanwhile).
+        lifetime = grid.part_lifetime
+        never = np.iinfo(np.int64).max
+        self.part_expires = np.array([never if lifetime is None or p.created is None else p.created + lifetime
+                                      for p in self.parts], dtype=np.int64)
+        self.part_at = np.full(self.width * self.height, -1, dtype=np.int64)
+        for i, part in enumerate(self.parts[:on_grid]): self.part_at[part.y * self.width + part.x] = i
+        self.stations = grid.get_by_type('recharge_station')
+        self.station_ids = {station: i for i, station in enumerate(self.stations)}
+
+        self.bots = grid.get_all_bots()
+        on_grid = len(self.bots)
+        for drone in grid.get_by_type('drone'):
+            if drone.target_bot is not None and not grid.contains(drone.target_bot) and drone.target_bot not in self.bots:
+                self.bots.append(drone.target_bot)
+        self.bot_ids = {bot: i for i, bot in enumerate(self.bots)}
+        self.main_index = self.bot_ids.get(main_bot, -1)
+        bots = self.bots
+        self.bx = np.array([b.x for b in bots], dtype=np.int64)
+        self.by = np.array([b.y for b in bots], dtype=np.int64)
+        self.energy = np.array([b.energy for b in bots], dtype=np.float64)
+        self.rate = np.array([b.energy_depletion_rate for b in bots], dtype=np.float64)
+        self.base_max_energy = np.array([b.base_max_energy for b in bots], dtype=np.int64)
+        self.max_energy = np.array([b.max_energy for b in bots], dtype=np.int64)
+        self.stunned = np.array([b.stunned for b in bots], dtype=np.int64)
+        self.present = np.arange(len(bots)) < on_grid
+        self.carrying = np.array([self.part_ids.get(b.carrying_part, -1) for b in bots], dtype=np.int64)
+        self.enh_has = np.array([[e in b.active_enhancements for e in ENHANCEMENTS] for b in bots], dtype=bool).reshape(-1, 3)
+        self.enh_expires = np.array([[b.active_enhancements.get(e, 0) for e in ENHANCEMENTS] for b in bots], dtype=np.int64).reshape(-1, 3)
+        self.target_kind = np.zeros(len(bots), dtype=np.int8)
+        self.target_id = np.full(len(bots), -1, dtype=np.int64)
+        self.tx = np.zeros(len(bots), dtype=np.int64)
+        self.ty = np.zeros(len(bots), dtype=np.int64)
+        for i, bot in enumerate(bots):
+            if bot.target_entity is not None: self._set_target(i, bot.target_entity)
+
+        self.drones = grid.get_by_type('drone')
+        self.dx = np.array([d.x for d in self.drones], dtype=np.int64)
+        self.dy = np.array([d.y for d in self.drones], dtype=np.int64)
+        self.drone_target = np.array([self.bot_ids.get(d.target_bot, -1) for d in self.drones], dtype=np.int64)
+
+        self.swarms = grid.get_by_type('swarm')
+        self.sx = np.array([s.x for s in self.swarms], dtype=np.int64)
+        self.sy = np.array([s.y for s in self.swarms], dtype=np.int64)
+        self.size = np.array([s.size for s in self.swarms], dtype=np.int64)
+        self.radius_sq = np.array([s.damage_radius ** 2 for s in self.swarms], dtype=np.float64)
+
+    # --- Tick ---
+
+    def update_world(self):
+        self.grid.tick += 1
+        self.grid.events.tick = self.grid.tick
+        self._timers()
+        self._bots_phase()
+        self._drones_phase()
+        self._swarms_phase()
+        dead = np.nonzero(self.present & (self.energy <= 0))[0]
+        for i in dead: self.grid.events.emit('event', WARNING, "{} has been destroyed!", self.bots[i].bot_id)
+        self.present[dead] = False
+
+    def _timers(self):
+        """What the grid's timers do at the start of a tick: parts corrode away in the order
+        they were scheduled (part order), and enhancements expire."""
+        tick = self.grid.tick
+        for i in np.nonzero(self.part_alive & (self.part_expires <= tick))[0].tolist():
+            part = self.parts[i]
+            self._remove_part(i)
+            self.grid.parts_corroded += 1
+            self.grid.events.emit('part', DEBUG, "A {} part corroded away at ({},{}).", part.size, part.x, part.y)
+        expired = self.enh_has & (self.enh_expires <= tick)
+        if expired.any():
+            self.enh_has &= ~expired
+            changed = expired.any(axis=1)
+            self.max_energy[changed] = self.base_max_energy[changed] + 100 * self.enh_has[changed, 0]
+
+    def _bots_phase(self):
+        acting = self.present & (self.energy > 0)
+        stunned = acting & (self.stunned > 0)
+        self.stunned[stunned] -= 1
+        acting &= ~stunned
+        self.energy[acting] -= self.rate[acting]
+
+        valid = acting & self._target_alive()
+        arrived = valid & (self.bx == self.tx) & (self.by == self.ty)
+        moving = valid & ~arrived
+        # Movers grouped by the part they head for, so a pickup can find them without a scan.
+        chasing = np.nonzero(moving & (self.target_kind == PART))[0]
+        chasing = chasing[np.argsort(self.target_id[chasing], kind='stable')]
+        chased = self.target_id[chasing]
+        pending = np.nonzero(acting & ~moving)[0].tolist()
+        heapq.heapify(pending)
+        while pending:
+            i = heapq.heappop(pending)
+            taken = self._decide(i)
+            if taken is not None:
+                # Bots later in the order that were heading for this part now re-plan on their turn.
+                later = chasing[np.searchsorted(chased, taken, 'left'):np.searchsorted(chased, taken, 'right')]
+                later = later[later > i]
+                moving[later] = False
+                for j in later.tolist(): heapq.heappush(pending, j)
+        self.bx[moving] = (self.bx[moving] + np.sign(self.tx[moving] - self.bx[moving])) % self.width
+        self.by[moving] = (self.by[moving] + np.sign(self.ty[moving] - self.by[moving])) % self.height
+
+    def _decide(self, i):
+        """SurvivorBot.execute_state_action for one bot. Returns the id of a part it picked up."""
+        if not self._has_live_target(i):
+            x, y = int(self.bx[i]), int(self.by[i])
+            if self.energy[i] < self.max_energy[i] * self.grid.settings.BOT_RECHARGE_THRESHOLD or self.carrying[i] >= 0:
+                self._set_target(i, self.grid.find_nearest('recharge_station', x, y))
+            else:
+                self._set_target(i, self.grid.find_nearest('spare_part', x, y))
+        if self.target_kind[i] == NO_TARGET: return None
+        if self.bx[i] != self.tx[i] or self.by[i] != self.ty[i]:
+            self.bx[i] = (self.bx[i] + np.sign(self.tx[i] - self.bx[i])) % self.width
+            self.by[i] = (self.by[i] + np.sign(self.ty[i] - self.by[i])) % self.height
+            return None
+
+        taken, kind, target = None, self.target_kind[i], int(self.target_id[i])
+        self.target_kind[i], self.target_id[i] = NO_TARGET, -1
+        if kind == STATION:
+            self.energy[i] = self.max_energy[i]
+            if self.carrying[i] >= 0: self.grid.increment_parts_collected(); self.carrying[i] = -1
+        elif self.carrying[i] < 0 and self.part_alive[target]:
+            self.carrying[i] = target
+            self._remove_part(target)
+            column = ENHANCEMENTS.index(self.parts[target].enhancement_type)
+            self.enh_has[i, column] = True
+            self.enh_expires[i, column] = self.grid.tick + getattr(self.parts[target], 'max_corrosion', 1000) + 1
+            self.max_energy[i] = self.base_max_energy[i] + 100 * self.enh_has[i, 0]
+            taken = target
+        return taken
+
+    def _drones_phase(self):
+        if not len(self.drones): return
+        present = np.nonzero(self.present)[0]
+        target = self.drone_target
+        lost = (target < 0) | ~self.present[np.maximum(target, 0)]
+        need = np.nonzero(lost)[0]
+        if need.size and present.size:
+            for chunk in np.array_split(need, max(1, need.size * present.size // CHUNK_CELLS)):
+                d2 = (self.dx[chunk, None] - self.bx[present]) ** 2 + (self.dy[chunk, None] - self.by[present]) ** 2
+                new = present[np.argmin(d2, axis=1)]
+                if self.grid.events.enabled_for('drone', INFO):
+                    for d, b in zip(chunk[new != target[chunk]].tolist(), new[new != target[chunk]].tolist()):
+                        self.grid.events.emit('drone', INFO, "Acquired new target: {}", self.bots[b].bot_id)
+                target[chunk] = new
+
+        armed = np.nonzero(target >= 0)[0]
+        t = target[armed]
+        in_range = (self.dx[armed] - self.bx[t]) ** 2 + (self.dy[armed] - self.by[t]) ** 2 <= self.drones[0].ATTACK_RANGE ** 2
+        damage = self.drones[0].ATTACK_DAMAGE
+        np.subtract.at(self.energy, t[in_range], damage)
+        if self.grid.events.enabled_for('drone', INFO):
+            for b in t[in_range].tolist(): self.grid.events.emit('drone', INFO, "Attacked {} for {} damage!", self.bots[b].bot_id, damage)
+        chase, t = armed[~in_range], t[~in_range]
+        self.dx[chase] = (self.dx[chase] + np.sign(self.bx[t] - self.dx[chase])) % self.width
+        self.dy[chase] = (self.dy[chase] + np.sign(self.by[t] - self.dy[chase])) % self.height
+
+        idle = np.nonzero(target < 0)[0]
+        steps = np.array(MOVES, dtype=np.int64)[draw_choices(self.grid.rng, len(MOVES), idle.size)]
+        self.dx[idle] = (self.dx[idle] + steps[:, 0]) % self.width
+        self.dy[idle] = (self.dy[idle] + steps[:, 1]) % self.height
+
+    def _swarms_phase(self):
+        if not len(self.swarms): return
+        # Decay field: every swarm hits every present bot in range, applied swarm by swarm.
+        swarm, bot = self._pairs_in_range(self.sx, self.sy, self.radius_sq)
+        damage = self.size[swarm] * 2
+        np.subtract.at(self.energy, bot, damage)
+        if self.grid.events.enabled_for('swarm', DEBUG):
+            for d, b in zip(damage.tolist(), bot.tolist()):
+                self.grid.events.emit('swarm', DEBUG, "Dealt {} decay damage to {}.", d, self.bots[b].bot_id)
+
+        steps = np.array(MOVES, dtype=np.int64)[draw_choices(self.grid.rng, len(MOVES), len(self.swarms))]
+        self.sx = (self.sx + steps[:, 0]) % self.width
+        self.sy = (self.sy + steps[:, 1]) % self.height
+
+        # A part is eaten by the first swarm (in update order) that lands on it.
+        parts = self.part_at[self.sy * self.width + self.sx]
+        eating = np.nonzero(parts >= 0)[0]
+        _, first = np.unique(parts[eating], return_index=True)
+        for s in np.sort(eating[first]).tolist():
+            self._remove_part(int(parts[s]))
+            self.size[s] += 1
+            self.grid.parts_lost_to_swarms += 1
+            self.grid.events.emit('swarm', INFO, "Consumed a part at ({},{}). Size is now {}.", int(self.sx[s]), int(self.sy[s]), int(self.size[s]))
+
+    # --- Helpers ---
+
+    def _pairs_in_range(self, x, y, radius_sq):
+        """(agent, bot) index pairs with the present bot within the agent's radius, ordered by
+        agent then bot. Bots are bucketed by cell, so only the cells a radius can reach are looked at."""
+        present = np.nonzero(self.present)[0]
+        if not present.size or not len(x): return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        cells = self.by[present] * self.width + self.bx[present]
+        order = np.argsort(cells, kind='stable')
+        bots, cells = present[order], cells[order]
+        reach = int(np.ceil(np.sqrt(radius_sq.max())))
+        agents, found = [], []
+        for ox in range(-reach, reach + 1):
+            for oy in range(-reach, reach + 1):
+                nx, ny = x + ox, y + oy
+                inside = np.nonzero((nx >= 0) & (nx < self.width) & (ny >= 0) & (ny < self.height))[0]
+                target = ny[inside] * self.width + nx[inside]
+                lo = np.searchsorted(cells, target, 'left')
+                counts = np.searchsorted(cells, target, 'right') - lo
+                total = int(counts.sum())
+                if not total: continue
+                starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+                agents.append(np.repeat(inside, counts))
+                found.append(bots[starts + np.arange(total)])
+        if not agents: return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        agent, bot = np.concatenate(agents), np.concatenate(found)
+        keep = (x[agent] - self.bx[bot]) ** 2 + (y[agent] - self.by[bot]) ** 2 <= radius_sq[agent]
+        agent, bot = agent[keep], bot[keep]
+        order = np.lexsort((bot, agent))
+        return agent[order], bot[order]
+
+    def _target_alive(self):
+        alive = self.target_kind == STATION
+        parts = self.target_kind == PART
+        alive[parts] = self.part_alive[self.target_id[parts]]
+        return alive
+
+    def _has_live_target(self, i):
+        kind = self.target_kind[i]
+        return kind == STATION or (kind == PART and self.part_alive[self.target_id[i]])
+
+    def _set_target(self, i, entity):
+        if entity is None:
+            self.target_kind[i], self.target_id[i] = NO_TARGET, -1
+            return
+        if entity.type == 'spare_part': self.target_kind[i], self.target_id[i] = PART, self.part_ids[entity]
+        else: self.target_kind[i], self.target_id[i] = STATION, self.station_ids[entity]
+        self.tx[i], self.ty[i] = entity.x, entity.y
+
+    def _remove_part(self, i):
+        part = self.parts[i]
+        self.part_alive[i] = False
+        self.part_at[part.y * self.width + part.x] = -1
+        self.grid.remove_entity(part)
+
+    def bot_count(self):
+        return int(np.count_nonzero(self.present))
+
+    def main_bot_energy(self):
+        return float(self.energy[self.main_index]) if self.main_index >= 0 else 0.0
+
+    def sync(self):
+        """Writes the array state back into the agent objects and the grid's index."""
+        grid = self.grid
+        for i, bot in enumerate(self.bots):
+            if not self.present[i]:
+                grid.remove_entity(bot)
+            grid.move_entity(bot, int(self.bx[i]), int(self.by[i]))
+            bot.energy = float(self.energy[i])
+            bot.stunned = int(self.stunned[i])
+            bot.carrying_part = self.parts[self.carrying[i]] if self.carrying[i] >= 0 else None
+            kind, target = self.target_kind[i], int(self.target_id[i])
+            bot.target_entity = self.parts[target] if kind == PART else self.stations[target] if kind == STATION else None
+            bot.active_enhancements = {e: int(self.enh_expires[i, k]) for k, e in enumerate(ENHANCEMENTS) if self.enh_has[i, k]}
+            bot.recalculate_stats()
+        for i, drone in enumerate(self.drones):
+            grid.move_entity(drone, int(self.dx[i]), int(self.dy[i]))
+            drone.target_bot = self.bots[self.drone_target[i]] if self.drone_target[i] >= 0 else None
+        for i, swarm in enumerate(self.swarms):
+            grid.move_entity(swarm, int(self.sx[i]), int(self.sy[i]))
+            swarm.size = int(self.size[i])
+        return grid
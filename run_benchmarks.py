@@ -0,0 +1,52 @@
+# Cps5002_RAssessment2/run_benchmarks.py
+import argparse
+import os
+import sys
+
+def run_benchmarks(argv=None):
+    """
+    Runs the benchmark suite in 'Techburg/benchmarks/suite.py', saves the results as JSON
+    and compares them with a stored baseline. Exits with 1 if any case regressed.
+    """
+    project_root = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, os.path.join(project_root, 'Techburg'))
+    from benchmarks import suite
+
+    parser = argparse.ArgumentParser(description="Run the Techburg performance benchmarks.")
+    parser.add_argument('--output', default='benchmark_results.json', help="Where to write this run's results")
+    parser.add_argument('--baseline', default=os.path.join(project_root, 'Techburg', 'benchmarks', 'baseline.json'),
+                        help="Results to compare against")
+    parser.add_argument('--threshold', type=float, default=suite.THRESHOLD,
+                        help="Slowdown that counts as a regression, as a fraction (default %(default)s)")
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    parser.add_argument('--quick', action='store_true', help="Small sizes only, for a smoke test")
+    parser.add_argument('--only', help="Run only the cases whose name contains this")
+    parser.add_argument('--repeats', type=int, default=suite.REPEATS, help="Runs per case; the best one counts")
+    args = parser.parse_args(argv)
+
+    print("--- Running Benchmarks ---")
+    results = suite.run(args.quick, args.only, args.repeats,
+                        progress=lambda name, seconds, unit: print(f"  {name:<36} {suite.duration(seconds)}/{unit}"))
+    suite.save(results, args.output)
+
+    baseline = suite.load(args.baseline) if os.path.exists(args.baseline) else None
+    if baseline and baseline.get('quick') != results['quick']:
+        print(f"Baseline {args.baseline} was run with different sizes; not comparing.")
+        baseline = None
+    rows = suite.compare(results, baseline, args.threshold)
+    print(suite.report(rows))
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        suite.save(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return
+    if baseline is None: print("--- No baseline to compare against (use --save-baseline) ---")
+    regressed = [row[0] for row in rows if row[4] == 'regressed']
+    if regressed:
+        print(f"--- {len(regressed)} BENCHMARK(S) REGRESSED by more than {args.threshold:.0%}: {', '.join(regressed)} ---")
+        sys.exit(1)
+    print("--- Benchmarks Completed ---")
+
+if __name__ == '__main__':
+    run_benchmarks()